@@ -1,12 +1,77 @@
 # api/app.py
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
+from api.jobs import JobManager, JobNotResumable, JobPoolUnavailable, JobQueueFull
+from core import config
+from core.checkpoint import CheckpointStore
+from core.events import TERMINAL_EVENTS, EventBus
+from core.memory import LongTermMemory
+from core.metrics import METRICS, emit
 from core.orchestrator import Orchestrator
+from core.workspace import sweep_workspaces
+from models.llm_factory import get_llm
+
+# Seconds between workspace retention sweeps (config.WORKSPACE_RETENTION)
+WORKSPACE_SWEEP_INTERVAL = 3600.0
+
+
+def sweep_expired_workspaces():
+    # Workspaces of /run tasks and jobs; checkpointed jobs stay resumable
+    checkpoints = CheckpointStore(config.CHECKPOINT_DB)
+    return sweep_workspaces(
+        config.WORKSPACE_ROOT,
+        config.WORKSPACE_RETENTION,
+        keep=checkpoints.task_ids(),
+    )
+
+
+async def sweep_workspaces_periodically():
+    while True:
+        try:
+            await asyncio.to_thread(sweep_expired_workspaces)
+        except Exception as e:
+            emit("workspace_sweep_error", error=str(e))
+        await asyncio.sleep(WORKSPACE_SWEEP_INTERVAL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sweeper = None
+    if config.WORKSPACE_RETENTION > 0:
+        sweeper = asyncio.ensure_future(sweep_workspaces_periodically())
+
+    yield
+
+    # Shutdown: stop the sweeper and the job workers, if any were started
+    if sweeper is not None:
+        sweeper.cancel()
+    if job_manager is not None:
+        job_manager.shutdown()
+
 
-app = FastAPI(title="LLM Execution Engine")
+app = FastAPI(title="LLM Execution Engine", lifespan=lifespan)
 
-orchestrator = Orchestrator(provider="local")
+# Shared across requests: the model client (pooled connections; identical
+# concurrent calls coalesced) and long-term memory. Task state lives in a
+# per-request Orchestrator.
+llm = get_llm(config.LLM_PROVIDER, coalesce=config.LLM_COALESCE)
+long_term_memory = LongTermMemory()
+
+# Worker pool for /jobs, started on first submission
+job_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    global job_manager
+    if job_manager is None:
+        job_manager = JobManager()
+    return job_manager
 
 
 class TaskRequest(BaseModel):
@@ -19,13 +84,148 @@ class TaskResponse(BaseModel):
     total_steps: int
     artifacts: List[str]
     reflection: Optional[str] = None
+    workspace: Optional[str] = None
+    task_id: Optional[str] = None
 
 
 @app.post("/run", response_model=TaskResponse)
-def run_task(req: TaskRequest):
+async def run_task(req: TaskRequest):
+    orchestrator = Orchestrator(
+        llm=llm,
+        long_term_memory=long_term_memory,
+        workspace_root=config.WORKSPACE_ROOT,
+    )
+
     try:
-        result = orchestrator.run(req.task)
+        result = await orchestrator.arun(req.task)
         return result
     except Exception as e:
         # Surface engine failures clearly
         raise HTTPException(status_code=400, detail=str(e))
+
+
+# Seconds without events before /run/stream sends a keep-alive comment
+SSE_KEEPALIVE = 15.0
+
+
+@app.get("/run/stream")
+async def run_task_stream(task: str, request: Request):
+    """
+    Runs a task like POST /run, streaming its progress as server-sent
+    events (see core/events.py). The last event is `done`, carrying the
+    /run response as `result`, `failed` or `cancelled`. Disconnecting
+    cancels the task and its model requests.
+    """
+    events = EventBus()
+    received = events.queue()
+
+    orchestrator = Orchestrator(
+        llm=llm,
+        long_term_memory=long_term_memory,
+        workspace_root=config.WORKSPACE_ROOT,
+        events=events,
+    )
+    run = asyncio.ensure_future(orchestrator.arun(task))
+
+    async def stream():
+        idle = 0.0
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(received.get(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    idle += 1.0
+                    if idle >= SSE_KEEPALIVE:
+                        # Comment line: keeps proxies from closing a quiet stream
+                        idle = 0.0
+                        yield ": keep-alive\n\n"
+                    continue
+
+                idle = 0.0
+                yield f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+                if event["event"] in TERMINAL_EVENTS:
+                    break
+        finally:
+            if not run.done():
+                run.cancel()
+            elif not run.cancelled():
+                # Already reported as a `failed` event
+                run.exception()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Prometheus text format; covers /run traffic served by this process
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+# -------------------------
+# Jobs (queued, non-blocking)
+# -------------------------
+class JobRequest(BaseModel):
+    task: Optional[str] = None
+    tasks: Optional[List[str]] = None
+
+
+class JobSubmission(BaseModel):
+    job_ids: List[str]
+
+
+class JobStatus(BaseModel):
+    id: str
+    task: str
+    status: str
+    result: Optional[TaskResponse] = None
+    error: Optional[str] = None
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+@app.post("/jobs", response_model=JobSubmission, status_code=202)
+def submit_jobs(req: JobRequest):
+    tasks = ([req.task] if req.task else []) + (req.tasks or [])
+    if not tasks:
+        raise HTTPException(status_code=400, detail="Provide 'task' or 'tasks'")
+
+    try:
+        job_ids = get_job_manager().submit(tasks)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except JobPoolUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {"job_ids": job_ids}
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+def get_job(job_id: str):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+@app.post("/jobs/{job_id}/resume", response_model=JobSubmission, status_code=202)
+def resume_job(job_id: str):
+    # Continues a failed job from its last completed step, same id
+    try:
+        found = get_job_manager().resume(job_id)
+    except JobNotResumable as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except JobPoolUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    if not found:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return {"job_ids": [job_id]}
@@ -0,0 +1,261 @@
+# api/jobs.py
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from core import config
+from core.checkpoint import CheckpointNotFound, CheckpointStore
+from core.metrics import emit
+
+
+class JobQueueFull(Exception):
+    """Raised when a submission would exceed the queue bound."""
+    pass
+
+
+class JobNotResumable(Exception):
+    """Raised when resuming a job that is queued, running or succeeded."""
+    pass
+
+
+class JobPoolUnavailable(Exception):
+    """Raised when the worker pool is shut down or cannot be restarted."""
+    pass
+
+
+# =========================================================
+# Worker process side
+# =========================================================
+_orchestrator = None
+_started = None
+
+
+def _init_worker(provider: str, started):
+    # One Orchestrator per worker process, reused for every job it runs
+    global _orchestrator, _started
+    from core.orchestrator import Orchestrator
+
+    _orchestrator = Orchestrator(
+        provider=provider,
+        workspace_root=config.WORKSPACE_ROOT,
+        checkpoints=CheckpointStore(config.CHECKPOINT_DB),
+    )
+    _started = started
+
+
+def _run_job(job_id: str, task: str) -> dict:
+    # The job id doubles as task id: it names the checkpoint and workspace
+    _started.put((job_id, time.time()))
+    return _orchestrator.run(task, task_id=job_id)
+
+
+def _resume_job(job_id: str, task: str) -> dict:
+    _started.put((job_id, time.time()))
+    try:
+        return _orchestrator.resume(job_id)
+    except CheckpointNotFound:
+        # Failed before its first checkpoint (or it was cancelled)
+        return _orchestrator.run(task, task_id=job_id)
+
+
+# =========================================================
+# API process side
+# =========================================================
+class Job:
+    def __init__(self, job_id: str, task: str, future: Future):
+        self.id = job_id
+        self.task = task
+        self.future = future
+        self.submitted_at = time.time()
+        # Set when a worker picks the job up (future.running() is already
+        # true while it waits in the executor's call queue)
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def status(self) -> str:
+        if not self.future.done():
+            return "running" if self.started_at is not None else "queued"
+        if self.future.cancelled():
+            return "cancelled"
+        return "failed" if self.future.exception() else "succeeded"
+
+    def to_dict(self) -> dict:
+        status = self.status
+        return {
+            "id": self.id,
+            "task": self.task,
+            "status": status,
+            "result": self.future.result() if status == "succeeded" else None,
+            "error": str(self.future.exception()) if status == "failed" else None,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Bounded job queue in front of a pool of worker processes.
+
+    At most `max_queued` jobs may be queued or running; a submission that
+    would go over is rejected as a whole (JobQueueFull). Finished jobs are
+    kept for lookup up to `history` entries, oldest dropped first.
+
+    Failed jobs can be resumed from their last checkpoint (`resume`),
+    also after a restart of the API process.
+
+    A worker that dies (killed, out of memory) breaks the whole pool: its
+    jobs in flight fail (and can be resumed) and the next submission
+    starts a new pool.
+    """
+
+    def __init__(
+        self,
+        workers: int = config.JOB_WORKERS,
+        max_queued: int = config.JOB_QUEUE_SIZE,
+        history: int = config.JOB_HISTORY,
+        provider: str = config.LLM_PROVIDER,
+    ):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.history = history
+        self.provider = provider
+
+        # Workers report (job id, time) here when they start a job
+        self._started = multiprocessing.SimpleQueue()
+        self.executor = self._new_pool()
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.checkpoints = CheckpointStore(config.CHECKPOINT_DB)
+        self._outstanding = 0
+        self._lock = threading.Lock()
+
+        threading.Thread(target=self._watch_starts, daemon=True).start()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.provider, self._started),
+        )
+
+    def _submit(self, fn, job_id: str, task: str) -> Future:
+        # Caller holds the lock
+        try:
+            return self.executor.submit(fn, job_id, task)
+        except BrokenProcessPool as e:
+            # The broken pool has already failed the jobs it was running
+            emit("job_pool_restarted", error=str(e))
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self._new_pool()
+        except RuntimeError as e:
+            raise JobPoolUnavailable(f"Job workers unavailable: {e}") from e
+
+        try:
+            return self.executor.submit(fn, job_id, task)
+        except RuntimeError as e:
+            raise JobPoolUnavailable(f"Job workers unavailable: {e}") from e
+
+    def submit(self, tasks: List[str]) -> List[str]:
+        """
+        Queues `tasks` as one job each. Raises JobQueueFull, or
+        JobPoolUnavailable (nothing is queued then).
+        """
+        with self._lock:
+            if self._outstanding + len(tasks) > self.max_queued:
+                raise JobQueueFull(
+                    f"Job queue full ({self._outstanding}/{self.max_queued} outstanding)"
+                )
+
+            jobs = []
+            try:
+                for task in tasks:
+                    job_id = uuid.uuid4().hex
+                    jobs.append(Job(job_id, task, self._submit(_run_job, job_id, task)))
+            except JobPoolUnavailable:
+                # All or nothing: withdraw the jobs already handed over
+                for job in jobs:
+                    job.future.cancel()
+                raise
+
+            for job in jobs:
+                self.jobs[job.id] = job
+            self._outstanding += len(jobs)
+
+        # Callbacks may fire immediately, so register outside the lock
+        for job in jobs:
+            job.future.add_done_callback(lambda _, job=job: self._finished(job))
+
+        return [job.id for job in jobs]
+
+    def resume(self, job_id: str) -> bool:
+        """
+        Re-queues a failed or cancelled job under the same id, continuing
+        from its last completed step. Returns False for unknown ids (no
+        job and no checkpoint). Raises JobNotResumable, JobQueueFull or
+        JobPoolUnavailable.
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+
+            if job is None:
+                saved = self.checkpoints.load(job_id)
+                if saved is None:
+                    return False
+                task = saved["task"]
+            elif job.status in ("failed", "cancelled"):
+                task = job.task
+            else:
+                raise JobNotResumable(f"Job {job_id} is {job.status}")
+
+            if self._outstanding + 1 > self.max_queued:
+                raise JobQueueFull(
+                    f"Job queue full ({self._outstanding}/{self.max_queued} outstanding)"
+                )
+
+            job = Job(job_id, task, self._submit(_resume_job, job_id, task))
+            self._outstanding += 1
+            self.jobs[job_id] = job
+            self.jobs.move_to_end(job_id)
+
+        job.future.add_done_callback(lambda _: self._finished(job))
+        return True
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        job = self.jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def _watch_starts(self):
+        while True:
+            message = self._started.get()
+            if message is None:
+                return
+
+            job_id, started_at = message
+            with self._lock:
+                job = self.jobs.get(job_id)
+                if job is not None and job.started_at is None:
+                    job.started_at = started_at
+
+    def _finished(self, job: Job):
+        with self._lock:
+            self._outstanding -= 1
+            job.finished_at = time.time()
+            self._trim_history()
+
+    def _trim_history(self):
+        excess = len(self.jobs) - self.history
+        if excess <= 0:
+            return
+
+        for job_id in [j for j, job in self.jobs.items() if job.future.done()][:excess]:
+            del self.jobs[job_id]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self._started.put(None)
@@ -0,0 +1,189 @@
+# bench/mock_ollama.py
+"""
+Stand-in for Ollama's /api/generate, for offline benchmarks.
+
+Answers are scripted by role (PLAN / EXECUTE / REFLECT, recognized from
+the system prompt) and emitted token by token with a configurable
+per-token delay and jitter, in Ollama's NDJSON stream format or as a
+single JSON body. Token counts are reported the way Ollama does
+(prompt_eval_count / eval_count).
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+
+DEFAULT_PLAN = (
+    "1. Analyze the requirements.\n"
+    "2. Design the approach.\n"
+    "3. Define the sequence generation logic.\n"
+    "4. Save the generated sequence to a csv file.\n"
+    "5. Write a README describing the output."
+)
+
+_TOKEN = re.compile(r"\S+\s*|\s+")
+
+
+def default_script(prompt: str) -> str:
+    """
+    Deterministic answers that walk the orchestrator through a full run.
+    """
+    if "PLANNING MODULE" in prompt:
+        return DEFAULT_PLAN
+
+    if "EXECUTOR MODULE" in prompt:
+        step = prompt.split("CURRENT STEP:", 1)[-1].lower()
+        if "csv" in step:
+            path, content = "output.csv", "0,1,1,2,3,5,8,13"
+        elif "readme" in step:
+            path, content = "README.md", "# Output\n\nFibonacci numbers in output.csv\n"
+        else:
+            return "NO_ACTION"
+        return json.dumps({"tool": "write_file", "args": {"path": path, "content": content}})
+
+    if "REFLECT" in prompt:
+        return "The sequence was saved to output.csv and README.md was created."
+
+    return "NO_ACTION"
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Default backlog (5) drops connections under concurrent scenarios
+    request_queue_size = 1024
+
+
+class MockOllama:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        token_latency: float = 0.0,
+        jitter: float = 0.0,
+        prefill_latency: float = 0.0,
+        script: Optional[Callable[[str], str]] = None,
+        seed: int = 0,
+    ):
+        self.token_latency = token_latency
+        self.jitter = jitter
+        self.prefill_latency = prefill_latency
+        self.script = script or default_script
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.server = _Server((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+    def start(self) -> "MockOllama":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.token_latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                body = json.dumps({"models": [{"name": "mock:latest"}]}).encode()
+                self._send(200, body, "application/json")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+
+                with mock._lock:
+                    mock.requests += 1
+
+                prompt = f"{payload.get('system', '')}\n\n{payload.get('prompt', '')}"
+                tokens = _TOKEN.findall(mock.script(prompt))
+                usage = {
+                    "prompt_eval_count": len(_TOKEN.findall(prompt)),
+                    "eval_count": len(tokens),
+                }
+
+                if mock.prefill_latency:
+                    time.sleep(mock.prefill_latency)
+
+                if not payload.get("stream", True):
+                    for _ in tokens:
+                        time.sleep(mock._delay())
+                    body = json.dumps({
+                        "model": payload.get("model"),
+                        "response": "".join(tokens),
+                        "done": True,
+                        **usage,
+                    }).encode()
+                    self._send(200, body, "application/json")
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                try:
+                    for token in tokens:
+                        time.sleep(mock._delay())
+                        self._chunk({"model": payload.get("model"), "response": token, "done": False})
+                    self._chunk({"model": payload.get("model"), "response": "", "done": True, **usage})
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client stopped reading early (EXECUTE cutoff)
+                    self.close_connection = True
+
+            def _chunk(self, data: dict):
+                line = json.dumps(data).encode() + b"\n"
+                self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                self.wfile.flush()
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the mock Ollama server")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--token-latency", type=float, default=0.01)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockOllama(port=args.port, token_latency=args.token_latency, jitter=args.jitter)
+    print(f"Mock Ollama listening on {server.url}")
+    server.server.serve_forever()
@@ -0,0 +1,215 @@
+# bench/run_bench.py
+"""
+Offline orchestrator benchmarks against bench/mock_ollama.py.
+
+    python -m bench.run_bench                       # all scenarios
+    python -m bench.run_bench -s concurrent --tasks 200 --token-latency 0.002
+
+Each scenario runs in a fresh temp directory (artifacts, memory DBs and
+logs stay out of the repo) and reports throughput, task latency
+percentiles, the mean time per pipeline phase, mock-server requests and
+Python allocations (tracemalloc; adds overhead, disable with --no-alloc).
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List
+
+from bench.mock_ollama import MockOllama
+from core.memory import LongTermMemory
+from core.metrics import METRICS
+from core.orchestrator import Orchestrator
+from models.llm_factory import get_llm
+from models.transport import HTTPTransport
+
+
+TASK = "Generate the Fibonacci sequence up to {n} and save it to a csv file with a README."
+
+
+# =========================================================
+# Scenarios: (number of tasks, concurrency, long-term records)
+# =========================================================
+def scenarios(args) -> Dict[str, dict]:
+    return {
+        "single": {"tasks": 1, "concurrency": 1, "memory_records": 0},
+        "concurrent": {"tasks": args.tasks, "concurrency": args.tasks, "memory_records": 0},
+        "large_memory": {"tasks": 10, "concurrency": 1, "memory_records": args.memory_size},
+    }
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def phase_totals() -> Dict[str, tuple]:
+    series = METRICS.histograms.get("engine_phase_seconds", {})
+    return {dict(key)["phase"]: (hist.sum, hist.count) for key, hist in series.items()}
+
+
+def token_totals() -> Dict[str, float]:
+    return {
+        kind: sum(METRICS.counters.get(f"engine_llm_{kind}_tokens_total", {}).values())
+        for kind in ("prompt", "completion")
+    }
+
+
+def phase_breakdown(before: Dict[str, tuple], after: Dict[str, tuple]) -> Dict[str, dict]:
+    breakdown = {}
+    for phase, (total, count) in after.items():
+        prev_total, prev_count = before.get(phase, (0.0, 0))
+        calls = count - prev_count
+        if calls:
+            seconds = total - prev_total
+            breakdown[phase] = {
+                "calls": calls,
+                "total_s": round(seconds, 4),
+                "mean_ms": round(seconds / calls * 1000, 2),
+            }
+    return breakdown
+
+
+async def run_tasks(llm, long_term_memory, count: int, concurrency: int) -> List[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            orchestrator = Orchestrator(llm=llm, long_term_memory=long_term_memory)
+            start = time.perf_counter()
+            await orchestrator.arun(TASK.format(n=10 + i))
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return latencies
+
+
+def run_scenario(name: str, spec: dict, args) -> dict:
+    workdir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+
+    try:
+        with MockOllama(token_latency=args.token_latency, jitter=args.jitter, seed=args.seed) as server:
+            transport = HTTPTransport(pool_size=max(10, spec["concurrency"]))
+            llm = get_llm("local", transport=transport, url=server.url)
+            long_term_memory = LongTermMemory("memory/long_term.db")
+
+            for i in range(spec["memory_records"]):
+                long_term_memory.store(
+                    f"past task {i}: export dataset {i} to a csv file",
+                    [f"dataset_{i}.csv"],
+                    f"Dataset {i} was saved to dataset_{i}.csv.",
+                )
+
+            phases_before = phase_totals()
+            tokens_before = token_totals()
+            requests_before = server.requests
+            if args.alloc:
+                tracemalloc.start()
+                snapshot_before = tracemalloc.take_snapshot()
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                latencies = asyncio.run(
+                    run_tasks(llm, long_term_memory, spec["tasks"], spec["concurrency"])
+                )
+            wall = time.perf_counter() - start
+
+            result = {
+                "scenario": name,
+                "tasks": spec["tasks"],
+                "concurrency": spec["concurrency"],
+                "memory_records": spec["memory_records"],
+                "wall_s": round(wall, 3),
+                "throughput_tasks_per_s": round(spec["tasks"] / wall, 2),
+                "latency_ms": {
+                    p: round(percentile(latencies, int(p[1:])) * 1000, 1)
+                    for p in ("p50", "p95", "p99")
+                },
+                "phases": phase_breakdown(phases_before, phase_totals()),
+                "llm_requests": server.requests - requests_before,
+                "tokens": {
+                    kind: int(total - tokens_before[kind])
+                    for kind, total in token_totals().items()
+                },
+            }
+
+            if args.alloc:
+                snapshot_after = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                diff = snapshot_after.compare_to(snapshot_before, "filename")
+                result["allocations"] = {
+                    "net_blocks": sum(stat.count_diff for stat in diff),
+                    "net_kb": round(sum(stat.size_diff for stat in diff) / 1024, 1),
+                    "peak_kb": round(peak / 1024, 1),
+                }
+
+            transport.close()
+            return result
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def print_report(result: dict):
+    lat = result["latency_ms"]
+    print(
+        f"\n== {result['scenario']} "
+        f"({result['tasks']} tasks, concurrency {result['concurrency']}, "
+        f"{result['memory_records']} memory records)"
+    )
+    print(
+        f"  wall {result['wall_s']}s | {result['throughput_tasks_per_s']} tasks/s | "
+        f"p50 {lat['p50']}ms p95 {lat['p95']}ms p99 {lat['p99']}ms | "
+        f"{result['llm_requests']} LLM requests | "
+        f"{result['tokens']['prompt']} prompt / {result['tokens']['completion']} completion tokens"
+    )
+    for phase, stats in sorted(result["phases"].items()):
+        print(f"  {phase:<8} {stats['calls']:>6} calls  {stats['mean_ms']:>9} ms mean  {stats['total_s']:>8} s total")
+    if "allocations" in result:
+        alloc = result["allocations"]
+        print(f"  alloc    {alloc['net_blocks']} net blocks, {alloc['net_kb']} KB net, {alloc['peak_kb']} KB peak")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline orchestrator benchmarks")
+    parser.add_argument("-s", "--scenario", action="append", help="Scenario(s) to run (default: all)")
+    parser.add_argument("--tasks", type=int, default=100, help="Tasks in the concurrent scenario")
+    parser.add_argument("--memory-size", type=int, default=5000, help="Records in the large_memory scenario")
+    parser.add_argument("--token-latency", type=float, default=0.001, help="Mock seconds per token")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Mock +/- seconds per token")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-alloc", dest="alloc", action="store_false", help="Skip tracemalloc")
+    parser.add_argument("--json", help="Also write results as JSON to this path")
+    args = parser.parse_args()
+
+    available = scenarios(args)
+    names = args.scenario or list(available)
+    unknown = [n for n in names if n not in available]
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(unknown)}")
+
+    results = []
+    for name in names:
+        result = run_scenario(name, available[name], args)
+        print_report(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
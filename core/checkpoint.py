@@ -0,0 +1,102 @@
+# core/checkpoint.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from core.metrics import METRICS
+
+
+class CheckpointNotFound(LookupError):
+    """No checkpoint is stored for the task id."""
+    pass
+
+
+class CheckpointStore:
+    """
+    Last known TaskState of each unfinished task, keyed by task id.
+
+    The orchestrator writes one after the plan is accepted and after every
+    step, marks it "failed" when the task raises and deletes it when the
+    task succeeds, so a failed or interrupted task can continue from its
+    last completed step (`Orchestrator.resume`). Shareable between threads
+    and, through SQLite, between processes (API + job workers).
+    """
+
+    def __init__(self, path: str = "memory/checkpoints.db"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # Workers write while the API process reads
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    task_id TEXT PRIMARY KEY,
+                    task TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def save(self, task_id: str, state, status: str = "running"):
+        """
+        `state`: a TaskState, normally a `snapshot()` so the live one can
+        keep changing while this runs in a worker thread.
+        """
+        data = state.to_dict()
+
+        with self._lock, self._db:
+            self._db.execute(
+                """
+                INSERT INTO checkpoints (task_id, task, status, state, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(task_id) DO UPDATE SET
+                    task = excluded.task,
+                    status = excluded.status,
+                    state = excluded.state,
+                    updated_at = excluded.updated_at
+                """,
+                (task_id, data["task"] or "", status, json.dumps(data), time.time()),
+            )
+
+        METRICS.inc("engine_checkpoints_total", status=status)
+
+    def load(self, task_id: str) -> Optional[dict]:
+        """
+        {"task_id", "task", "status", "state" (TaskState.to_dict()),
+        "updated_at"}, or None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT task, status, state, updated_at FROM checkpoints WHERE task_id = ?",
+                (task_id,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        task, status, state, updated_at = row
+        return {
+            "task_id": task_id,
+            "task": task,
+            "status": status,
+            "state": json.loads(state),
+            "updated_at": updated_at,
+        }
+
+    def task_ids(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT task_id FROM checkpoints")]
+
+    def delete(self, task_id: str):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM checkpoints WHERE task_id = ?", (task_id,))
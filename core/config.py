@@ -0,0 +1,52 @@
+# core/config.py
+import os
+
+
+# -------------------------
+# Model backend (models/llm_factory.py), used by the API and job workers
+# -------------------------
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "local")
+# For LLM_PROVIDER=router: JSON list of backends, inline or a file path, e.g.
+# [{"url": "http://gpu1:11434/api/generate", "model": "llama3:70b", "phases": ["plan", "reflect"]},
+#  {"url": "http://gpu2:11434/api/generate", "model": "qwen2.5-coder:3b", "phases": ["execute"]},
+#  {"url": "http://gpu3:11434/api/generate", "model": "llama3:8b"}]
+LLM_BACKENDS = os.getenv("LLM_BACKENDS")
+# Seconds between router health pings of every backend (0 disables them)
+LLM_HEALTH_INTERVAL = float(os.getenv("LLM_HEALTH_INTERVAL", "30"))
+# How long Ollama keeps a model (and its prompt cache) loaded, e.g. "30m"
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE")
+# Sampling temperature for Ollama models (unset: the model's default).
+# 0 makes answers deterministic, which response caching requires
+OLLAMA_TEMPERATURE = float(os.environ["OLLAMA_TEMPERATURE"]) if os.getenv("OLLAMA_TEMPERATURE") else None
+# /run: identical concurrent model calls share one request (0 to disable)
+LLM_COALESCE = os.getenv("LLM_COALESCE", "1") != "0"
+
+
+# -------------------------
+# Job queue (api/jobs.py)
+# -------------------------
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "1000"))
+
+
+# -------------------------
+# Step rules (core/rules.py)
+# -------------------------
+# Optional JSON/YAML file overlaid on core/rules.json
+RULES_PATH = os.getenv("RULES_PATH")
+
+
+# -------------------------
+# Per-task workspaces (core/workspace.py), used by the API and job workers
+# -------------------------
+WORKSPACE_ROOT = os.getenv("WORKSPACE_ROOT", "workspaces")
+# Seconds a task's workspace is kept after its last write (0 keeps them all);
+# tasks with a checkpoint stay until resumed or finished
+WORKSPACE_RETENTION = float(os.getenv("WORKSPACE_RETENTION", str(7 * 24 * 3600)))
+
+
+# -------------------------
+# Task checkpoints (core/checkpoint.py), used by job workers and /jobs/{id}/resume
+# -------------------------
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", "memory/checkpoints.db")
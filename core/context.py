@@ -0,0 +1,68 @@
+# core/context.py
+import math
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+
+_PIECE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap BPE-like token estimate: words cost one token per ~4 chars,
+    every punctuation mark costs one. Close enough to llama/codellama
+    tokenizers for budgeting without loading one.
+    """
+    total = 0
+    for piece in _PIECE.findall(text):
+        if piece[0].isalnum() or piece[0] == "_":
+            total += max(1, math.ceil(len(piece) / 4))
+        else:
+            total += 1
+    return total
+
+
+class ContextItem(NamedTuple):
+    section: str
+    text: str
+    score: float
+    order: int
+
+
+class ContextBuilder:
+    """
+    Packs optional prompt material into a token budget.
+
+    Fixed text (the request itself, instructions) is reserved first.
+    Candidates are then taken in descending score order while they fit;
+    the chosen ones come back grouped by section, in their original order.
+    """
+
+    def __init__(self, max_tokens: int, count_tokens: Optional[Callable[[str], int]] = None):
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens or estimate_tokens
+        self.used = 0
+        self.dropped = 0
+        self._items: List[ContextItem] = []
+
+    def reserve(self, text: str):
+        self.used += self.count_tokens(text)
+
+    def add(self, section: str, text: str, score: float, order: int = 0):
+        self._items.append(ContextItem(section, text, score, order))
+
+    def pack(self) -> Dict[str, List[str]]:
+        chosen: List[ContextItem] = []
+
+        for item in sorted(self._items, key=lambda i: -i.score):
+            cost = self.count_tokens(item.text)
+            if self.used + cost > self.max_tokens:
+                self.dropped += 1
+                continue
+            self.used += cost
+            chosen.append(item)
+
+        sections: Dict[str, List[str]] = {}
+        for item in sorted(chosen, key=lambda i: i.order):
+            sections.setdefault(item.section, []).append(item.text)
+        return sections
@@ -0,0 +1,55 @@
+# core/events.py
+import asyncio
+import time
+from typing import Callable, Dict, List
+
+from core.metrics import emit
+
+
+# The last event of every task
+TERMINAL_EVENTS = ("done", "failed", "cancelled")
+
+
+class EventBus:
+    """
+    Progress events of a task, delivered to subscribers as they happen
+    (SSE clients, UIs). Each event is a dict:
+    {"event": name, "ts": ..., "task_id": ..., **fields}.
+
+    Events published by the Orchestrator, in order:
+    task_started, plan, then per step step_started / step_skipped /
+    tool_result / artifact / step_done, reflection, and finally one of
+    done, failed or cancelled.
+
+    Subscribers are plain callables, called in the publishing thread (the
+    task's event loop); they must not block. `queue()` subscribes an
+    asyncio.Queue for consumers on the same loop.
+    """
+
+    def __init__(self):
+        self._subscribers: List[Callable[[Dict], None]] = []
+
+    def subscribe(self, callback: Callable[[Dict], None]) -> Callable[[Dict], None]:
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: Callable[[Dict], None]):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def queue(self) -> asyncio.Queue:
+        events = asyncio.Queue()
+        self.subscribe(events.put_nowait)
+        return events
+
+    def publish(self, event: str, **fields):
+        if not self._subscribers:
+            return
+
+        record = {"event": event, "ts": round(time.time(), 3), **fields}
+        for callback in list(self._subscribers):
+            try:
+                callback(record)
+            except Exception as e:
+                # A broken subscriber must not fail the task
+                emit("event_subscriber_error", event=event, error=str(e))
@@ -1,7 +1,13 @@
 # core/memory.py
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import json
 import os
+import re
+import sqlite3
+import threading
+import time
+
+from core.vector_index import HashingEmbedder, VectorIndex
 
 
 class ShortTermMemory:
@@ -14,20 +20,31 @@ class ShortTermMemory:
         if len(self.history) > self.max_turns * 2:
             self.history = self.history[-self.max_turns * 2 :]
 
-    def context(self) -> str:
+    def turns(self) -> List[str]:
         """
-        Returns formatted conversation context for the LLM.
+        Conversation turns formatted for the LLM, oldest first.
         """
-        return "\n".join(
+        return [
             f"{item['role'].upper()}: {item['content']}"
             for item in self.history
-        )
+        ]
+
+    def context(self) -> str:
+        """
+        Returns formatted conversation context for the LLM.
+        """
+        return "\n".join(self.turns())
     
 
-class LongTermMemory:
+class JSONMemoryStore:
+    """
+    Original storage: the whole list in one JSON file, rewritten per store.
+    Kept for small setups and as the migration source.
+    """
+
     def __init__(self, path: str = "memory/long_term.json"):
         self.path = path
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
         self._load()
 
     def _load(self):
@@ -41,25 +58,277 @@ class LongTermMemory:
         with open(self.path, "w", encoding="utf-8") as f:
             json.dump(self.data, f, indent=2)
 
+    def append(self, record: Dict):
+        self.data.append(record)
+        self._save()
+
+    def recall(self, task_l: str) -> List[Dict]:
+        return [r for r in reversed(self.data) if _signature_matches(r["task_signature"], task_l)]
+
+    def records(self) -> List[Dict]:
+        return list(self.data)
+
+
+class SQLiteMemoryStore:
+    """
+    Indexed, append-only storage in SQLite.
+
+    - `outcomes` is only ever inserted into, one transaction per record
+    - `task_signature` is indexed for exact lookups
+    - `outcome_tokens` is a word index used to narrow recall candidates,
+      which are then checked with `_signature_matches`
+    - on first open, records from the legacy JSON file are imported once
+    """
+
+    def __init__(self, path: str = "memory/long_term.db", legacy_json: Optional[str] = "memory/long_term.json"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+        if legacy_json:
+            self._migrate_json(legacy_json)
+
+    def _create_schema(self):
+        with self._db:
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS outcomes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task_signature TEXT NOT NULL,
+                    artifacts TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    token_count INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS outcomes_signature ON outcomes (task_signature);
+
+                CREATE TABLE IF NOT EXISTS outcome_tokens (
+                    token TEXT NOT NULL,
+                    outcome_id INTEGER NOT NULL,
+                    PRIMARY KEY (token, outcome_id)
+                ) WITHOUT ROWID;
+
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                """
+            )
+
+    def _migrate_json(self, legacy_json: str):
+        with self._lock, self._db:
+            done = self._db.execute(
+                "SELECT 1 FROM meta WHERE key = 'migrated_json'"
+            ).fetchone()
+            if done or not os.path.exists(legacy_json):
+                return
+
+            with open(legacy_json, "r", encoding="utf-8") as f:
+                records = json.load(f)
+
+            for record in records:
+                self._insert(record)
+
+            self._db.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated_json', ?)",
+                (legacy_json,),
+            )
+
+    def _insert(self, record: Dict):
+        signature = record["task_signature"]
+        tokens = set(_tokens(signature))
+
+        cur = self._db.execute(
+            """
+            INSERT INTO outcomes (task_signature, artifacts, summary, token_count, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (signature, json.dumps(record["artifacts"]), record["summary"], len(tokens), time.time()),
+        )
+        self._db.executemany(
+            "INSERT OR IGNORE INTO outcome_tokens (token, outcome_id) VALUES (?, ?)",
+            [(token, cur.lastrowid) for token in tokens],
+        )
+
+    def append(self, record: Dict):
+        # `with self._db` = one transaction: a crash never leaves a
+        # record without its index rows
+        with self._lock, self._db:
+            self._insert(record)
+
+    def recall(self, task_l: str) -> List[Dict]:
+        with self._lock:
+            ids = self._candidates(task_l)
+            if not ids:
+                return []
+
+            placeholders = ",".join("?" * len(ids))
+            rows = self._db.execute(
+                f"SELECT task_signature, artifacts, summary FROM outcomes "
+                f"WHERE id IN ({placeholders}) ORDER BY id DESC",
+                list(ids),
+            ).fetchall()
+
+        return [
+            {"task_signature": sig, "artifacts": json.loads(artifacts), "summary": summary}
+            for sig, artifacts, summary in rows
+            if _signature_matches(sig, task_l)
+        ]
+
+    def records(self) -> List[Dict]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT task_signature, artifacts, summary FROM outcomes ORDER BY id"
+            ).fetchall()
+
+        return [
+            {"task_signature": sig, "artifacts": json.loads(artifacts), "summary": summary}
+            for sig, artifacts, summary in rows
+        ]
+
+    def _candidates(self, task_l: str) -> set:
+        ids = set()
+        tokens = set(_tokens(task_l))
+
+        # Stored signature inside the task: all of its words are task words
+        if tokens:
+            placeholders = ",".join("?" * len(tokens))
+            ids.update(
+                row[0] for row in self._db.execute(
+                    f"""
+                    SELECT t.outcome_id FROM outcome_tokens t
+                    JOIN outcomes o ON o.id = t.outcome_id
+                    WHERE t.token IN ({placeholders})
+                    GROUP BY t.outcome_id
+                    HAVING COUNT(*) = MAX(o.token_count)
+                    """,
+                    list(tokens),
+                )
+            )
+
+        # Task inside a stored signature: all task words appear there
+        if tokens:
+            ids.update(
+                row[0] for row in self._db.execute(
+                    f"""
+                    SELECT outcome_id FROM outcome_tokens
+                    WHERE token IN ({placeholders})
+                    GROUP BY outcome_id
+                    HAVING COUNT(*) = ?
+                    """,
+                    [*tokens, len(tokens)],
+                )
+            )
+
+        return ids
+
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r"\w+", text)
+
+
+def _contains_words(haystack: str, needle: str) -> bool:
+    needle = needle.strip()
+    if not needle:
+        return False
+    return re.search(rf"(?<!\w){re.escape(needle)}(?!\w)", haystack) is not None
+
+
+def _signature_matches(signature: str, task_l: str) -> bool:
+    """
+    One task contains the other, on word boundaries ("fib" does not
+    match "fibonacci", "a" does not match every task).
+    """
+    return _contains_words(task_l, signature) or _contains_words(signature, task_l)
+
+
+class LongTermMemory:
+    """
+    Outcome memory used to bias planning.
+
+    The storage backend is pluggable: SQLite by default, or the legacy JSON
+    file when `path` ends in `.json` (or pass any object with
+    `append(record)` / `recall(task_l)` / `records()` as `backend`;
+    `recall` returns matches newest first).
+
+    recall_mode:
+    - "substring": one task contains the other (word boundaries); the
+      `top_k` most recent matches
+    - "semantic": top-k cosine similarity over embedded task signatures,
+      kept in an in-memory vector index that `store` updates in place
+    """
+
+    def __init__(
+        self,
+        path: str = "memory/long_term.db",
+        backend=None,
+        recall_mode: str = "substring",
+        top_k: int = 3,
+        similarity_threshold: float = 0.5,
+        embedder=None,
+    ):
+        self.path = path
+
+        if backend is not None:
+            self.backend = backend
+        elif path.endswith(".json"):
+            self.backend = JSONMemoryStore(path)
+        else:
+            self.backend = SQLiteMemoryStore(path)
+
+        if recall_mode not in ("substring", "semantic"):
+            raise ValueError(f"Unknown recall mode: {recall_mode}")
+
+        self.recall_mode = recall_mode
+        self.top_k = top_k
+        self.similarity_threshold = similarity_threshold
+        self.embedder = None
+        self.index = None
+
+        if recall_mode == "semantic":
+            self.embedder = embedder or HashingEmbedder()
+            self.index = VectorIndex(self.embedder.dim)
+            for record in self.backend.records():
+                self._index(record)
+
+    def _index(self, record: Dict):
+        self.index.add(self.embedder.embed(record["task_signature"]), record)
+
     # -------------------------
     # Write (only on success)
     # -------------------------
     def store(self, task: str, artifacts: List[str], summary: str):
         record = {
             "task_signature": task.lower().strip(),
-            "artifacts": artifacts,
+            "artifacts": list(artifacts),
             "summary": summary,
         }
-        self.data.append(record)
-        self._save()
+        self.backend.append(record)
+
+        if self.index is not None:
+            self._index(record)
 
     # -------------------------
     # Read (for planning bias)
     # -------------------------
     def recall(self, task: str) -> List[Dict]:
-        task_l = task.lower()
-        return [
-            r for r in self.data
-            if r["task_signature"] in task_l
-            or task_l in r["task_signature"]
-        ]
+        return [record for _, record in self.recall_scored(task)]
+
+    def recall_scored(self, task: str) -> List[Tuple[float, Dict]]:
+        """
+        Like `recall`, with a relevance score per record (cosine similarity
+        in semantic mode, 1.0 for substring matches).
+        """
+        if self.index is not None:
+            return self.index.search(
+                self.embedder.embed(task.lower().strip()),
+                k=self.top_k,
+                threshold=self.similarity_threshold,
+            )
+
+        return [(1.0, record) for record in self.backend.recall(task.lower())[:self.top_k]]
@@ -0,0 +1,193 @@
+# core/metrics.py
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+
+# Pipeline phase of the code currently running ("plan", "execute", ...).
+# Context-local, so concurrent tasks and worker threads each see their own.
+current_phase: ContextVar[Optional[str]] = ContextVar("current_phase", default=None)
+
+SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets=SECONDS_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """
+    Minimal in-process counter/histogram registry with Prometheus text
+    exposition. Thread-safe; one per process (see METRICS).
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            series.setdefault(key, Histogram()).observe(value)
+
+    def describe(self, name: str, text: str):
+        self.help[name] = text
+
+    def render(self) -> str:
+        lines = []
+
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines += self._header(name, "counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+
+            for name, series in sorted(self.histograms.items()):
+                lines += self._header(name, "histogram")
+                for key, hist in series.items():
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets + ("+Inf",), hist.counts):
+                        cumulative += count
+                        labels = _format_labels(key + (("le", str(bound)),))
+                        lines.append(f"{name}_bucket{labels} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.sum}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def _header(self, name: str, kind: str):
+        header = []
+        if name in self.help:
+            header.append(f"# HELP {name} {self.help[name]}")
+        header.append(f"# TYPE {name} {kind}")
+        return header
+
+
+def _label_key(labels: dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = Metrics()
+METRICS.describe("engine_phase_seconds", "Wall time per pipeline phase")
+METRICS.describe("engine_llm_prompt_tokens_total", "Prompt tokens evaluated by the model")
+METRICS.describe("engine_llm_completion_tokens_total", "Completion tokens generated by the model")
+METRICS.describe("engine_execute_retries_total", "EXECUTE attempts beyond the first")
+METRICS.describe("engine_execute_extracted_total", "EXECUTE tool calls recovered from surrounding prose")
+METRICS.describe("engine_tool_memo_total", "Memoized tool lookups by result")
+METRICS.describe("engine_tool_batch_calls_total", "Tool calls that arrived in a batched EXECUTE answer")
+METRICS.describe("engine_llm_cache_total", "Response cache lookups by result")
+METRICS.describe("engine_plan_cache_total", "Plan cache lookups by result")
+METRICS.describe("engine_artifact_store_total", "Artifacts stored, new or deduplicated")
+METRICS.describe("engine_workspace_swept_total", "Expired task workspaces and unreferenced store blobs removed")
+METRICS.describe("engine_checkpoints_total", "Task checkpoints written by status")
+METRICS.describe("engine_router_requests_total", "Routed LLM calls by backend and result")
+METRICS.describe("engine_router_circuit_total", "Router circuit breaker transitions by backend")
+METRICS.describe("engine_router_health_checks_total", "Router health checks by backend and result")
+METRICS.describe("engine_llm_singleflight_total", "LLM calls that led or joined an identical in-flight call")
+
+
+# =========================================================
+# Structured events (logs/agent.log, one JSON object per line)
+# =========================================================
+_logger: Optional[logging.Logger] = None
+_logger_lock = threading.Lock()
+
+
+def get_logger(path: str = "logs/agent.log") -> logging.Logger:
+    global _logger
+
+    with _logger_lock:
+        if _logger is None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            handler = logging.FileHandler(path, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+
+            _logger = logging.getLogger("engine")
+            _logger.setLevel(logging.INFO)
+            _logger.addHandler(handler)
+            _logger.propagate = False
+
+        return _logger
+
+
+def emit(event: str, **fields):
+    record = {"ts": round(time.time(), 3), "event": event}
+    phase = current_phase.get()
+    if phase and "phase" not in fields:
+        record["phase"] = phase
+    record.update(fields)
+    get_logger().info(json.dumps(record, default=str))
+
+
+@contextmanager
+def timed(phase: str, **fields):
+    """
+    Times a block as `phase`: sets `current_phase` for everything inside
+    (LLM token accounting, nested events), records the wall time in
+    engine_phase_seconds and emits a `phase` event. Callers may add
+    fields to the yielded dict; `status` becomes "error" on exceptions.
+    """
+    token = current_phase.set(phase)
+    info = dict(fields)
+    start = time.perf_counter()
+
+    try:
+        yield info
+        info.setdefault("status", "ok")
+    except BaseException as e:
+        info["status"] = "error"
+        info["error"] = str(e)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        current_phase.reset(token)
+
+        METRICS.observe("engine_phase_seconds", elapsed, phase=phase)
+        emit("phase", phase=phase, seconds=round(elapsed, 4), **info)
+
+
+def record_tokens(prompt_tokens: Optional[int], completion_tokens: Optional[int], model: Optional[str] = None):
+    phase = current_phase.get()
+
+    if prompt_tokens is not None:
+        METRICS.inc("engine_llm_prompt_tokens_total", prompt_tokens, phase=phase, model=model)
+    if completion_tokens is not None:
+        METRICS.inc("engine_llm_completion_tokens_total", completion_tokens, phase=phase, model=model)
+
+    emit("llm_tokens", model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
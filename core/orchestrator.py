@@ -1,83 +1,370 @@
 # core/orchestrator.py
-import json
+import asyncio
+import os
 import re
+import uuid
+from typing import Optional
 
+from core.checkpoint import CheckpointNotFound
+from core.context import ContextBuilder, estimate_tokens
+from core.events import EventBus
 from core.planner import Planner
 from core.tool_executor import ToolExecutor
 from core.memory import ShortTermMemory, LongTermMemory
-from core.state import TaskState
+from core.metrics import METRICS, emit, timed
+from core.rules import get_rules
+from core.state import FINISHED_STATUSES, TaskState
+from core.step_graph import build_step_graph
+from core.streaming import NO_ACTION, PlanStreamParser, ToolCallExtractor, acollect
+from core.workspace import ArtifactStore, Workspace, file_digest
 
 from models.llm_factory import get_llm
+from tools.registry import TOOLS, tool_call_schema
 from models.prompts import COMMON_INSTRUCTIONS, PLANNER_SYSTEM_PROMPT, EXECUTOR_SYSTEM_PROMPT, REFLECT_SYSTEM_PROMPT
 
+class ExecuteFailure(RuntimeError):
+    """The executor gave no usable tool call within the allowed attempts."""
+    pass
+
+
 class Orchestrator:
-    def __init__(self, provider: str = "local"):
-        self.llm = get_llm(provider)
+    def __init__(
+        self,
+        provider: str = "local",
+        llm=None,
+        long_term_memory=None,
+        context_budget: int = 1024,
+        count_tokens=None,
+        parallel_steps: bool = False,
+        pipelined: bool = False,
+        plan_cache=None,
+        rules=None,
+        structured_output: bool = True,
+        workspace_root=None,
+        checkpoints=None,
+        events=None,
+    ):
+        """
+        `llm` and `long_term_memory` may be shared between orchestrators;
+        everything else (state, conversation, tools) is per instance, so
+        concurrent tasks each get their own Orchestrator.
+
+        `context_budget` caps the planner prompt (in tokens, counted with
+        `count_tokens`, e.g. a real tokenizer's `len(encode(text))`).
+
+        `parallel_steps` runs independent executable steps concurrently
+        (see core/step_graph.py) instead of strictly one after another.
+
+        `pipelined` overlaps the serial start of a task: memory recall and
+        model warm-up run concurrently, and the EXECUTE request for the
+        first executable step is sent as soon as the planner has streamed
+        that line. Its tool call is only run after the full plan has been
+        validated; if validation fails the request is cancelled.
+
+        `plan_cache` (a core.plan_cache.PlanCache, shareable) replays the
+        validated plan of an earlier successful task with the same shape
+        instead of calling the planner.
+
+        `rules` (a core.rules.RuleEngine) classifies steps, infers their
+        artifacts and checks plans/reflections; defaults to the shared
+        engine built from core/rules.json.
+
+        `structured_output` constrains EXECUTE answers to the tool-call
+        JSON schema (tools/registry.py) on backends that support it
+        (`llm.supports_format`).
+
+        `workspace_root` gives every task its own directory under it:
+        tool paths resolve inside (and may not leave) that directory, and
+        written files are deduplicated into a content-addressed store
+        (`<workspace_root>/.store`). Without it, tools use the working
+        directory as before.
+
+        `checkpoints` (a core.checkpoint.CheckpointStore, shareable) saves
+        the task state after planning and after every step, so a failed
+        task can be continued with `resume(task_id)`.
+
+        `events` (a core.events.EventBus) receives progress events (plan,
+        steps, tool results, artifacts, reflection, outcome) as they
+        happen.
+        """
+        self.llm = llm or get_llm(provider)
         self.memory = ShortTermMemory()
-        self.long_term_memory = LongTermMemory()
+        self.long_term_memory = long_term_memory or LongTermMemory()
         self.state = TaskState()
         self.tool_executor = ToolExecutor()
+        self.rules = rules or get_rules()
+
+        self.workspace_root = workspace_root
+        self.artifact_store = ArtifactStore(os.path.join(workspace_root, ".store")) if workspace_root else None
+        self.workspace = None
+
+        self.checkpoints = checkpoints
+        self.events = events or EventBus()
+        self.task_id = None
+        self._checkpoint_lock = None
+
+        self.context_budget = context_budget
+        self.count_tokens = count_tokens or estimate_tokens
+        self.parallel_steps = parallel_steps
+        self.pipelined = pipelined
+
+        self._tool_call_format = None
+        if structured_output and getattr(self.llm, "supports_format", False):
+            self._tool_call_format = tool_call_schema(NO_ACTION)
+
+        # step index -> (step text, in-flight EXECUTE request)
+        self._speculative = {}
+        self._warm_up = None
+
+        # EXECUTE prompt prefix of the current task (see _executor_session)
+        self._session = None
+        self._session_task = None
+
+        self.plan_cache = plan_cache
+        self._plan_replayed = False
 
         self.planner = Planner(self.llm, self.memory, self.state)
 
+        # Private loop for the sync entry point, kept across runs so
+        # pooled async connections survive between tasks
+        self._loop = None
+
     # -------------------------
-    # Public entry point
+    # Public entry points
     # -------------------------
-    def run(self, user_input: str):
+    def run(self, user_input: str, task_id: Optional[str] = None):
+        """
+        Blocking wrapper around `arun` for the CLI and scripts.
+        """
+        return self._run_sync(self.arun(user_input, task_id))
+
+    def resume(self, task_id: str):
+        """
+        Blocking wrapper around `aresume`.
+        """
+        return self._run_sync(self.aresume(task_id))
+
+    def _run_sync(self, coro):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+
+        return self._loop.run_until_complete(coro)
+
+    async def arun(self, user_input: str, task_id: Optional[str] = None):
+        """
+        `task_id` names the task's checkpoint and workspace; a new one is
+        generated when omitted.
+        """
+        self._begin(task_id or uuid.uuid4().hex)
+        self._publish("task_started", task=user_input)
+
+        with timed("task") as info:
+            try:
+                result = await self._run_pipeline(user_input)
+            except Exception as e:
+                if self._plan_replayed:
+                    # The cached plan did not hold up for this task
+                    self.plan_cache.invalidate(user_input)
+                await self._checkpoint("failed")
+                self._publish("failed", error=str(e))
+                raise
+            except asyncio.CancelledError:
+                self._publish("cancelled")
+                raise
+            finally:
+                self._cancel_speculation()
+
+            if self.plan_cache is not None and not self._plan_replayed:
+                self.plan_cache.store(user_input, self.state.plan)
+            await self._finish_checkpoint()
+            self._publish("done", result=result)
+
+            info["steps"] = result["total_steps"]
+            info["plan_cached"] = self._plan_replayed
+            return result
+
+    async def aresume(self, task_id: str):
+        """
+        Continues a failed or interrupted task from its last checkpoint:
+        finished steps (and their artifacts) are kept, the rest run again,
+        in the same workspace. A task that failed before its plan was
+        accepted starts over. Raises CheckpointNotFound.
+        """
+        if self.checkpoints is None:
+            raise RuntimeError("Checkpoints are disabled for this orchestrator")
+
+        saved = await asyncio.to_thread(self.checkpoints.load, task_id)
+        if saved is None:
+            raise CheckpointNotFound(f"No checkpoint for task {task_id}")
+
+        if not saved["state"]["plan"]:
+            return await self.arun(saved["task"], task_id)
+
+        self._begin(task_id)
+        self._publish("task_started", task=saved["task"], resumed=True)
+
+        with timed("task") as info:
+            try:
+                result = await self._resume_pipeline(saved["state"])
+            except Exception as e:
+                await self._checkpoint("failed")
+                self._publish("failed", error=str(e))
+                raise
+            except asyncio.CancelledError:
+                self._publish("cancelled")
+                raise
+
+            await self._finish_checkpoint()
+            self._publish("done", result=result)
+
+            info["steps"] = result["total_steps"]
+            info["resumed"] = True
+            return result
+
+    async def _run_pipeline(self, user_input: str):
         # -------------------------
         # Initialize task
         # -------------------------
         self.memory.add("user", user_input)
         self.state.set_task(user_input)
 
+        self._open_workspace()
+
+        # -------------------------
+        # PLAN (replayed from cache when the task has been seen)
+        # -------------------------
+        cached_steps = self.plan_cache.lookup(user_input) if self.plan_cache else None
+
+        if cached_steps is not None:
+            plan = "\n".join(f"{i + 1}. {step}" for i, step in enumerate(cached_steps))
+            try:
+                # Refilled parameters can break the rules the original passed
+                self._validate_plan_output(plan)
+            except RuntimeError as e:
+                print(f"\n[PLAN] cached plan rejected: {e}")
+                self.plan_cache.invalidate(user_input)
+                cached_steps = None
+            else:
+                print("\n[PLAN] (cached)\n", plan)
+
+        self._plan_replayed = cached_steps is not None
+
+        if cached_steps is not None:
+            self.state.set_plan(cached_steps)
+        else:
+            await self._plan_and_validate(user_input)
+
+        self._publish("plan", steps=self.state.plan, cached=self._plan_replayed)
+        await self._checkpoint()
+
+        # -------------------------
+        # EXECUTION LOOP
+        # -------------------------
+        return await self._execute_and_reflect(user_input)
+
+    async def _resume_pipeline(self, saved_state: dict):
+        self.state.restore(saved_state)
+        self.memory.add("user", self.state.task)
+        self._open_workspace()
+
+        print(
+            f"\n[RESUME] {self.task_id}: continuing at step "
+            f"{self.state.current_step_index + 1}/{len(self.state.plan)}"
+        )
+        self._publish(
+            "plan",
+            steps=self.state.plan,
+            cached=False,
+            finished=[i for i, s in enumerate(self.state.step_status) if s in FINISHED_STATUSES],
+        )
+
+        return await self._execute_and_reflect(self.state.task)
+
+    def _open_workspace(self):
+        # Keyed by task id, so a resumed task finds its earlier files
+        self.workspace = None
+        if self.workspace_root is not None:
+            self.workspace = Workspace(self.workspace_root, task_id=self.task_id, store=self.artifact_store)
+        self.tool_executor.reset(self.workspace)
+
+    # -------------------------
+    # Checkpoints
+    # -------------------------
+    def _begin(self, task_id: str):
+        self.task_id = task_id
+        self._plan_replayed = False
+        # Created per run: the lock belongs to the loop running the task
+        self._checkpoint_lock = asyncio.Lock()
+
+    async def _checkpoint(self, status: str = "running"):
+        """
+        Saves the current state. The snapshot is taken under the lock, so
+        writes land in step order even when parallel steps finish together,
+        and parallel steps can keep changing the live state meanwhile.
+        """
+        if self.checkpoints is None:
+            return
+
+        async with self._checkpoint_lock:
+            snapshot = self.state.snapshot()
+            await asyncio.to_thread(self.checkpoints.save, self.task_id, snapshot, status)
+
+    async def _finish_checkpoint(self):
+        if self.checkpoints is not None:
+            await asyncio.to_thread(self.checkpoints.delete, self.task_id)
+
+    async def _plan_and_validate(self, user_input: str):
+        if self.pipelined:
+            # Recall and model load overlap instead of running back to back
+            recall = asyncio.ensure_future(
+                asyncio.to_thread(self.long_term_memory.recall_scored, user_input)
+            )
+            # Not awaited: the planner request simply queues behind the load
+            self._warm_up = asyncio.ensure_future(self.llm.awarm())
+            self._warm_up.add_done_callback(_warm_up_done)
+            past = await recall
+        else:
+            past = await asyncio.to_thread(self.long_term_memory.recall_scored, user_input)
+
         # -------------------------
         # PLAN
         # -------------------------
-        plan = self._plan_phase(user_input)
+        plan, steps = await self._plan_phase(user_input, past)
         self._validate_plan_output(plan)
 
         print("\n[PLAN]\n", plan)
 
-        steps = [
-            line.split(".", 1)[1].strip()
-            for line in plan.splitlines()
-            if line.strip() and line[0].isdigit()
-        ]
         self.state.set_plan(steps)
 
-        # -------------------------
-        # EXECUTION LOOP
-        # -------------------------
+    async def _execute_and_reflect(self, user_input: str):
+        if self.parallel_steps:
+            await self._execute_parallel(user_input)
+
         while self.state.plan_valid and not self.state.is_complete():
             self._log_progress()
 
             if self.state.current_step() is None:
                 break
 
-            tool_call = self._execute_phase(user_input)
+            tool_call = await self._execute_phase(user_input)
 
             # No action taken (analysis step or NO_ACTION)
             if tool_call is None:
+                await self._checkpoint()
                 continue
 
             # -------------------------
-            # TOOL EXECUTION (one per loop)
+            # TOOL EXECUTION (one call or one read-only batch per loop)
             # -------------------------
-            tool_name = tool_call["tool"]
-            tool_args = tool_call["args"]
-
-            tool_result = self.tool_executor.execute(tool_name, tool_args)
-
-            # Artifact tracking (write_file example)
-            if tool_name == "write_file":
-                self.state.add_artifact(
-                    tool_args["path"],
-                    role=self.state.expected_artifact_role or "unknown"
-                )
+            await self._run_tool_call(
+                tool_call, self.state.expected_artifact_role, self.state.current_step_index
+            )
+            self._publish_step("step_done", self.state.current_step_index, action=_action(tool_call))
 
             # After tool execution, advance step
             self.state.advance_step()
             self.state.clear_last_tool()
+            await self._checkpoint()
 
         # -------------------------
         # REFLECT (post-mortem)
@@ -88,30 +375,34 @@ class Orchestrator:
         while attempts < 2:
             attempts += 1
 
-            reflection = self.llm.generate(
-                system_prompt=REFLECT_SYSTEM_PROMPT,
-                user_prompt=f"""
+            with timed("reflect", attempt=attempts):
+                reflection = (await self.llm.agenerate(
+                    system_prompt=REFLECT_SYSTEM_PROMPT,
+                    user_prompt=f"""
         TASK:
         {self.state.task}
 
         ARTIFACTS:
-        {self.state.artifacts}
+        {self.state.artifacts_text}
 
         Summarize what was done.
         Attempt {attempts}/2.
         """
-            ).strip()
+                )).strip()
 
             if self._validate_reflection(reflection):
                 break
         else:
             raise RuntimeError("Invalid reflection after retry")
 
+        self._publish("reflection", text=reflection)
+
         # -------------------------
         # Commit long-term memory (AFTER success)
         # -------------------------
         if reflection:
-            self.long_term_memory.store(
+            await asyncio.to_thread(
+                self.long_term_memory.store,
                 task=self.state.task,
                 artifacts=self.state.artifacts,
                 summary=reflection,
@@ -136,35 +427,31 @@ class Orchestrator:
             "total_steps": len(self.state.plan),
             "artifacts": self.state.artifacts,
             "reflection": reflection,
+            "workspace": self.workspace.path if self.workspace else None,
+            "task_id": self.task_id,
         }
 
 
     # -------------------------
     # Phase implementations
     # -------------------------
-    def _plan_phase(self, user_input: str) -> str:
-        past = self.long_term_memory.recall(user_input)
-
-        memory_hint = ""
-        if past:
-            memory_hint = (
-                "\nPAST SUCCESSFUL OUTCOMES:\n"
-                + "\n".join(
-                    f"- {p['summary']} (artifacts: {p['artifacts']})"
-                    for p in past
-                )
-            )
+    async def _plan_phase(self, user_input: str, past):
+        """
+        Streams the plan and parses numbered steps as each line completes.
+        Returns (plan_text, steps).
+        """
+        state_info, memory_hint, conversation = self._build_plan_context(user_input, past)
 
-        return self.llm.generate(
+        chunks = self.llm.astream(
             system_prompt=PLANNER_SYSTEM_PROMPT,
             user_prompt=f"""
     TASK STATE:
-    {self.state.summary()}
+    {state_info}
 
     {memory_hint}
 
     CONVERSATION CONTEXT:
-    {self.memory.context()}
+    {conversation}
 
     USER REQUEST:
     {user_input}
@@ -173,8 +460,84 @@ class Orchestrator:
     """
         )
 
+        with timed("plan") as info:
+            parser = PlanStreamParser()
+            async for chunk in chunks:
+                for step in parser.feed(chunk):
+                    self._on_plan_step(len(parser.steps) - 1, step)
+            for step in parser.close():
+                self._on_plan_step(len(parser.steps) - 1, step)
+            info["steps"] = len(parser.steps)
+
+        return parser.text, parser.steps
+
+    def _on_plan_step(self, index: int, step: str):
+        """
+        Called for each step as soon as the planner has streamed it.
+        In pipelined mode, starts the EXECUTE request of the first
+        executable step while the rest of the plan is still generating.
+        """
+        if not self.pipelined or self._speculative:
+            return
+
+        if self._normalize_step_type(step) == "EXECUTABLE":
+            self._speculative[index] = (
+                step,
+                asyncio.ensure_future(self._ask_tool_call(step)),
+            )
+
+    def _cancel_speculation(self):
+        for _, request in self._speculative.values():
+            request.cancel()
+        self._speculative.clear()
+
+        if self._warm_up is not None:
+            self._warm_up.cancel()
+            self._warm_up = None
+
+    def _build_plan_context(self, user_input: str, past):
+        """
+        Ranks state fields, recalled outcomes and conversation turns and
+        packs them into `context_budget` tokens, so the planner prompt
+        stays flat as memory grows.
+
+        Ranking: state fields first (in summary order), then outcomes by
+        relevance score, then turns by recency.
+        """
+        builder = ContextBuilder(self.context_budget, self.count_tokens)
+        builder.reserve(PLANNER_SYSTEM_PROMPT)
+        builder.reserve(user_input)
+
+        fields = self.state.summary_fields()
+        for i, (label, value) in enumerate(fields):
+            builder.add("state", f"{label}:\n{value}", score=3.0 - i / len(fields), order=i)
+
+        for i, (score, p) in enumerate(past):
+            builder.add(
+                "memory",
+                f"- {p['summary']} (artifacts: {p['artifacts']})",
+                score=1.0 + score,
+                order=i,
+            )
+
+        turns = self.memory.turns()
+        for i, turn in enumerate(turns):
+            builder.add("conversation", turn, score=0.5 * (i + 1) / len(turns), order=i)
+
+        sections = builder.pack()
+
+        memory_hint = ""
+        if sections.get("memory"):
+            memory_hint = "\nPAST SUCCESSFUL OUTCOMES:\n" + "\n".join(sections["memory"])
+
+        return (
+            "\n" + "\n\n".join(sections.get("state", [])) + "\n",
+            memory_hint,
+            "\n".join(sections.get("conversation", [])),
+        )
+
 
-    def _execute_phase(self, user_input: str):
+    async def _execute_phase(self, user_input: str):
         current_step = self.state.current_step()
 
         if current_step is None:
@@ -185,7 +548,8 @@ class Orchestrator:
 
         if step_type == "NON_EXECUTABLE":
             self._log_progress()
-            self.state.advance_step()
+            self._publish_step("step_skipped", self.state.current_step_index)
+            self.state.advance_step("skipped")
             return None
 
         # 2️⃣ STEP 5: Automatic artifact intent inference (BEFORE enforcement)
@@ -204,20 +568,172 @@ class Orchestrator:
         #     raise RuntimeError("EXECUTE blocked: no artifact intent")
 
         # 4️⃣ Attempt EXECUTE (max 2 tries)
+        self._publish_step("step_started", self.state.current_step_index)
+        tool_call = await self._request_tool_call(current_step, self.state.current_step_index)
+
+        # ✅ Explicit NO_ACTION
+        if tool_call is None:
+            self._log_progress()
+            self._publish_step("step_done", self.state.current_step_index, action=None)
+            self.state.advance_step()
+
+        return tool_call
+
+    async def _execute_parallel(self, user_input: str):
+        """
+        Parallel EXECUTE: every executable step starts as soon as the steps
+        it depends on are done. Each step still gets the same gated
+        treatment (one tool call, max 2 attempts, artifact tracking).
+        """
+        steps = self.state.plan
+        step_types = [self._normalize_step_type(step) for step in steps]
+        artifacts = [
+            self._infer_artifact_intent(user_input, step) if t == "EXECUTABLE" else None
+            for step, t in zip(steps, step_types)
+        ]
+        nodes = build_step_graph(steps, step_types, artifacts)
+
+        # Steps finished before a resume stay finished
+        done = {
+            node.index for node in nodes
+            if self.state.step_status[node.index] in FINISHED_STATUSES
+        }
+
+        for node in nodes:
+            if not node.executable and node.index not in done:
+                self.state.mark_step(node.index, "skipped")
+                self._log_step(node.index)
+                self._publish_step("step_skipped", node.index)
+        await self._checkpoint()
+
+        pending = {node.index: node for node in nodes if node.executable and node.index not in done}
+        running = {}
+
+        try:
+            while pending or running:
+                for index, node in list(pending.items()):
+                    if node.deps <= done:
+                        del pending[index]
+                        self.state.mark_step(index, "running")
+                        self._publish_step("step_started", index)
+                        running[asyncio.ensure_future(self._execute_node(node))] = index
+
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+                for future in finished:
+                    index = running.pop(future)
+                    future.result()  # re-raises step failures
+                    done.add(index)
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
+
+    async def _execute_node(self, node):
+        try:
+            tool_call = await self._request_tool_call(node.text, node.index)
+        except RuntimeError:
+            self.state.mark_step(node.index, "failed")
+            raise
+
+        if tool_call is not None:
+            await self._run_tool_call(tool_call, node.artifact_role, node.index)
+
+        self.state.mark_step(node.index, "done")
+        self._log_step(node.index)
+        self._publish_step("step_done", node.index, action=_action(tool_call))
+        await self._checkpoint()
+
+    async def _run_tool_call(self, tool_call: dict, role, step: int):
+        """
+        Runs a tool call or a batch ({"calls": [...]}) and records the
+        files written as artifacts of plan step `step`, with `role`.
+        """
+        if "calls" in tool_call:
+            calls = tool_call["calls"]
+            results = await self.tool_executor.aexecute_batch(calls)
+        else:
+            calls = [tool_call]
+            results = [await self.tool_executor.aexecute(tool_call["tool"], tool_call["args"])]
+
+        for call, result in zip(calls, results):
+            self._publish("tool_result", index=step, tool=call["tool"], args=call["args"], result=_preview(result))
+
+        # Artifact tracking (write_file example)
+        for call in calls:
+            if call["tool"] == "write_file":
+                path = call["args"]["path"]
+                meta = await asyncio.to_thread(self._commit_artifact, path)
+                self.state.add_artifact(path, role=role or "unknown", step=step, **meta)
+                self._publish("artifact", index=step, name=path, role=role or "unknown", **meta)
+
+        return results
+
+    def _commit_artifact(self, path: str) -> dict:
+        # In a workspace the file moves into the content-addressed store
+        if self.workspace is not None:
+            return self.workspace.commit(path)
+
+        digest, size = file_digest(path)
+        return {"path": os.path.abspath(path), "sha256": digest, "size": size}
+
+    async def _request_tool_call(self, step: str, index: int):
+        """
+        Tool call for plan step `index`: reuses the speculative request if
+        one was started for it, else asks the executor now. Returns the
+        tool call dict, or None for NO_ACTION. Invalidates the plan and
+        raises after the second failed attempt.
+        """
+        speculative = self._speculative.pop(index, None)
+
+        try:
+            if speculative and speculative[0] == step:
+                return await speculative[1]
+            return await self._ask_tool_call(step)
+        except ExecuteFailure as e:
+            self.state.invalidate_plan(
+                f"EXECUTE failed after retry: {e}"
+            )
+            self._log_progress()
+            raise RuntimeError("EXECUTE phase violation")
+
+    def _executor_session(self):
+        """
+        EXECUTE requests of one task share the system prompt and the task
+        preamble; a session keeps that prefix byte-identical (and first),
+        so the model server's KV cache prefills it once per task.
+        """
+        if self._session is None or self._session_task != self.state.task:
+            self._session = self.llm.session(
+                EXECUTOR_SYSTEM_PROMPT,
+                f"""
+    TASK:
+    {self.state.task}
+
+""",
+            )
+            self._session_task = self.state.task
+        return self._session
+
+    async def _ask_tool_call(self, step: str):
+        """
+        Asks the executor for the tool call of one step (max 2 tries).
+        Leaves TaskState alone, so it can run before the plan is accepted.
+        """
         attempts = 0
         last_error = None
 
         while attempts < 2:
             attempts += 1
 
-            response = self.llm.generate(
-                system_prompt=EXECUTOR_SYSTEM_PROMPT,
-                user_prompt=f"""
-    TASK:
-    {self.state.task}
+            # Stream and stop reading once the JSON / NO_ACTION is complete
+            options = {}
+            if self._tool_call_format is not None:
+                options["format"] = self._tool_call_format
 
-    CURRENT STEP:
-    {current_step}
+            chunks = self._executor_session().astream(
+                f"""    CURRENT STEP:
+    {step}
 
     STRICT RULES:
     - Return ONLY valid JSON OR the string NO_ACTION
@@ -227,18 +743,34 @@ class Orchestrator:
     - Do NOT include extra text
 
     This is attempt {attempts}/2.
-    """
-            ).strip()
+    """,
+                **options,
+            )
+            if attempts > 1:
+                METRICS.inc("engine_execute_retries_total")
 
-            # ✅ Explicit NO_ACTION
-            if response == "NO_ACTION":
-                self._log_progress()
-                self.state.advance_step()
+            extractor = ToolCallExtractor()
+            with timed("execute", attempt=attempts):
+                response = (await acollect(chunks, cutoff=extractor)).strip()
+
+            if response == NO_ACTION:
                 return None
 
-            # ✅ Try parsing JSON
+            # ✅ Take the first JSON object, even if wrapped in prose / fences
             try:
-                tool_call = json.loads(response)
+                tool_call = extractor.value
+
+                if tool_call is None:
+                    raise ValueError("No JSON tool call in response")
+
+                if isinstance(tool_call, dict) and tool_call.get("tool") == NO_ACTION:
+                    return None
+
+                # Several read-only calls answered at once
+                if isinstance(tool_call, dict) and "calls" in tool_call:
+                    TOOLS.validate_batch(tool_call["calls"])
+                    METRICS.inc("engine_tool_batch_calls_total", len(tool_call["calls"]))
+                    return {"calls": tool_call["calls"]}
 
                 if (
                     not isinstance(tool_call, dict)
@@ -248,91 +780,38 @@ class Orchestrator:
                     self._log_progress()
                     raise ValueError("Malformed tool call")
 
+                # Bad arguments cost a retry here, not a failed tool run
+                TOOLS.validate(tool_call["tool"], tool_call["args"])
+
+                if extractor.offset:
+                    METRICS.inc("engine_execute_extracted_total")
+
                 return tool_call
 
             except Exception as e:
                 last_error = str(e)
 
         # 5️⃣ Hard failure after retry
-        self.state.invalidate_plan(
-            f"EXECUTE failed after retry: {last_error}"
-        )
-        self._log_progress()
-        raise RuntimeError("EXECUTE phase violation")
+        raise ExecuteFailure(last_error)
 
     
     def _validate_plan_output(self, plan: str):
-        forbidden_code_tokens = [
-            "def ", 
-            "import ", 
-            "```", 
-            "print(", 
-            "if __name__",
-            "from ",
-            "while "
-        ]
-
-        for token in forbidden_code_tokens:
-            if token in plan:
-                raise RuntimeError(
-                    f"Planner violation: forbidden token detected -> {token}"
-                )
-
-        for line in plan.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            
-            if line.lower().startswith(("plan", "here is")):
-                continue
-
-            if line.startswith(("*", "-")):
-                raise RuntimeError(
-                    "Planner violation: Bullet points/substeps detected"
-                )
-            
-            
+        violations = self.rules.plan_violations(plan)
+        if violations:
+            raise RuntimeError(violations[0])
 
     def _infer_artifact_intent(self, user_input: str, current_step: str):
         """
         Determine expected artifact based on task + current step.
-        This function must be deterministic and conservative.
+        Deterministic and conservative (see the artifact rules in core/rules.json).
         """
+        return self.rules.artifact(user_input, current_step)
 
-        task = user_input.lower()
-        step = current_step.lower()
-
-        # --------------------------------------------------
-        # SAVE / WRITE / EXPORT steps (highest priority)
-        # --------------------------------------------------
-        if any(word in step for word in ["save", "write", "export", "persist"]):
-            # CSV export
-            if "csv" in step:
-                return ("output.csv", "data")
+    def _publish(self, event: str, **fields):
+        self.events.publish(event, task_id=self.task_id, **fields)
 
-            # JSON export
-            if "json" in step:
-                return ("output.json", "data")
-
-            # Generic save fallback
-            return ("output.txt", "data")
-
-        # --------------------------------------------------
-        # CODE GENERATION
-        # --------------------------------------------------
-        if any(word in task for word in ["python", "function", "script", "program"]):
-            # ADD "define" and "code" to this list below
-            if any(word in step for word in ["implement", "generate", "create", "define", "code"]): 
-                return ("main.py", "code")
-
-        # --------------------------------------------------
-        # DOCUMENTATION
-        # --------------------------------------------------
-        if any(word in task for word in ["readme", "documentation", "doc"]):
-            return ("README.md", "doc")
-
-        return None
-    
+    def _publish_step(self, event: str, index: int, **fields):
+        self._publish(event, index=index, step=self.state.plan[index], total=len(self.state.plan), **fields)
 
     def _log_progress(self):
         print(
@@ -340,82 +819,43 @@ class Orchestrator:
             f"Step {self.state.current_step_index + 1}"
             f"/{len(self.state.plan)} | "
             f"Current: {self.state.current_step()} | "
-            f"Artifacts: {self.state.artifacts}"
+            f"Artifacts: {self.state.artifacts_text}"
         )
 
-    def _validate_reflection(self, reflection: str) -> bool:
-        if not self.state.artifacts:
-            return False
-
-        reflection_l = reflection.lower()
-
-        # 1️⃣ Must mention at least one artifact
-        if not any(artifact.lower() in reflection_l for artifact in self.state.artifacts):
-            return False
-
-        # 2️⃣ Must indicate completion or persistence
-        completion_signals = (
-            "saved",
-            "written",
-            "created",
-            "stored",
-            "persisted",
-            "completed",
+    def _log_step(self, index: int):
+        print(
+            f"[PROGRESS] "
+            f"Step {index + 1}/{len(self.state.plan)} "
+            f"{self.state.step_status[index]} | "
+            f"{self.state.plan[index]} | "
+            f"Artifacts: {self.state.artifacts_text}"
         )
 
-        if not any(signal in reflection_l for signal in completion_signals):
-            return False
-
-        return True
-
+    def _validate_reflection(self, reflection: str) -> bool:
+        return self.rules.reflection_ok(reflection, self.state.artifacts)
 
     def _normalize_step_type(self, step: str) -> str:
         """
         Returns: 'NON_EXECUTABLE' or 'EXECUTABLE'
         """
-
-        step_lower = step.lower()
-
-        non_exec_verbs = (
-            "analyze",
-            "design",
-            "define",
-            "identify",
-            "determine",
-            "verify",
-            "validate",
-            "compare",
-            "evaluate",
-            "plan",
-            "understand",
-        )
-
-        exec_verbs = (
-            "save",
-            "write",
-            "export",
-            "persist",
-            "store",
-        )
-
-        for verb in non_exec_verbs:
-            if step_lower.startswith(verb):
-                return "NON_EXECUTABLE"
-
-        for verb in exec_verbs:
-            if step_lower.startswith(verb):
-                return "EXECUTABLE"
-
-        # Default: conservative
-        return "NON_EXECUTABLE"
-    
-    
-
-
-
+        return self.rules.step_type(step)
 
 
+def _action(tool_call):
+    # Tool name(s) of an executed tool call, for step_done events
+    if tool_call is None:
+        return None
+    if "calls" in tool_call:
+        return [call["tool"] for call in tool_call["calls"]]
+    return tool_call["tool"]
 
 
+def _warm_up_done(future: asyncio.Future):
+    # Best effort: a backend that failed to load fails the real requests
+    if not future.cancelled() and future.exception() is not None:
+        emit("warm_up_failed", error=str(future.exception()))
 
 
+def _preview(result, limit: int = 500) -> str:
+    text = str(result)
+    return text if len(text) <= limit else text[:limit] + f"... ({len(text)} chars)"
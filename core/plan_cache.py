@@ -0,0 +1,129 @@
+# core/plan_cache.py
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from core.metrics import METRICS
+
+
+# Literal kinds abstracted out of task text, in matching order
+_LITERALS = re.compile(
+    r"""(?P<str>"[^"]*"|'[^']*')"""
+    r"""|(?P<file>\b[\w\-]+\.[A-Za-z][A-Za-z0-9]{0,4}\b)"""
+    r"""|(?P<num>(?<![\w.])\d+(?:\.\d+)?(?!\w|\.\d))"""
+)
+
+_SLOT = "{{{{{}}}}}"  # -> "{{0}}", "{{1}}", ...
+_SLOT_RE = re.compile(r"\{\{(\d+)\}\}")
+
+
+def templatize(task: str) -> Tuple[str, List[str]]:
+    """
+    Splits a task into (signature, parameters).
+
+    "Save fibonacci up to 50 to out.csv" ->
+    ("save fibonacci up to <num> to <file>", ["50", "out.csv"])
+    """
+    params: List[str] = []
+
+    def abstract(match):
+        params.append(match.group())
+        return f"<{match.lastgroup}>"
+
+    signature = _LITERALS.sub(abstract, task.strip())
+    signature = re.sub(r"\s+", " ", signature).lower()
+    return signature, params
+
+
+def _params_pattern(params: List[str]):
+    # One alternation, longest first, so a slot written for one parameter
+    # is never rewritten by the next ("{{0}}" vs a parameter "0")
+    values = sorted(set(params), key=len, reverse=True)
+    alternation = "|".join(re.escape(v) for v in values)
+    return re.compile(rf"(?<![\w.])(?:{alternation})(?!\w|\.\w)")
+
+
+class PlanCache:
+    """
+    Validated plans of successful runs, keyed by task template.
+
+    Parameter values of the original task that appear in its steps are
+    replaced by slots, and refilled from the new task on replay, so
+    "... up to 50 ..." can reuse the plan made for "... up to 100 ...".
+    A replayed plan that fails is dropped (`invalidate`).
+    """
+
+    def __init__(self, path: str = "memory/plan_cache.db"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS plans (
+                    signature TEXT PRIMARY KEY,
+                    steps TEXT NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+
+    def lookup(self, task: str) -> Optional[List[str]]:
+        signature, params = templatize(task)
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT steps FROM plans WHERE signature = ?", (signature,)
+            ).fetchone()
+
+            if row is None:
+                METRICS.inc("engine_plan_cache_total", result="miss")
+                return None
+
+            with self._db:
+                self._db.execute(
+                    "UPDATE plans SET hits = hits + 1 WHERE signature = ?", (signature,)
+                )
+
+        METRICS.inc("engine_plan_cache_total", result="hit")
+        return [
+            _SLOT_RE.sub(lambda m: params[int(m.group(1))], step)
+            for step in json.loads(row[0])
+        ]
+
+    def store(self, task: str, steps: List[str]):
+        signature, params = templatize(task)
+
+        templated = list(steps)
+        if params:
+            # A value repeated in the task keeps its first slot
+            slots = {}
+            for i, value in enumerate(params):
+                slots.setdefault(value, _SLOT.format(i))
+
+            pattern = _params_pattern(params)
+            templated = [pattern.sub(lambda m: slots[m.group()], step) for step in steps]
+
+        with self._lock, self._db:
+            self._db.execute(
+                """
+                INSERT INTO plans (signature, steps, created_at) VALUES (?, ?, ?)
+                ON CONFLICT(signature) DO UPDATE SET steps = excluded.steps
+                """,
+                (signature, json.dumps(templated), time.time()),
+            )
+
+    def invalidate(self, task: str):
+        signature, _ = templatize(task)
+
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM plans WHERE signature = ?", (signature,))
+
+        METRICS.inc("engine_plan_cache_total", result="invalidated")
@@ -0,0 +1,247 @@
+# core/rules.py
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from core.config import RULES_PATH
+
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "rules.json")
+
+
+class KeywordMatcher:
+    """
+    Finds which of several keyword groups occur in a text (substring
+    semantics, like `any(word in text for word in group)` per group).
+
+    Keywords are deduplicated across groups and each carries a bitmask of
+    the groups it belongs to, so a text is scanned once per distinct
+    keyword and the result is a single int (bit i set = group i matched).
+    """
+
+    def __init__(self, groups: Sequence[Sequence[str]]):
+        masks: Dict[str, int] = {}
+        for gid, words in enumerate(groups):
+            for word in words:
+                masks[word] = masks.get(word, 0) | (1 << gid)
+
+        self._words = tuple(masks.items())
+        self._prefixes = tuple(tuple(words) for words in groups)
+
+    def groups_in(self, text: str) -> int:
+        found = 0
+        for word, mask in self._words:
+            if word in text:
+                found |= mask
+        return found
+
+    def first_prefix_group(self, text: str) -> Optional[int]:
+        """
+        Index of the first group with a keyword that starts `text`.
+        """
+        for gid, prefixes in enumerate(self._prefixes):
+            if prefixes and text.startswith(prefixes):
+                return gid
+        return None
+
+
+class _ArtifactRule(NamedTuple):
+    task: int  # group bitmasks that must all be matched
+    step: int
+    artifact: Tuple[str, str]
+
+
+class RuleEngine:
+    """
+    Step classification, artifact inference and plan/reflection checks,
+    driven by a rule set (see core/rules.json) compiled once into
+    keyword matchers. Each distinct step and task is lowered and scanned
+    once; later lookups reuse the cached scan.
+
+    Rule sets are plain dicts:
+    - keywords: named keyword lists, referenced by name in the rules below
+    - step_types: [{type, prefixes}], the first whose prefix starts the
+      step wins; `default_step_type` otherwise
+    - artifacts: [{task, step, artifact, role}], first match wins; `task`
+      and `step` are lists of keyword groups that must all occur
+    - plan: forbidden_tokens (case-sensitive), ignored_line_prefixes,
+      bullet_prefixes
+    - reflection: completion_signals
+    """
+
+    def __init__(self, rules: dict):
+        self.rules = rules
+        keywords = rules.get("keywords", {})
+
+        def words(group) -> Tuple[str, ...]:
+            if isinstance(group, str):
+                if group not in keywords:
+                    raise ValueError(f"Unknown keyword group in rules: {group}")
+                group = keywords[group]
+            return tuple(w.lower() for w in group)
+
+        # Step types: first rule whose prefix matches wins
+        type_rules = rules.get("step_types", [])
+        self._step_types = [r["type"] for r in type_rules]
+        self._type_matcher = KeywordMatcher([words(r["prefixes"]) for r in type_rules])
+        self.default_step_type = rules.get("default_step_type", "NON_EXECUTABLE")
+
+        # Artifact rules: keyword groups interned per field ("task" / "step")
+        group_ids: Dict[str, Dict[Tuple[str, ...], int]] = {"task": {}, "step": {}}
+
+        def intern(field: str, groups) -> int:
+            ids = group_ids[field]
+            mask = 0
+            for g in groups:
+                mask |= 1 << ids.setdefault(words(g), len(ids))
+            return mask
+
+        self._artifact_rules = [
+            _ArtifactRule(
+                intern("task", r.get("task", [])),
+                intern("step", r.get("step", [])),
+                (r["artifact"], r.get("role", "unknown")),
+            )
+            for r in rules.get("artifacts", [])
+        ]
+        self._task_matcher = KeywordMatcher(list(group_ids["task"]))
+        self._step_matcher = KeywordMatcher(list(group_ids["step"]))
+
+        plan = rules.get("plan", {})
+        self._forbidden = list(plan.get("forbidden_tokens", []))
+        self._forbidden_matcher = KeywordMatcher([(t,) for t in self._forbidden])
+        self._ignored_lines = tuple(p.lower() for p in plan.get("ignored_line_prefixes", []))
+        self._bullets = tuple(plan.get("bullet_prefixes", []))
+
+        reflection = rules.get("reflection", {})
+        self._signals = KeywordMatcher([words(reflection.get("completion_signals", []))])
+
+        # Plans are re-analyzed by several phases; steps repeat across tasks
+        self.artifact = lru_cache(maxsize=4096)(self.artifact)
+        self._scan_step = lru_cache(maxsize=4096)(self._scan_step)
+        self._scan_task = lru_cache(maxsize=256)(self._scan_task)
+
+    # -------------------------
+    # Steps
+    # -------------------------
+    def step_type(self, step: str) -> str:
+        return self._scan_step(step)[0]
+
+    def artifact(self, task: str, step: str) -> Optional[Tuple[str, str]]:
+        """
+        (name, role) of the artifact `step` is expected to produce in the
+        context of `task`, or None.
+        """
+        step_groups = self._scan_step(step)[1]
+        task_groups = self._scan_task(task)
+
+        return next(
+            (
+                r.artifact
+                for r in self._artifact_rules
+                if r.step & step_groups == r.step and r.task & task_groups == r.task
+            ),
+            None,
+        )
+
+    def _scan_step(self, step: str) -> Tuple[str, int]:
+        # The single pass over a step: lowered once, matched against the
+        # type prefixes and the artifact keywords
+        step_l = step.lower()
+
+        type_id = self._type_matcher.first_prefix_group(step_l)
+        step_type = self.default_step_type if type_id is None else self._step_types[type_id]
+
+        return step_type, self._step_matcher.groups_in(step_l)
+
+    def _scan_task(self, task: str) -> int:
+        return self._task_matcher.groups_in(task.lower())
+
+    # -------------------------
+    # Plan / reflection checks
+    # -------------------------
+    def plan_violations(self, plan: str) -> List[str]:
+        violations = self._forbidden_in(plan)
+
+        for line in plan.splitlines():
+            line = line.strip()
+            if not line or line.lower().startswith(self._ignored_lines):
+                continue
+            if self._bullets and line.startswith(self._bullets):
+                violations.append("Planner violation: Bullet points/substeps detected")
+
+        return violations
+
+    def reflection_ok(self, reflection: str, artifacts: Sequence[str]) -> bool:
+        """
+        A reflection must name at least one artifact and signal completion.
+        """
+        if not artifacts:
+            return False
+
+        reflection_l = reflection.lower()
+        if not any(artifact.lower() in reflection_l for artifact in artifacts):
+            return False
+
+        return bool(self._signals.groups_in(reflection_l))
+
+    def _forbidden_in(self, text: str) -> List[str]:
+        found = self._forbidden_matcher.groups_in(text)
+        return [
+            f"Planner violation: forbidden token detected -> {token}"
+            for gid, token in enumerate(self._forbidden)
+            if found >> gid & 1
+        ]
+
+
+# =========================================================
+# Loading
+# =========================================================
+def load_rules(path: Optional[str] = None) -> RuleEngine:
+    """
+    Builds an engine from the default rules, overlaid with `path`
+    (JSON, or YAML if PyYAML is installed) when given.
+
+    The overlay replaces top-level sections, except `keywords`, which is
+    merged by name, so adding a project verb only needs e.g.
+    {"keywords": {"executable_verbs": ["save", "write", ..., "upload"]}}.
+    """
+    rules = _read_rules(DEFAULT_RULES_PATH)
+
+    if path:
+        overlay = _read_rules(path)
+        keywords = {**rules.get("keywords", {}), **overlay.get("keywords", {})}
+        rules.update(overlay)
+        rules["keywords"] = keywords
+
+    return RuleEngine(rules)
+
+
+def _read_rules(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError(f"PyYAML is required to load {path}")
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+
+_default_rules: Optional[RuleEngine] = None
+_default_lock = threading.Lock()
+
+
+def get_rules() -> RuleEngine:
+    """
+    Process-wide rule engine, compiled on first use from the default
+    rules and RULES_PATH (core/config.py).
+    """
+    global _default_rules
+
+    with _default_lock:
+        if _default_rules is None:
+            _default_rules = load_rules(RULES_PATH)
+        return _default_rules
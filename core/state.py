@@ -1,8 +1,43 @@
 # core/state.py
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+
+FINISHED_STATUSES = ("done", "skipped")
 
 
 class TaskState:
+    """
+    Mutable state of one task. All changes go through the methods below,
+    which keeps two things cheap:
+
+    - `summary_fields()` / `summary()` / `artifacts` are cached and only
+      rebuilt after a mutation.
+    - `snapshot()` is O(1): the copy shares containers with the live
+      state, and whichever side mutates first copies them (copy-on-write).
+
+    `to_dict()` / `restore()` round-trip it through a checkpoint.
+    """
+
+    __slots__ = (
+        "task",
+        "plan",
+        "current_step_index",
+        "plan_valid",
+        "step_status",
+        "expected_artifact",
+        "expected_artifact_role",
+        "artifact_roles",
+        "artifact_meta",
+        "last_error",
+        "last_tool",
+        "_finished",
+        "_shared",
+        "_summary_fields",
+        "_summary",
+        "_artifact_list",
+        "_artifact_text",
+    )
+
     def __init__(self):
         # -------------------------
         # Task
@@ -15,6 +50,9 @@ class TaskState:
         self.plan: List[str] = []
         self.current_step_index: int = 0
         self.plan_valid: bool = True
+        # Per-step status (pending/running/done/skipped/failed); in
+        # parallel mode current_step_index counts finished steps
+        self.step_status: List[str] = []
 
         # -------------------------
         # Artifact intent (KEY CHANGE)
@@ -25,8 +63,10 @@ class TaskState:
         # -------------------------
         # Artifacts (actual outputs)
         # -------------------------
-        self.artifacts: List[str] = []
+        # Ordered set of artifact names (insertion order) -> role
         self.artifact_roles: Dict[str, str] = {}
+        # name -> {path, sha256, size, role, step} of the latest write
+        self.artifact_meta: Dict[str, dict] = {}
 
         # -------------------------
         # Diagnostics
@@ -35,6 +75,90 @@ class TaskState:
         # Tool chaining (controlled)
         self.last_tool: Optional[str] = None
 
+        self._finished = 0
+        self._shared = False
+        self._changed(artifacts=True)
+
+    # =========================================================
+    # Caches / copy-on-write
+    # =========================================================
+    def _changed(self, artifacts: bool = False):
+        self._summary_fields = None
+        self._summary = None
+        if artifacts:
+            self._artifact_list = None
+            self._artifact_text = None
+
+    def _own(self):
+        # Called before mutating a container that a snapshot may share
+        if self._shared:
+            self.step_status = list(self.step_status)
+            self.artifact_roles = dict(self.artifact_roles)
+            self.artifact_meta = dict(self.artifact_meta)
+            self._shared = False
+
+    def snapshot(self) -> "TaskState":
+        """
+        Point-in-time copy (e.g. a per-step checkpoint). Neither side sees
+        the other's later changes. Plan lists are replaced, never
+        mutated, so they stay shared.
+        """
+        clone = TaskState.__new__(TaskState)
+        for name in TaskState.__slots__:
+            setattr(clone, name, getattr(self, name))
+
+        clone._shared = True
+        self._shared = True
+        return clone
+
+    # =========================================================
+    # Checkpoints (core/checkpoint.py)
+    # =========================================================
+    def to_dict(self) -> dict:
+        # JSON-safe; artifacts as [name, role] pairs to keep their order
+        return {
+            "task": self.task,
+            "plan": list(self.plan),
+            "current_step_index": self.current_step_index,
+            "plan_valid": self.plan_valid,
+            "step_status": list(self.step_status),
+            "expected_artifact": self.expected_artifact,
+            "expected_artifact_role": self.expected_artifact_role,
+            "artifacts": [[name, role] for name, role in self.artifact_roles.items()],
+            "artifact_meta": dict(self.artifact_meta),
+            "last_error": self.last_error,
+            "last_tool": self.last_tool,
+        }
+
+    def restore(self, data: dict):
+        """
+        Loads a `to_dict()` checkpoint in place, ready to continue: steps
+        that had not finished (pending, running, failed) are pending again
+        and the plan is valid. `last_error` is kept as context.
+        """
+        self.task = data["task"]
+        self.plan = list(data["plan"])
+        self.plan_valid = True
+        self.step_status = [
+            status if status in FINISHED_STATUSES else "pending"
+            for status in data["step_status"]
+        ]
+        self._finished = sum(status in FINISHED_STATUSES for status in self.step_status)
+        # Sequential execution continues at the first unfinished step
+        self.current_step_index = next(
+            (i for i, status in enumerate(self.step_status) if status not in FINISHED_STATUSES),
+            len(self.plan),
+        )
+
+        self.expected_artifact = data["expected_artifact"]
+        self.expected_artifact_role = data["expected_artifact_role"]
+        self.artifact_roles = {name: role for name, role in data["artifacts"]}
+        self.artifact_meta = dict(data["artifact_meta"])
+        self._shared = False
+
+        self.last_error = data["last_error"]
+        self.last_tool = data["last_tool"]
+        self._changed(artifacts=True)
 
     # =========================================================
     # Task / Plan management
@@ -46,10 +170,13 @@ class TaskState:
         self.plan = []
         self.current_step_index = 0
         self.plan_valid = True
+        self.step_status = []
+        self._finished = 0
 
-        # Reset artifacts
-        self.artifacts.clear()
-        self.artifact_roles.clear()
+        # Reset artifacts (fresh containers: nothing left to share)
+        self.artifact_roles = {}
+        self.artifact_meta = {}
+        self._shared = False
         self.expected_artifact = None
         self.expected_artifact_role = None
         self.last_tool = None
@@ -57,11 +184,15 @@ class TaskState:
 
         # Reset diagnostics
         self.last_error = None
+        self._changed(artifacts=True)
 
     def set_plan(self, plan_steps: List[str]):
         self.plan = plan_steps
         self.current_step_index = 0
         self.plan_valid = True
+        self.step_status = ["pending"] * len(plan_steps)
+        self._finished = 0
+        self._changed()
 
     def current_step(self) -> Optional[str]:
         if not self.plan_valid:
@@ -70,12 +201,30 @@ class TaskState:
             return None
         return self.plan[self.current_step_index]
 
-    def advance_step(self):
+    def advance_step(self, status: str = "done"):
+        if self.current_step_index < len(self.step_status):
+            self._set_status(self.current_step_index, status)
         self.current_step_index += 1
+        self._changed()
+
+    def mark_step(self, index: int, status: str):
+        """
+        Out-of-order status update used by parallel execution.
+        """
+        self._set_status(index, status)
+        self.current_step_index = self._finished
+        self._changed()
+
+    def _set_status(self, index: int, status: str):
+        self._own()
+        previous = self.step_status[index]
+        self.step_status[index] = status
+        self._finished += (status in FINISHED_STATUSES) - (previous in FINISHED_STATUSES)
 
     def invalidate_plan(self, reason: str):
         self.plan_valid = False
         self.last_error = reason
+        self._changed()
 
     def is_complete(self) -> bool:
         return self.plan_valid and self.current_step_index >= len(self.plan)
@@ -86,10 +235,12 @@ class TaskState:
     def set_expected_artifact(self, name: str, role: str):
         self.expected_artifact = name
         self.expected_artifact_role = role
+        self._changed()
 
     def clear_expected_artifact(self):
         self.expected_artifact = None
         self.expected_artifact_role = None
+        self._changed()
 
     def has_artifact_intent(self) -> bool:
         return self.expected_artifact is not None
@@ -97,11 +248,31 @@ class TaskState:
     # =========================================================
     # Artifact tracking (actual results)
     # =========================================================
-    def add_artifact(self, name: str, role: str):
-        if name not in self.artifacts:
-            self.artifacts.append(name)
-
+    @property
+    def artifacts(self) -> List[str]:
+        """
+        Artifact names in the order they were first written. Cached;
+        treat it as read-only.
+        """
+        if self._artifact_list is None:
+            self._artifact_list = list(self.artifact_roles)
+        return self._artifact_list
+
+    @property
+    def artifacts_text(self) -> str:
+        # Cached repr of `artifacts` for progress lines and prompts
+        if self._artifact_text is None:
+            self._artifact_text = str(self.artifacts)
+        return self._artifact_text
+
+    def add_artifact(self, name: str, role: str, step: Optional[int] = None, **meta):
+        """
+        `meta`: what is known about the written file (path, sha256, size).
+        """
+        self._own()
         self.artifact_roles[name] = role
+        self.artifact_meta[name] = {**meta, "role": role, "step": step}
+        self._changed(artifacts=True)
 
         # Fulfill intent if this was expected
         if self.expected_artifact == name:
@@ -110,7 +281,14 @@ class TaskState:
     # =========================================================
     # Introspection (debug + prompt context)
     # =========================================================
-    def summary(self) -> str:
+    def summary_fields(self) -> List[Tuple[str, str]]:
+        """
+        (label, value) pairs that make up `summary()`, in order, so prompt
+        assembly can budget them individually.
+        """
+        if self._summary_fields is not None:
+            return self._summary_fields
+
         plan_info = (
             "\n".join(
                 f"{i+1}. {step}"
@@ -120,35 +298,31 @@ class TaskState:
         )
 
         artifact_info = "\n".join(
-            f"- {name}: {self.artifact_roles.get(name, 'unknown')}"
-            for name in self.artifacts
+            f"- {name}: {role}"
+            for name, role in self.artifact_roles.items()
         )
 
-        return f"""
-TASK:
-{self.task or "None"}
-
-PLAN VALID:
-{self.plan_valid}
+        self._summary_fields = [
+            ("TASK", self.task or "None"),
+            ("PLAN VALID", str(self.plan_valid)),
+            ("CURRENT STEP", self.current_step() or "None"),
+            ("EXPECTED ARTIFACT", f"{self.expected_artifact or 'None'} ({self.expected_artifact_role or 'None'})"),
+            ("PLAN", plan_info),
+            ("ARTIFACTS", artifact_info if artifact_info else "None"),
+            ("LAST ERROR", self.last_error or "None"),
+        ]
+        return self._summary_fields
 
-CURRENT STEP:
-{self.current_step() or "None"}
-
-EXPECTED ARTIFACT:
-{self.expected_artifact or "None"} ({self.expected_artifact_role or "None"})
-
-PLAN:
-{plan_info}
-
-ARTIFACTS:
-{artifact_info if artifact_info else "None"}
+    def summary(self) -> str:
+        if self._summary is None:
+            self._summary = "\n" + "\n\n".join(
+                f"{label}:\n{value}"
+                for label, value in self.summary_fields()
+            ) + "\n"
+        return self._summary
 
-LAST ERROR:
-{self.last_error or "None"}
-"""
     def record_tool(self, tool_name: str):
         self.last_tool = tool_name
 
     def clear_last_tool(self):
         self.last_tool = None
-
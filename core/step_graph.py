@@ -0,0 +1,89 @@
+# core/step_graph.py
+import re
+from typing import List, Optional, Set, Tuple
+
+
+# Phrases that point back at earlier output without naming it
+BACK_REFERENCES = (
+    "previous",
+    "above",
+    "result",
+    "generated",
+    "output of",
+    "same file",
+)
+
+_STEP_REF = re.compile(r"\bsteps?\s+(\d+)")
+
+
+class StepNode:
+    def __init__(
+        self,
+        index: int,
+        text: str,
+        executable: bool,
+        artifact: Optional[Tuple[str, str]],
+    ):
+        self.index = index
+        self.text = text
+        self.executable = executable
+        self.artifact = artifact
+        self.deps: Set[int] = set()
+
+    @property
+    def artifact_name(self) -> Optional[str]:
+        return self.artifact[0] if self.artifact else None
+
+    @property
+    def artifact_role(self) -> Optional[str]:
+        return self.artifact[1] if self.artifact else None
+
+    def __repr__(self):
+        return f"StepNode({self.index}, deps={sorted(self.deps)}, artifact={self.artifact_name})"
+
+
+def build_step_graph(
+    steps: List[str],
+    step_types: List[str],
+    artifacts: List[Optional[Tuple[str, str]]],
+) -> List[StepNode]:
+    """
+    Turns a parsed plan into a dependency graph over its EXECUTABLE steps.
+
+    Non-executable steps have no LLM or tool work, so they get no edges.
+    Executable step j depends on an earlier executable step i when:
+    - both target the same artifact (writes stay ordered)
+    - j names step i explicitly ("as in step 2")
+    - j mentions i's artifact by file name or extension ("the csv")
+    - j refers back generically ("the generated ...", "previous ...")
+    - either has no inferred artifact (unknown effects act as a barrier)
+    """
+    nodes = [
+        StepNode(i, text, step_types[i] == "EXECUTABLE", artifacts[i])
+        for i, text in enumerate(steps)
+    ]
+    executable = [n for n in nodes if n.executable]
+
+    for pos, node in enumerate(executable):
+        text_l = node.text.lower()
+        explicit = {int(n) - 1 for n in _STEP_REF.findall(text_l)}
+        back_ref = any(phrase in text_l for phrase in BACK_REFERENCES)
+
+        for earlier in executable[:pos]:
+            if (
+                back_ref
+                or earlier.index in explicit
+                or node.artifact is None
+                or earlier.artifact is None
+                or earlier.artifact_name == node.artifact_name
+                or _mentions_artifact(text_l, earlier.artifact_name)
+            ):
+                node.deps.add(earlier.index)
+
+    return nodes
+
+
+def _mentions_artifact(text_l: str, name: str) -> bool:
+    name_l = name.lower()
+    ext = name_l.rpartition(".")[2] if "." in name_l else ""
+    return name_l in text_l or bool(ext and re.search(rf"\b{re.escape(ext)}\b", text_l))
@@ -0,0 +1,188 @@
+# core/streaming.py
+import json
+import re
+from typing import Any, AsyncIterator, Callable, List, Optional
+
+
+NO_ACTION = "NO_ACTION"
+
+
+class StreamCutoff(GeneratorExit):
+    """
+    Thrown into a stream when its reader stops on purpose because the
+    answer is complete (`acollect` with a cutoff). Any other close, e.g. a
+    cancelled task, is a plain GeneratorExit: what was read so far may be
+    an arbitrary prefix.
+    """
+    pass
+
+
+async def acollect(chunks: AsyncIterator[str], cutoff: Optional[Callable[[str], Optional[int]]] = None) -> str:
+    """
+    Joins a stream of chunks into one string.
+
+    `cutoff(text)` is checked after every chunk. When it returns an index,
+    the stream is cut off (see StreamCutoff) and closed, stopping
+    generation upstream, and the text is truncated at that index.
+    """
+    text = ""
+
+    try:
+        async for chunk in chunks:
+            text += chunk
+
+            if cutoff is None:
+                continue
+
+            end = cutoff(text)
+            if end is not None:
+                await _cut_off(chunks)
+                return text[:end]
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose:
+            await aclose()
+
+    return text
+
+
+async def _cut_off(chunks: AsyncIterator[str]):
+    athrow = getattr(chunks, "athrow", None)
+    if athrow is None:
+        return
+
+    try:
+        await athrow(StreamCutoff())
+    except (StreamCutoff, StopAsyncIteration):
+        pass
+
+
+# =========================================================
+# EXECUTE: stop as soon as the answer is complete
+# =========================================================
+class ToolCallExtractor:
+    """
+    Cutoff for EXECUTE responses (use as `acollect(chunks, cutoff=extractor)`).
+
+    Stops after a leading NO_ACTION, or after the first balanced JSON
+    object that parses, wherever it appears: models that wrap the call in
+    prose or ```json fences no longer cost a retry. The parsed object is
+    kept in `value`; `offset` is where it started.
+
+    Incremental: each call only scans the text added since the last one.
+    """
+
+    def __init__(self):
+        self.value: Optional[Any] = None
+        self.offset: Optional[int] = None
+
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def __call__(self, text: str) -> Optional[int]:
+        if self._start is None and self.value is None:
+            stripped = text.lstrip()
+            if stripped.startswith(NO_ACTION):
+                rest = stripped[len(NO_ACTION):]
+                # Wait for one more char so "NO_ACTIONS" is not mistaken for it
+                if not rest:
+                    return None
+                if not (rest[0].isalnum() or rest[0] == "_"):
+                    return len(text) - len(stripped) + len(NO_ACTION)
+                # "NO_ACTIONS ...": an ordinary answer, look for the JSON
+
+        return self._scan(text)
+
+    def _scan(self, text: str) -> Optional[int]:
+        i = self._pos
+
+        while i < len(text):
+            ch = text[i]
+            i += 1
+
+            if self._start is None:
+                if ch == "{":
+                    self._start, self._depth = i - 1, 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        self.value = json.loads(text[self._start:i])
+                        self.offset = self._start
+                        self._pos = i
+                        return i
+                    except ValueError:
+                        # "{braces in prose}": look again inside it
+                        i = self._start + 1
+                        self._start = None
+
+        self._pos = i
+        return None
+
+
+# =========================================================
+# PLAN: parse numbered steps while the plan streams in
+# =========================================================
+_STEP_LINE = re.compile(r"\d+[.)](.*)")
+
+
+def parse_step_line(line: str) -> Optional[str]:
+    """
+    Returns the step text of a numbered plan line ("3. Save it" or
+    "3) Save it"), else None.
+    """
+    match = _STEP_LINE.match(line)
+    if match:
+        return match.group(1).strip()
+    return None
+
+
+class PlanStreamParser:
+    """
+    Incrementally splits a streamed plan into numbered steps.
+
+    `feed` returns the steps completed by the new chunk, so callers can act
+    on step 1 while the model is still writing step 5.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.steps: List[str] = []
+        self._pending = ""
+
+    def feed(self, chunk: str) -> List[str]:
+        self.text += chunk
+        self._pending += chunk
+
+        *lines, self._pending = self._pending.split("\n")
+        return self._take(lines)
+
+    def close(self) -> List[str]:
+        lines, self._pending = [self._pending], ""
+        return self._take(lines)
+
+    def _take(self, lines: List[str]) -> List[str]:
+        new_steps = []
+        for line in lines:
+            step = parse_step_line(line)
+            if step is not None:
+                new_steps.append(step)
+
+        self.steps.extend(new_steps)
+        return new_steps
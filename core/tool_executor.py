@@ -1,11 +1,105 @@
 # core/tool_executor.py
+import asyncio
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.metrics import METRICS, timed
 from tools.registry import TOOLS
 
 
 class ToolExecutor:
+    """
+    Runs validated tool calls, one at a time or as a batch.
+
+    Results of cacheable tools are memoized for the current task (see
+    `reset`), keyed by the arguments plus the mtime/size of every file
+    they name. A non-cacheable tool that touches one of those paths
+    (write_file) drops the memoized results for it.
+
+    With a `workspace` (core/workspace.py), file arguments are resolved
+    inside it and may not leave it.
+    """
+
+    def __init__(self, workspace=None):
+        # memo key -> (absolute paths involved, result)
+        self._memo: Dict[str, Tuple[Tuple[str, ...], Any]] = {}
+        self._lock = threading.Lock()
+        self.workspace = workspace
+
+    def reset(self, workspace=None):
+        with self._lock:
+            self._memo.clear()
+            self.workspace = workspace
+
     def execute(self, tool_name: str, args: dict):
-        if tool_name not in TOOLS:
-            raise ValueError(f"Unknown tool: {tool_name}")
+        tool = TOOLS.get(tool_name)
+        tool.validate(args)
+
+        if self.workspace is not None:
+            args = dict(args)
+            for name in tool.path_args:
+                if isinstance(args.get(name), str):
+                    args[name] = self.workspace.resolve(args[name])
+
+        paths = tuple(
+            os.path.abspath(args[name]) for name in tool.path_args if isinstance(args.get(name), str)
+        )
+
+        key = None
+        if tool.cacheable:
+            key = _memo_key(tool_name, args, paths)
+            with self._lock:
+                entry = self._memo.get(key)
+
+            if entry is not None:
+                METRICS.inc("engine_tool_memo_total", result="hit", tool=tool_name)
+                return entry[1]
+            METRICS.inc("engine_tool_memo_total", result="miss", tool=tool_name)
+
+        with timed("tool", tool=tool_name):
+            result = tool.run(**args)
+
+        with self._lock:
+            if key is not None:
+                self._memo[key] = (paths, result)
+            elif paths:
+                self._forget(paths)
+
+        return result
+
+    def execute_batch(self, calls: List[dict]) -> List[Any]:
+        TOOLS.validate_batch(calls)
+        return [self.execute(call["tool"], call["args"]) for call in calls]
+
+    async def aexecute(self, tool_name: str, args: dict):
+        # Tools do blocking file IO; keep it off the event loop
+        return await asyncio.to_thread(self.execute, tool_name, args)
+
+    async def aexecute_batch(self, calls: List[dict]) -> List[Any]:
+        """
+        Batches only hold read-only calls (TOOLS.validate_batch), so they
+        all run concurrently; results come back in call order.
+        """
+        TOOLS.validate_batch(calls)
+        return await asyncio.gather(
+            *(self.aexecute(call["tool"], call["args"]) for call in calls)
+        )
+
+    def _forget(self, paths: Tuple[str, ...]):
+        touched = set(paths)
+        for key in [k for k, (p, _) in self._memo.items() if touched.intersection(p)]:
+            del self._memo[key]
+
+
+def _memo_key(tool_name: str, args: dict, paths: Tuple[str, ...]) -> str:
+    return json.dumps([tool_name, args, [_stamp(p) for p in paths]], sort_keys=True, default=str)
+
 
-        tool = TOOLS[tool_name]
-        return tool.run(**args)
+def _stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
@@ -0,0 +1,98 @@
+# core/vector_index.py
+import re
+import zlib
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+
+class HashingEmbedder:
+    """
+    Dependency-free text embedding: word unigrams plus character n-grams,
+    hashed (signed) into a fixed number of buckets and L2-normalized.
+
+    Deterministic across processes (crc32, not Python's salted hash), so
+    vectors can be rebuilt at any time. Any object with `dim` and
+    `embed(text) -> np.ndarray` can be used in its place.
+    """
+
+    def __init__(self, dim: int = 1024, ngram_range: Tuple[int, int] = (3, 5)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _features(self, text: str) -> List[str]:
+        words = re.findall(r"\w+", text.lower())
+        features = [f"w:{w}" for w in words]
+
+        lo, hi = self.ngram_range
+        for w in words:
+            padded = f"<{w}>"
+            for n in range(lo, hi + 1):
+                features.extend(
+                    padded[i:i + n] for i in range(len(padded) - n + 1)
+                )
+
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+
+        for feature in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if h & 0x80000000 else -1.0
+            vec[h % self.dim] += sign
+
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec /= norm
+        return vec
+
+
+class VectorIndex:
+    """
+    In-memory cosine index over unit vectors.
+
+    Rows live in one preallocated float32 matrix that doubles when full,
+    so `add` is amortized O(1) and `search` is a single mat-vec product.
+    """
+
+    def __init__(self, dim: int, initial_capacity: int = 256):
+        self.dim = dim
+        self._matrix = np.zeros((initial_capacity, dim), dtype=np.float32)
+        self._payloads: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def add(self, vector: np.ndarray, payload: Any):
+        n = len(self._payloads)
+
+        if n == self._matrix.shape[0]:
+            grown = np.zeros((n * 2, self.dim), dtype=np.float32)
+            grown[:n] = self._matrix
+            self._matrix = grown
+
+        self._matrix[n] = vector
+        self._payloads.append(payload)
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int = 3,
+        threshold: Optional[float] = None,
+    ) -> List[Tuple[float, Any]]:
+        n = len(self._payloads)
+        if n == 0 or k <= 0:
+            return []
+
+        scores = self._matrix[:n] @ vector
+
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            (float(scores[i]), self._payloads[i])
+            for i in top
+            if threshold is None or scores[i] >= threshold
+        ]
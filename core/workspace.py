@@ -0,0 +1,214 @@
+# core/workspace.py
+import hashlib
+import os
+import shutil
+import time
+import uuid
+from typing import Iterable, Optional, Tuple
+
+from core.metrics import METRICS
+
+
+class WorkspaceError(ValueError):
+    """A tool path that would leave the task's workspace."""
+    pass
+
+
+def file_digest(path: str) -> Tuple[str, int]:
+    """
+    (sha256 hex digest, size) of a file, read in 1 MiB blocks.
+    """
+    h = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+            size += len(block)
+    return h.hexdigest(), size
+
+
+class ArtifactStore:
+    """
+    Content-addressed blob store: objects/<2 hex>/<rest of sha256>.
+
+    Identical outputs are stored once. Files are shared with workspaces
+    by hard link, or a reflink / copy when the filesystems differ.
+    Blobs are never modified in place: write_file replaces files
+    atomically and breaks hard links before appending.
+    """
+
+    def __init__(self, root: str = "workspaces/.store"):
+        self.root = os.path.abspath(root)
+        os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest[2:])
+
+    def add(self, path: str) -> Tuple[str, int, bool]:
+        """
+        Stores the file at `path` and makes `path` a link to the blob.
+        Returns (digest, size, deduplicated).
+        """
+        digest, size = file_digest(path)
+        blob = self.blob_path(digest)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+
+        deduplicated = os.path.exists(blob)
+        if not deduplicated:
+            try:
+                _link_or_clone(path, blob)
+            except FileExistsError:
+                # Another task stored the same content first
+                deduplicated = True
+
+        if deduplicated:
+            # Drop our copy in favour of the shared blob
+            try:
+                self.materialize(digest, path)
+            except FileNotFoundError:
+                # Swept as unreferenced meanwhile (sweep_workspaces)
+                deduplicated = False
+                _link_or_clone(path, blob)
+
+        METRICS.inc("engine_artifact_store_total", result="dedup" if deduplicated else "new")
+        return digest, size, deduplicated
+
+    def materialize(self, digest: str, dest: str):
+        """
+        Places blob `digest` at `dest` (atomically replacing any file there).
+        """
+        tmp = os.path.join(os.path.dirname(os.path.abspath(dest)), f".{uuid.uuid4().hex}.tmp")
+        _link_or_clone(self.blob_path(digest), tmp)
+        os.replace(tmp, dest)
+
+
+class Workspace:
+    """
+    Per-task directory that tool paths are confined to, so concurrent
+    tasks never write each other's output.txt.
+    """
+
+    def __init__(self, root: str = "workspaces", task_id: Optional[str] = None, store: Optional[ArtifactStore] = None):
+        self.task_id = task_id or uuid.uuid4().hex
+        self.path = os.path.realpath(os.path.join(root, self.task_id))
+        self.store = store or ArtifactStore(os.path.join(root, ".store"))
+        os.makedirs(self.path, exist_ok=True)
+
+    def resolve(self, path: str) -> str:
+        """
+        Maps a tool path (relative to the workspace) to an absolute one.
+        Absolute paths and ".." that escape the workspace are rejected.
+        """
+        if os.path.isabs(path):
+            raise WorkspaceError(f"Absolute paths are not allowed: {path}")
+
+        resolved = os.path.realpath(os.path.join(self.path, path))
+        if os.path.commonpath([resolved, self.path]) != self.path:
+            raise WorkspaceError(f"Path escapes the workspace: {path}")
+
+        return resolved
+
+    def commit(self, path: str) -> dict:
+        """
+        Moves a written file into the artifact store (leaving a link in
+        the workspace) and returns its metadata.
+        """
+        resolved = self.resolve(path)
+        digest, size, _ = self.store.add(resolved)
+        return {"path": resolved, "sha256": digest, "size": size}
+
+    def cleanup(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def sweep_workspaces(root: str, max_age: float, keep: Iterable[str] = ()) -> Tuple[int, int]:
+    """
+    Retention for `root`: removes task workspaces with nothing written for
+    `max_age` seconds, except the task ids in `keep` (e.g. tasks with a
+    checkpoint, which must stay resumable), then the store blobs that no
+    workspace links to any more. Returns (workspaces, blobs) removed.
+    """
+    if not os.path.isdir(root):
+        return 0, 0
+
+    cutoff = time.time() - max_age
+    keep = set(keep)
+    workspaces = 0
+
+    for entry in os.scandir(root):
+        if entry.name.startswith(".") or entry.name in keep or not entry.is_dir(follow_symlinks=False):
+            continue
+        if _last_modified(entry.path) < cutoff:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            workspaces += 1
+
+    # Unreferenced: the blob's own name is its only link. Its ctime moves
+    # whenever a link is added or dropped, so this only takes blobs that
+    # have been unused for `max_age`
+    blobs = 0
+    objects = os.path.join(root, ".store", "objects")
+    for dirpath, _, names in os.walk(objects):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+                if st.st_nlink == 1 and st.st_ctime < cutoff:
+                    os.unlink(path)
+                    blobs += 1
+            except FileNotFoundError:
+                pass
+
+    METRICS.inc("engine_workspace_swept_total", workspaces, kind="workspace")
+    METRICS.inc("engine_workspace_swept_total", blobs, kind="blob")
+    return workspaces, blobs
+
+
+def _last_modified(path: str) -> float:
+    latest = os.stat(path).st_mtime
+    for dirpath, dirnames, names in os.walk(path):
+        for name in dirnames + names:
+            try:
+                latest = max(latest, os.stat(os.path.join(dirpath, name), follow_symlinks=False).st_mtime)
+            except FileNotFoundError:
+                pass
+    return latest
+
+
+def _link_or_clone(src: str, dst: str):
+    """
+    Hard link `src` to `dst`; where that is impossible (other filesystem,
+    no hard link support) fall back to a reflink or a plain copy.
+    Raises FileExistsError if `dst` exists and linking was possible.
+    """
+    try:
+        os.link(src, dst)
+        return
+    except FileExistsError:
+        raise
+    except OSError:
+        pass
+
+    # Same content either way, so the copy may replace a concurrent one
+    tmp = f"{dst}.{uuid.uuid4().hex}.tmp"
+    try:
+        if not _reflink(src, tmp):
+            shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def _reflink(src: str, dst: str) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    FICLONE = 0x40049409  # Linux (btrfs, xfs, ...)
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except OSError:
+        return False
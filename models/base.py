@@ -1,8 +1,88 @@
 # models/base.py
+import asyncio
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterator
 
 
 class BaseLLM(ABC):
+    # Backends that accept `format=<JSON schema>` (constrained decoding)
+    # on every call set this; callers only pass `format` when it is True.
+    supports_format = False
+
     @abstractmethod
     def generate(self, system_prompt: str, user_prompt: str) -> str:
         pass
+
+    def stream(self, system_prompt: str, user_prompt: str, **options) -> Iterator[str]:
+        """
+        Yields the completion as a sequence of text chunks.
+
+        Backends without native streaming yield the full completion once.
+        Closing the iterator early (e.g. `break` in the consumer) must stop
+        the underlying request.
+        """
+        yield self.generate(system_prompt, user_prompt, **options)
+
+    async def agenerate(self, system_prompt: str, user_prompt: str, **options) -> str:
+        """
+        Async generate. The default runs `generate` in a worker thread;
+        backends with a native async client should override it.
+        """
+        return await asyncio.to_thread(self.generate, system_prompt, user_prompt, **options)
+
+    async def astream(self, system_prompt: str, user_prompt: str, **options) -> AsyncIterator[str]:
+        """
+        Async counterpart of `stream`, with the same early-close contract.
+        """
+        yield await self.agenerate(system_prompt, user_prompt, **options)
+
+    async def awarm(self):
+        """
+        Preload of the model so the first real call does not pay the load
+        time. No-op for backends without that cost. Errors are raised;
+        callers treat them as a hint, not a failure.
+        """
+        return None
+
+    def session(self, system_prompt: str, prefix: str = "") -> "LLMSession":
+        """
+        Calls that share `system_prompt` and a leading `prefix` of the user
+        prompt (e.g. one task's EXECUTE requests); see LLMSession.
+        """
+        return LLMSession(self, system_prompt, prefix)
+
+    def ping(self) -> bool:
+        """
+        Cheap liveness check, used by RouterLLM health checks. Backends
+        without one report healthy.
+        """
+        return True
+
+
+class LLMSession:
+    """
+    Fixed system prompt + user prompt prefix; each call only supplies the
+    rest of the user prompt.
+
+    Every call of a session starts with exactly the same text, so
+    backends with prefix (KV) caching, like Ollama while the model stays
+    loaded, prefill it once and only evaluate the new part afterwards.
+    Keep per-call text (step, attempt number) out of the prefix.
+    """
+
+    def __init__(self, llm: BaseLLM, system_prompt: str, prefix: str = ""):
+        self.llm = llm
+        self.system_prompt = system_prompt
+        self.prefix = prefix
+
+    def generate(self, user_prompt: str, **options) -> str:
+        return self.llm.generate(self.system_prompt, self.prefix + user_prompt, **options)
+
+    def stream(self, user_prompt: str, **options) -> Iterator[str]:
+        return self.llm.stream(self.system_prompt, self.prefix + user_prompt, **options)
+
+    async def agenerate(self, user_prompt: str, **options) -> str:
+        return await self.llm.agenerate(self.system_prompt, self.prefix + user_prompt, **options)
+
+    def astream(self, user_prompt: str, **options) -> AsyncIterator[str]:
+        return self.llm.astream(self.system_prompt, self.prefix + user_prompt, **options)
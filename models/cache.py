@@ -0,0 +1,327 @@
+# models/cache.py
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from core.metrics import METRICS
+from core.streaming import StreamCutoff
+from models.base import BaseLLM
+
+
+def fingerprint(llm, system_prompt: str, user_prompt: str, format: Optional[dict] = None) -> str:
+    """
+    Content address of one LLM call: model + temperature + both prompts
+    (+ the output schema, when one constrains the answer).
+    """
+    parts = [
+        type(llm).__name__,
+        getattr(llm, "model", None),
+        getattr(llm, "temperature", None),
+        system_prompt,
+        user_prompt,
+    ]
+    if format is not None:
+        parts.append(format)
+
+    key = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier response cache: in-memory LRU in front of SQLite.
+
+    Entries older than `ttl` seconds are treated as misses and dropped.
+    Each tier is capped by entry count; the disk tier evicts least
+    recently used rows.
+
+    An entry is `complete` when the whole completion was read. Streams
+    cut off once their answer is complete (EXECUTE stops after the JSON
+    object, see core.streaming.StreamCutoff) store that prefix, which is
+    only served to other streaming readers.
+    """
+
+    def __init__(
+        self,
+        path: str = "memory/llm_cache.db",
+        max_memory_entries: int = 256,
+        max_disk_entries: int = 10000,
+        ttl: Optional[float] = 24 * 3600,
+    ):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+
+        self._memory: "OrderedDict[str, Tuple[str, bool, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                complete INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)"
+        )
+        self._db.commit()
+
+    # -------------------------
+    # Lookup
+    # -------------------------
+    def get(self, key: str, partial_ok: bool = False) -> Optional[str]:
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+
+            if entry is not None and not self._expired(entry[2], now):
+                if entry[1] or partial_ok:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    METRICS.inc("engine_llm_cache_total", result="memory_hit")
+                    return entry[0]
+
+            row = self._db.execute(
+                "SELECT response, complete, created_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is not None and self._expired(row[2], now):
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                self._memory.pop(key, None)
+                row = None
+
+            if row is None or not (row[1] or partial_ok):
+                self.misses += 1
+                METRICS.inc("engine_llm_cache_total", result="miss")
+                return None
+
+            self._db.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._db.commit()
+            self._remember(key, (row[0], bool(row[1]), row[2]))
+            self.disk_hits += 1
+            METRICS.inc("engine_llm_cache_total", result="disk_hit")
+            return row[0]
+
+    # -------------------------
+    # Store
+    # -------------------------
+    def put(self, key: str, response: str, complete: bool = True):
+        now = time.time()
+
+        with self._lock:
+            existing = self._memory.get(key)
+            # Never downgrade a full completion to a prefix
+            if existing is not None and existing[1] and not complete:
+                return
+
+            self._remember(key, (response, complete, now))
+            self._db.execute(
+                """
+                INSERT INTO responses (key, response, complete, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    response = excluded.response,
+                    complete = excluded.complete,
+                    created_at = excluded.created_at,
+                    accessed_at = excluded.accessed_at
+                WHERE excluded.complete >= responses.complete
+                """,
+                (key, response, int(complete), now, now),
+            )
+            self._evict_disk()
+            self._db.commit()
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    # -------------------------
+    # Internals
+    # -------------------------
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _remember(self, key: str, entry: Tuple[str, bool, float]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        excess = count - self.max_disk_entries
+
+        if excess > 0:
+            self._db.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY accessed_at LIMIT ?
+                )
+                """,
+                (excess,),
+            )
+
+
+class CachedLLM(BaseLLM):
+    """
+    Wraps any BaseLLM with a ResponseCache.
+
+    A cached answer is replayed verbatim for the same prompts, so only
+    calls to a model with `temperature == 0` are cached; any other
+    temperature (or none set, i.e. the model's sampling default) passes
+    every call through. A stream closed for any other reason than a
+    StreamCutoff (cancelled, errored) stores nothing.
+
+    The async methods run the (SQLite) cache lookups and writes in a
+    worker thread, off the event loop.
+    """
+
+    def __init__(self, llm: BaseLLM, cache: Optional[ResponseCache] = None):
+        self.llm = llm
+        self.cache = cache or ResponseCache()
+
+    @property
+    def model(self):
+        return getattr(self.llm, "model", None)
+
+    @property
+    def supports_format(self):
+        return self.llm.supports_format
+
+    async def awarm(self):
+        await self.llm.awarm()
+
+    @property
+    def temperature(self):
+        return getattr(self.llm, "temperature", None)
+
+    @property
+    def deterministic(self) -> bool:
+        return self.temperature == 0
+
+    def generate(self, system_prompt: str, user_prompt: str, format: Optional[dict] = None) -> str:
+        if not self.deterministic:
+            return self.llm.generate(system_prompt, user_prompt, **_options(format))
+
+        key = fingerprint(self.llm, system_prompt, user_prompt, format)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = self.llm.generate(system_prompt, user_prompt, **_options(format))
+        self.cache.put(key, response)
+        return response
+
+    def stream(self, system_prompt: str, user_prompt: str, format: Optional[dict] = None):
+        if not self.deterministic:
+            yield from self.llm.stream(system_prompt, user_prompt, **_options(format))
+            return
+
+        key = fingerprint(self.llm, system_prompt, user_prompt, format)
+
+        cached = self.cache.get(key, partial_ok=True)
+        if cached is not None:
+            yield cached
+            return
+
+        text = ""
+        chunks = self.llm.stream(system_prompt, user_prompt, **_options(format))
+        try:
+            for chunk in chunks:
+                text += chunk
+                yield chunk
+        except StreamCutoff:
+            # Reader has its answer: keep the prefix it consumed
+            self.cache.put(key, text, complete=False)
+            raise
+        finally:
+            chunks.close()
+
+        self.cache.put(key, text)
+
+    async def agenerate(self, system_prompt: str, user_prompt: str, format: Optional[dict] = None) -> str:
+        if not self.deterministic:
+            return await self.llm.agenerate(system_prompt, user_prompt, **_options(format))
+
+        key = fingerprint(self.llm, system_prompt, user_prompt, format)
+
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            return cached
+
+        response = await self.llm.agenerate(system_prompt, user_prompt, **_options(format))
+        await asyncio.to_thread(self.cache.put, key, response)
+        return response
+
+    async def astream(self, system_prompt: str, user_prompt: str, format: Optional[dict] = None):
+        if not self.deterministic:
+            chunks = self.llm.astream(system_prompt, user_prompt, **_options(format))
+            try:
+                async for chunk in chunks:
+                    yield chunk
+            finally:
+                await chunks.aclose()
+            return
+
+        key = fingerprint(self.llm, system_prompt, user_prompt, format)
+
+        cached = await asyncio.to_thread(self.cache.get, key, True)
+        if cached is not None:
+            yield cached
+            return
+
+        text = ""
+        chunks = self.llm.astream(system_prompt, user_prompt, **_options(format))
+        try:
+            async for chunk in chunks:
+                text += chunk
+                yield chunk
+        except StreamCutoff:
+            await asyncio.to_thread(self.cache.put, key, text, False)
+            raise
+        finally:
+            await chunks.aclose()
+
+        await asyncio.to_thread(self.cache.put, key, text)
+
+
+def _options(format: Optional[dict]) -> dict:
+    # Only forward `format` when set, so wrapped backends without it work
+    return {} if format is None else {"format": format}
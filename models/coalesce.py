@@ -0,0 +1,216 @@
+# models/coalesce.py
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+from core.metrics import METRICS
+from models.base import BaseLLM
+from models.cache import _options, fingerprint
+
+
+class CoalescingLLM(BaseLLM):
+    """
+    Single-flight wrapper: concurrent calls with the same fingerprint
+    (model + prompts + format) share one backend request.
+
+    The first caller starts the request; callers arriving while it is in
+    flight wait for its result (generate / agenerate) or replay and then
+    follow its chunks (astream). Nothing is kept once the request ends;
+    completed answers are CachedLLM's job.
+
+    A shared request is only cancelled when every caller waiting on it
+    has gone (cancelled, or closed its stream early), so one client
+    disconnecting does not fail the others.
+
+    Sync `stream` is passed through: it has no concurrent callers in this
+    engine (the CLI and job workers run one task per process).
+    """
+
+    def __init__(self, llm: BaseLLM):
+        self.llm = llm
+
+        # Threads: fingerprint -> Future of the shared generate()
+        self._sync: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        # Event loops: loop -> {fingerprint -> flight}
+        self._generates = weakref.WeakKeyDictionary()
+        self._streams = weakref.WeakKeyDictionary()
+
+    @property
+    def model(self):
+        return getattr(self.llm, "model", None)
+
+    @property
+    def temperature(self):
+        return getattr(self.llm, "temperature", None)
+
+    @property
+    def supports_format(self):
+        return self.llm.supports_format
+
+    async def awarm(self):
+        await self.llm.awarm()
+
+    def ping(self) -> bool:
+        return self.llm.ping()
+
+    def _flights(self, table) -> dict:
+        return table.setdefault(asyncio.get_running_loop(), {})
+
+    # =========================================================
+    # Sync
+    # =========================================================
+    def generate(self, system_prompt: str, user_prompt: str, format: Optional[dict] = None) -> str:
+        key = fingerprint(self.llm, system_prompt, user_prompt, format)
+
+        with self._lock:
+            shared = self._sync.get(key)
+            if shared is None:
+                future = self._sync[key] = Future()
+
+        if shared is not None:
+            _count("generate", "coalesced")
+            return shared.result()
+
+        _count("generate", "leader")
+        try:
+            future.set_result(self.llm.generate(system_prompt, user_prompt, **_options(format)))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._sync[key]
+
+        return future.result()
+
+    def stream(self, system_prompt: str, user_prompt: str, format: Optional[dict] = None):
+        return self.llm.stream(system_prompt, user_prompt, **_options(format))
+
+    # =========================================================
+    # Async
+    # =========================================================
+    async def agenerate(self, system_prompt: str, user_prompt: str, format: Optional[dict] = None) -> str:
+        key = fingerprint(self.llm, system_prompt, user_prompt, format)
+        flights = self._flights(self._generates)
+
+        flight = flights.get(key)
+        if flight is None:
+            _count("generate", "leader")
+            flight = flights[key] = _Flight(
+                self.llm.agenerate(system_prompt, user_prompt, **_options(format))
+            )
+            flight.task.add_done_callback(lambda _: _drop(flights, key, flight))
+        else:
+            _count("generate", "coalesced")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            if flight.leave():
+                _drop(flights, key, flight)
+
+    async def astream(self, system_prompt: str, user_prompt: str, format: Optional[dict] = None):
+        key = fingerprint(self.llm, system_prompt, user_prompt, format)
+        flights = self._flights(self._streams)
+
+        flight = flights.get(key)
+        if flight is None:
+            _count("stream", "leader")
+            flight = flights[key] = _StreamFlight(
+                self.llm.astream(system_prompt, user_prompt, **_options(format))
+            )
+            flight.task.add_done_callback(lambda _: _drop(flights, key, flight))
+        else:
+            _count("stream", "coalesced")
+
+        flight.waiters += 1
+        try:
+            async for chunk in flight.follow():
+                yield chunk
+        finally:
+            if flight.leave():
+                _drop(flights, key, flight)
+
+
+class _Flight:
+    """
+    One in-flight backend call and the number of callers waiting on it.
+    """
+
+    def __init__(self, coro):
+        self.task = asyncio.ensure_future(coro)
+        self.waiters = 0
+
+    def leave(self) -> bool:
+        """
+        Returns True when this was the last waiter and the call was
+        cancelled (nobody is left to read the answer).
+        """
+        self.waiters -= 1
+        if self.waiters == 0 and not self.task.done():
+            self.task.cancel()
+            return True
+        return False
+
+
+class _StreamFlight(_Flight):
+    """
+    Pumps one upstream stream into a chunk buffer that any number of
+    readers follow from the start.
+    """
+
+    def __init__(self, chunks):
+        self.chunks: List[str] = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+        super().__init__(self._pump(chunks))
+
+    async def _pump(self, chunks):
+        try:
+            async for chunk in chunks:
+                self.chunks.append(chunk)
+                self._wake()
+        except BaseException as e:
+            self.error = e
+            if isinstance(e, Exception):
+                # Readers get the error; the task itself ends quietly
+                return
+            raise
+        finally:
+            await chunks.aclose()
+            self.finished = True
+            self._wake()
+
+    def _wake(self):
+        event, self._changed = self._changed, asyncio.Event()
+        event.set()
+
+    async def follow(self):
+        index = 0
+        while True:
+            if index < len(self.chunks):
+                index += 1
+                yield self.chunks[index - 1]
+                continue
+
+            if self.finished:
+                if self.error is not None:
+                    raise self.error
+                return
+
+            await self._changed.wait()
+
+
+def _drop(flights: dict, key: str, flight: _Flight):
+    # A cancelled flight is dropped at once, so new callers start afresh
+    if flights.get(key) is flight:
+        del flights[key]
+
+
+def _count(method: str, result: str):
+    METRICS.inc("engine_llm_singleflight_total", method=method, result=result)
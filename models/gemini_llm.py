@@ -1,16 +1,38 @@
-import google.genai as genai
-from models.base import BaseLLM
+import os
+from typing import Optional
+
+from google import genai
 from dotenv import load_dotenv
+
+from core.metrics import record_tokens
+from models.base import BaseLLM
+
 load_dotenv()
 
-import os
 
 class GeminiLLM(BaseLLM):
-    def __init__(self, model="gemini-1.5-pro"):
-        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-        self.model = genai.GenerativeModel(model)
+    def __init__(self, model: str = "gemini-1.5-pro", api_key: Optional[str] = None):
+        self.model = model
+        self.client = genai.Client(api_key=api_key or os.getenv("GEMINI_API_KEY"))
 
     def generate(self, system_prompt: str, user_prompt: str) -> str:
-        prompt = f"{system_prompt}\n\n{user_prompt}"
-        response = self.model.generate_content(prompt)
-        return response.text
+        response = self.client.models.generate_content(
+            model=self.model,
+            contents=user_prompt,
+            config={"system_instruction": system_prompt},
+        )
+        return self._text(response)
+
+    async def agenerate(self, system_prompt: str, user_prompt: str) -> str:
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=user_prompt,
+            config={"system_instruction": system_prompt},
+        )
+        return self._text(response)
+
+    def _text(self, response) -> str:
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            record_tokens(usage.prompt_token_count, usage.candidates_token_count, self.model)
+        return response.text or ""
@@ -1,6 +1,8 @@
 import requests
 from typing import Optional
 
+from models.transport import HTTPTransport, get_transport
+
 class LLMError(Exception):
     """Custom exception for LLM failures."""
     pass
@@ -17,11 +19,13 @@ class LocalLLM:
         model: str = "codellama:latest",  # Default to the model you have installed
         temperature: float = 0.2,
         timeout: int = 60,
+        transport: Optional[HTTPTransport] = None,
     ):
         self.base_url = base_url
         self.model = model
         self.temperature = temperature
         self.timeout = timeout
+        self.transport = transport or get_transport()
 
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """
@@ -47,10 +51,10 @@ class LocalLLM:
             payload["system"] = system_prompt
 
         try:
-            response = requests.post(
+            response = self.transport.post(
                 self.base_url,
                 json=payload,
-                timeout=self.timeout
+                read_timeout=self.timeout
             )
             response.raise_for_status()
 
@@ -1,15 +1,109 @@
 # models/llm_factory.py
+import json
+import os
+from typing import List, Optional, Union
+
+from core import config
+from models.cache import CachedLLM, ResponseCache
+from models.coalesce import CoalescingLLM
 from models.local_llm import LocalLLM
-# later:
-# from models.gemini_llm import GeminiLLM
+from models.transport import HTTPTransport
+
+
+def get_llm(
+    provider: str = "local",
+    transport: Optional[HTTPTransport] = None,
+    cache: Union[bool, ResponseCache] = False,
+    coalesce: bool = False,
+    **kwargs,
+):
+    """
+    Builds an LLM backend.
 
+    `transport` lets callers size the connection pool / timeouts / retries;
+    HTTP backends fall back to the process-wide shared transport.
+    `cache` wraps the backend in a response cache (True for the default
+    one under memory/, or a configured ResponseCache); it only caches
+    when the backend's temperature is 0 (OLLAMA_TEMPERATURE=0).
+    `coalesce` makes identical concurrent calls share one request
+    (models/coalesce.py), behind the cache.
 
-def get_llm(provider: str = "local"):
+    "router" spreads calls over several backends (models/router.py);
+    see `_build_router` for its arguments.
+    """
     if provider == "local":
-        return LocalLLM()
+        kwargs.setdefault("keep_alive", config.OLLAMA_KEEP_ALIVE)
+        kwargs.setdefault("temperature", config.OLLAMA_TEMPERATURE)
+        llm = LocalLLM(transport=transport, **kwargs)
 
-    # elif provider == "gemini":
-    #     return GeminiLLM()
+    elif provider == "gemini":
+        # Optional dependency (google-genai); only needed when selected
+        from models.gemini_llm import GeminiLLM
+        llm = GeminiLLM(**kwargs)
+
+    elif provider == "router":
+        llm = _build_router(transport=transport, **kwargs)
 
     else:
         raise ValueError(f"Unknown LLM provider: {provider}")
+
+    if coalesce:
+        llm = CoalescingLLM(llm)
+
+    if cache:
+        llm = CachedLLM(llm, cache if isinstance(cache, ResponseCache) else None)
+
+    return llm
+
+
+def _build_router(
+    backends: Optional[List[dict]] = None,
+    transport: Optional[HTTPTransport] = None,
+    **router_options,
+):
+    """
+    `backends`: one dict per backend, defaulting to config.LLM_BACKENDS:
+    {"provider": "local", "phases": ["execute"], "weight": 1, "name": ...}
+    plus the backend's own arguments (url, model, keep_alive, ...).
+
+    HTTP backends share one transport without retries of its own by
+    default: the router fails over to another backend instead of
+    backing off on a dead one.
+
+    Backends are pinged every config.LLM_HEALTH_INTERVAL seconds unless
+    `health_interval` is given (0 or None: no health checks).
+    """
+    from models.router import Backend, RouterLLM
+
+    specs = backends if backends is not None else load_backend_specs(config.LLM_BACKENDS)
+    if not specs:
+        raise ValueError("The router needs backends (set LLM_BACKENDS)")
+
+    transport = transport or HTTPTransport(max_retries=0)
+    built = []
+
+    for spec in specs:
+        spec = dict(spec)
+        provider = spec.pop("provider", "local")
+        name = spec.pop("name", None)
+        phases = spec.pop("phases", None)
+        weight = spec.pop("weight", 1.0)
+
+        llm = get_llm(provider, transport=transport, **spec) if provider == "local" else get_llm(provider, **spec)
+        built.append(Backend(llm, name=name, phases=phases, weight=weight))
+
+    router_options.setdefault("health_interval", config.LLM_HEALTH_INTERVAL)
+    return RouterLLM(built, **router_options)
+
+
+def load_backend_specs(value: Optional[str]) -> List[dict]:
+    """
+    LLM_BACKENDS: inline JSON (a list of backend dicts) or a path to a
+    JSON file holding one.
+    """
+    if not value:
+        return []
+    if not value.lstrip().startswith("[") and os.path.exists(value):
+        with open(value, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return json.loads(value)
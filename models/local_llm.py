@@ -1,26 +1,176 @@
-import requests
+import json
+from typing import Optional
+
+from core.metrics import record_tokens
 from models.base import BaseLLM
+from models.transport import HTTPTransport, get_transport
 
 
 class LocalLLM(BaseLLM):
-    def __init__(self, model: str = "codellama:latest", url: str = "http://localhost:11434/api/generate"):
+    supports_format = True
+
+    def __init__(
+        self,
+        model: str = "codellama:latest",
+        url: str = "http://localhost:11434/api/generate",
+        transport: Optional[HTTPTransport] = None,
+        keep_alive: Optional[str] = None,
+        temperature: Optional[float] = None,
+    ):
         """
         Initializes the Local LLM client.
         
         Args:
             model (str): The name of the model to use (e.g., 'llama3', 'codellama').
             url (str): The full endpoint URL for the Ollama API.
+            transport (HTTPTransport): Pooled HTTP client; defaults to the shared one.
+            keep_alive (str): How long Ollama keeps the model loaded (e.g. '10m').
+            temperature (float): Sampling temperature; None keeps the model's
+                default. Responses are only cached at 0 (see CachedLLM).
         """
         self.model = model
         self.url = url
+        self.transport = transport or get_transport()
+        self.keep_alive = keep_alive
+        self.temperature = temperature
 
-    def generate(self, system_prompt: str, user_prompt: str) -> str:
+    def _payload(self, system_prompt: str, user_prompt: str, stream: bool, format: Optional[dict] = None) -> dict:
+        # Native system field: the model's template places it, and it stays
+        # an identical prefix across calls for Ollama's KV cache
         payload = {
             "model": self.model,
-            "prompt": f"{system_prompt}\n\n{user_prompt}",
-            "stream": False,
+            "system": system_prompt,
+            "prompt": user_prompt,
+            "stream": stream,
         }
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        if self.temperature is not None:
+            payload["options"] = {"temperature": self.temperature}
+        if format is not None:
+            # JSON schema; Ollama constrains decoding to match it
+            payload["format"] = format
+        return payload
+
+    def generate(self, system_prompt: str, user_prompt: str, format: Optional[dict] = None) -> str:
+        payload = self._payload(system_prompt, user_prompt, stream=False, format=format)
+
+        r = self.transport.post(self.url, json=payload)
+        r.raise_for_status()
+
+        data = r.json()
+        record_tokens(data.get("prompt_eval_count"), data.get("eval_count"), self.model)
+        return data["response"]
+
+    def stream(self, system_prompt: str, user_prompt: str, format: Optional[dict] = None):
+        """
+        Streams the completion from Ollama's NDJSON endpoint.
+
+        Each line is a JSON object carrying a `response` fragment; the last
+        one has `done: true`. Leaving the loop early closes the connection,
+        which makes Ollama stop decoding.
+        """
+        payload = self._payload(system_prompt, user_prompt, stream=True, format=format)
+        usage = _StreamUsage()
+
+        try:
+            with self.transport.post(self.url, json=payload, stream=True) as r:
+                r.raise_for_status()
+
+                for line in r.iter_lines():
+                    chunk = usage.feed(line)
+                    if chunk:
+                        yield chunk
+
+                    if usage.done:
+                        break
+        finally:
+            usage.record(self.model)
+
+    async def agenerate(self, system_prompt: str, user_prompt: str, format: Optional[dict] = None) -> str:
+        payload = self._payload(system_prompt, user_prompt, stream=False, format=format)
+
+        r = await self.transport.apost(self.url, json=payload)
+        r.raise_for_status()
+
+        data = r.json()
+        record_tokens(data.get("prompt_eval_count"), data.get("eval_count"), self.model)
+        return data["response"]
+
+    async def astream(self, system_prompt: str, user_prompt: str, format: Optional[dict] = None):
+        payload = self._payload(system_prompt, user_prompt, stream=True, format=format)
+        usage = _StreamUsage()
 
-        r = requests.post(self.url, json=payload)
+        try:
+            async with self.transport.astream(self.url, json=payload) as r:
+                r.raise_for_status()
+
+                async for line in r.aiter_lines():
+                    chunk = usage.feed(line)
+                    if chunk:
+                        yield chunk
+
+                    if usage.done:
+                        break
+        finally:
+            usage.record(self.model)
+
+
+    async def awarm(self):
+        """
+        An empty prompt makes Ollama load the model and return at once.
+        """
+        payload = {"model": self.model, "prompt": "", "stream": False}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+
+        r = await self.transport.apost(self.url, json=payload)
         r.raise_for_status()
-        return r.json()["response"]
+
+    def ping(self) -> bool:
+        """
+        Lists the server's models (/api/tags): no model load, no decoding.
+        """
+        try:
+            return self.transport.get(self.url.split("/api/", 1)[0] + "/api/tags").ok
+        except Exception:
+            return False
+
+
+class _StreamUsage:
+    """
+    Parses NDJSON stream lines and keeps token usage. Ollama only reports
+    counts on the final line; streams closed early fall back to the number
+    of fragments read (about one token each).
+    """
+
+    def __init__(self):
+        self.fragments = 0
+        self.done = False
+        self.final = {}
+
+    def feed(self, line) -> str:
+        if not line:
+            return ""
+
+        data = json.loads(line)
+        if "error" in data:
+            raise RuntimeError(f"Ollama stream error: {data['error']}")
+
+        if data.get("done"):
+            self.done = True
+            self.final = data
+
+        chunk = data.get("response", "")
+        if chunk:
+            self.fragments += 1
+        return chunk
+
+    def record(self, model: str):
+        if not self.fragments and not self.done:
+            return
+        record_tokens(
+            self.final.get("prompt_eval_count"),
+            self.final.get("eval_count", self.fragments),
+            model,
+        )
@@ -1,4 +1,5 @@
 # models/prompts.py
+from tools.registry import TOOLS
 
 # 1. Shared instructions (Personality/Constraints)
 COMMON_INSTRUCTIONS = """
@@ -29,14 +30,13 @@ Plan:
 3. Verify the output order is ascending.
 """
 
-# 3. Executor Prompt (HAS TOOLS)
+# 3. Executor Prompt (HAS TOOLS; the list is generated from tools/registry.py)
 EXECUTOR_SYSTEM_PROMPT = """
 You are the EXECUTOR MODULE.
 You execute one step of the plan at a time.
 
 Allowed tools:
-1. write_file(path: string, content: string)
-2. read_file(path: string)
+{tools}
 
 Tool call format:
 {
@@ -46,8 +46,11 @@ Tool call format:
 
 Rules:
 - Respond with a JSON tool call OR the string "NO_ACTION".
+- If only JSON is accepted, answer NO_ACTION as {"tool": "NO_ACTION"}.
+- To run several read-only tools ({batchable}) in one step, answer
+  {"calls": [<tool call>, <tool call>, ...]}.
 - Do not provide explanations.
-"""
+""".replace("{tools}", TOOLS.prompt_section()).replace("{batchable}", ", ".join(TOOLS.batchable()))
 
 REFLECT_SYSTEM_PROMPT = """
 You are in REFLECT mode.
@@ -0,0 +1,338 @@
+# models/router.py
+import asyncio
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from core.metrics import METRICS, current_phase
+from models.base import BaseLLM
+
+
+class NoBackendAvailable(RuntimeError):
+    """Every backend for the phase has failed or has its circuit open."""
+    pass
+
+
+class Backend:
+    """
+    One model endpoint behind a RouterLLM, with its load and circuit state.
+
+    `phases`: the phases it is dedicated to (`current_phase`: plan,
+    execute, reflect); None serves every phase. `weight` scales its share
+    of concurrent requests.
+    """
+
+    def __init__(
+        self,
+        llm: BaseLLM,
+        name: Optional[str] = None,
+        phases: Optional[Iterable[str]] = None,
+        weight: float = 1.0,
+    ):
+        self.llm = llm
+        self.name = name or f"{getattr(llm, 'model', type(llm).__name__)}@{getattr(llm, 'url', '')}"
+        self.phases = frozenset(phases) if phases else None
+        self.weight = weight
+
+        self.outstanding = 0
+        # Consecutive failures; the circuit opens at the router's threshold
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        # A half-open trial request is in flight
+        self.probing = False
+
+    def __repr__(self):
+        return f"Backend({self.name}, outstanding={self.outstanding}, open={self.opened_at is not None})"
+
+
+class RouterLLM(BaseLLM):
+    """
+    Spreads calls over several backends (e.g. Ollama boxes).
+
+    - Phase routing: backends dedicated to the current phase take its
+      calls (a small model for EXECUTE JSON, a large one for PLAN);
+      general backends take the rest and are the fallback.
+    - Balancing: least outstanding requests (divided by weight), ties
+      rotated.
+    - Circuit breaking: `failure_threshold` consecutive failures take a
+      backend out for `cooldown` seconds; then one trial request decides
+      whether it is back. With `health_interval`, a background thread
+      also pings every backend (`BaseLLM.ping`) and opens / closes
+      circuits from that.
+    - Failover: a failed call moves on to the next backend. Streams only
+      fail over before their first chunk.
+
+    Client errors (4xx other than 404/408/429) are the request's fault,
+    not the backend's, and are raised as they are.
+    """
+
+    def __init__(
+        self,
+        backends: List[Backend],
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        health_interval: Optional[float] = None,
+    ):
+        if not backends:
+            raise ValueError("RouterLLM needs at least one backend")
+
+        self.backends = list(backends)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self._lock = threading.Lock()
+        self._turn = 0
+
+        self._stop = threading.Event()
+        self._health_thread = None
+        if health_interval:
+            self._health_thread = threading.Thread(
+                target=self._health_loop, args=(health_interval,), daemon=True
+            )
+            self._health_thread.start()
+
+    @property
+    def supports_format(self):
+        # `format` is only forwarded to the backends that take it
+        return any(b.llm.supports_format for b in self.backends)
+
+    @property
+    def model(self):
+        # For cache fingerprints: the models that answer this phase
+        tier = self._tiers(current_phase.get())[0]
+        return "|".join(sorted({str(getattr(b.llm, "model", None)) for b in tier}))
+
+    @property
+    def temperature(self):
+        # Shared by every backend of this phase's tier, else unknown (None)
+        tier = self._tiers(current_phase.get())[0]
+        temperatures = {getattr(b.llm, "temperature", None) for b in tier}
+        return temperatures.pop() if len(temperatures) == 1 else None
+
+    # =========================================================
+    # Backend selection
+    # =========================================================
+    def _tiers(self, phase: Optional[str]) -> List[List[Backend]]:
+        dedicated = [b for b in self.backends if b.phases is not None and phase in b.phases]
+        general = [b for b in self.backends if b.phases is None]
+        tiers = [tier for tier in (dedicated, general) if tier]
+        # Only dedicated backends, none for this phase: any will do
+        return tiers or [self.backends]
+
+    def _available(self, backend: Backend, now: float) -> bool:
+        if backend.opened_at is None:
+            return True
+        return not backend.probing and now - backend.opened_at >= self.cooldown
+
+    def _acquire(self, phase: Optional[str], tried: List[Backend], last_error: Optional[Exception]) -> Backend:
+        now = time.monotonic()
+
+        with self._lock:
+            for tier in self._tiers(phase):
+                candidates = [b for b in tier if b not in tried and self._available(b, now)]
+                if not candidates:
+                    continue
+
+                self._turn += 1
+                n = len(candidates)
+                # min() keeps the first of equals, so rotating the order spreads ties
+                backend = min(
+                    (candidates[(self._turn + i) % n] for i in range(n)),
+                    key=lambda b: b.outstanding / b.weight,
+                )
+                if backend.opened_at is not None:
+                    backend.probing = True
+                backend.outstanding += 1
+                return backend
+
+        detail = f" (last error: {last_error})" if last_error else ""
+        raise NoBackendAvailable(f"No backend available for phase {phase}{detail}") from last_error
+
+    def _release(self, backend: Backend, error: Optional[BaseException] = None) -> bool:
+        """
+        Records the outcome of a call. Returns True when `error` is the
+        backend's fault, i.e. the call should fail over.
+        """
+        failed = error is not None and _is_backend_failure(error)
+        # Cancelled / closed by the caller: says nothing about the backend
+        neutral = error is not None and not isinstance(error, Exception)
+
+        with self._lock:
+            backend.outstanding -= 1
+            trial = backend.probing
+            backend.probing = False
+
+            if failed:
+                backend.failures += 1
+                if trial or backend.failures >= self.failure_threshold:
+                    self._open(backend)
+            elif not neutral:
+                self._close(backend)
+
+        METRICS.inc(
+            "engine_router_requests_total",
+            backend=backend.name,
+            result="error" if failed else "cancelled" if neutral else "ok",
+        )
+        return failed
+
+    def _open(self, backend: Backend):
+        # Caller holds the lock
+        if backend.opened_at is None:
+            METRICS.inc("engine_router_circuit_total", backend=backend.name, state="open")
+        backend.opened_at = time.monotonic()
+
+    def _close(self, backend: Backend):
+        # Caller holds the lock
+        if backend.opened_at is not None:
+            METRICS.inc("engine_router_circuit_total", backend=backend.name, state="closed")
+        backend.opened_at = None
+        backend.failures = 0
+
+    @staticmethod
+    def _options(backend: Backend, options: dict) -> dict:
+        if "format" in options and not backend.llm.supports_format:
+            return {k: v for k, v in options.items() if k != "format"}
+        return options
+
+    # =========================================================
+    # Health checks
+    # =========================================================
+    def check_health(self):
+        """
+        Pings every backend once and opens / closes circuits accordingly.
+        """
+        for backend in self.backends:
+            healthy = backend.llm.ping()
+            METRICS.inc(
+                "engine_router_health_checks_total",
+                backend=backend.name,
+                result="ok" if healthy else "error",
+            )
+
+            with self._lock:
+                if healthy:
+                    self._close(backend)
+                else:
+                    self._open(backend)
+
+    def _health_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            self.check_health()
+
+    def close(self):
+        self._stop.set()
+
+    # =========================================================
+    # BaseLLM
+    # =========================================================
+    def generate(self, system_prompt: str, user_prompt: str, **options) -> str:
+        phase = current_phase.get()
+        tried: List[Backend] = []
+        last_error = None
+
+        while True:
+            backend = self._acquire(phase, tried, last_error)
+            try:
+                response = backend.llm.generate(system_prompt, user_prompt, **self._options(backend, options))
+            except BaseException as e:
+                if not self._release(backend, e):
+                    raise
+                tried.append(backend)
+                last_error = e
+                continue
+
+            self._release(backend)
+            return response
+
+    def stream(self, system_prompt: str, user_prompt: str, **options):
+        phase = current_phase.get()
+        tried: List[Backend] = []
+        last_error = None
+
+        while True:
+            backend = self._acquire(phase, tried, last_error)
+            chunks = backend.llm.stream(system_prompt, user_prompt, **self._options(backend, options))
+            started = False
+
+            try:
+                for chunk in chunks:
+                    started = True
+                    yield chunk
+            except BaseException as e:
+                chunks.close()
+                # GeneratorExit: the reader stopped early, which is fine
+                if not self._release(backend, None if isinstance(e, GeneratorExit) else e) or started:
+                    raise
+                tried.append(backend)
+                last_error = e
+                continue
+
+            self._release(backend)
+            return
+
+    async def agenerate(self, system_prompt: str, user_prompt: str, **options) -> str:
+        phase = current_phase.get()
+        tried: List[Backend] = []
+        last_error = None
+
+        while True:
+            backend = self._acquire(phase, tried, last_error)
+            try:
+                response = await backend.llm.agenerate(system_prompt, user_prompt, **self._options(backend, options))
+            except BaseException as e:
+                if not self._release(backend, e):
+                    raise
+                tried.append(backend)
+                last_error = e
+                continue
+
+            self._release(backend)
+            return response
+
+    async def astream(self, system_prompt: str, user_prompt: str, **options):
+        phase = current_phase.get()
+        tried: List[Backend] = []
+        last_error = None
+
+        while True:
+            backend = self._acquire(phase, tried, last_error)
+            chunks = backend.llm.astream(system_prompt, user_prompt, **self._options(backend, options))
+            started = False
+
+            try:
+                async for chunk in chunks:
+                    started = True
+                    yield chunk
+            except BaseException as e:
+                await chunks.aclose()
+                if not self._release(backend, None if isinstance(e, GeneratorExit) else e) or started:
+                    raise
+                tried.append(backend)
+                last_error = e
+                continue
+
+            self._release(backend)
+            return
+
+    async def awarm(self):
+        results = await asyncio.gather(*(b.llm.awarm() for b in self.backends), return_exceptions=True)
+        # Every backend gets its warm-up; the first failure is reported
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+    def ping(self) -> bool:
+        return any(b.opened_at is None for b in self.backends)
+
+
+def _is_backend_failure(error: BaseException) -> bool:
+    if not isinstance(error, Exception):
+        return False
+
+    # requests.HTTPError and httpx.HTTPStatusError both carry the response
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is None:
+        return True
+    # 404: model not pulled on this box; 408/429: busy
+    return status >= 500 or status in (404, 408, 429)
@@ -0,0 +1,188 @@
+# models/transport.py
+import asyncio
+import random
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+
+
+# Statuses worth retrying: overloaded or restarting model server
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class HTTPTransport:
+    """
+    Shared HTTP layer for every HTTP-backed LLM.
+
+    One pooled keep-alive session per transport, explicit connect/read
+    timeouts, and bounded retries with full-jitter exponential backoff.
+    Retries only cover connecting and the response status: once a request
+    has been sent, a read timeout or a stream that breaks mid-body is
+    surfaced to the caller rather than re-POSTing a generation the server
+    may still be running.
+
+    The async methods use an httpx client with the same settings. httpx
+    clients are bound to an event loop, so one is kept per running loop.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 120.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+    ):
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        self.session.headers["Connection"] = "keep-alive"
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=0,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    def post(
+        self,
+        url: str,
+        json: dict,
+        stream: bool = False,
+        read_timeout: Optional[float] = None,
+    ) -> requests.Response:
+        timeout = (self.connect_timeout, read_timeout or self.read_timeout)
+        attempt = 0
+
+        while True:
+            try:
+                response = self.session.post(
+                    url,
+                    json=json,
+                    stream=stream,
+                    timeout=timeout,
+                )
+            except requests.exceptions.ConnectionError as e:
+                # ConnectTimeout is a ConnectionError; ReadTimeout is not
+                if attempt >= self.max_retries or _read_timed_out(e):
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                response.close()
+
+            attempt += 1
+            time.sleep(self._backoff(attempt))
+
+    # =========================================================
+    # Async (httpx)
+    # =========================================================
+    def _async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                ),
+                # pool=None: queue for a free connection instead of failing
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout, pool=None),
+            )
+            self._async_clients[loop] = client
+
+        return client
+
+    async def apost(
+        self,
+        url: str,
+        json: dict,
+        read_timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        async with self.astream(url, json=json, read_timeout=read_timeout) as response:
+            await response.aread()
+            return response
+
+    @asynccontextmanager
+    async def astream(self, url: str, json: dict, read_timeout: Optional[float] = None):
+        """
+        Opens a streamed POST; the response is closed when the block exits.
+        """
+        client = self._async_client()
+        timeout = httpx.Timeout(
+            read_timeout or self.read_timeout,
+            connect=self.connect_timeout,
+            pool=None,
+        )
+        attempt = 0
+
+        while True:
+            request = client.build_request("POST", url, json=json, timeout=timeout)
+            try:
+                response = await client.send(request, stream=True)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    break
+                await response.aclose()
+
+            attempt += 1
+            await asyncio.sleep(self._backoff(attempt))
+
+        try:
+            yield response
+        finally:
+            await response.aclose()
+
+    def get(self, url: str) -> requests.Response:
+        return self.session.get(url, timeout=(self.connect_timeout, self.read_timeout))
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spreads retries from concurrent workers apart
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def close(self):
+        self.session.close()
+
+
+def _read_timed_out(error: requests.exceptions.ConnectionError) -> bool:
+    # requests wraps a read timeout hit while loading a non-streamed body
+    # in a ConnectionError
+    return bool(error.args) and isinstance(error.args[0], ReadTimeoutError)
+
+
+_default_transport: Optional[HTTPTransport] = None
+_default_lock = threading.Lock()
+
+
+def get_transport() -> HTTPTransport:
+    """
+    Process-wide transport shared by LLM clients that were not given one.
+    """
+    global _default_transport
+
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = HTTPTransport()
+        return _default_transport
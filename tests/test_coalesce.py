@@ -0,0 +1,190 @@
+# tests/test_coalesce.py
+import asyncio
+
+import pytest
+
+from models.base import BaseLLM
+from models.coalesce import CoalescingLLM
+
+
+class Upstream(BaseLLM):
+    """Backend driven by the test: answers / chunks are fed through `feed`."""
+
+    model = "m"
+
+    def __init__(self):
+        self.calls = 0
+        self.cancelled = 0
+        self.queue = asyncio.Queue()
+
+    def feed(self, *items):
+        # str: a chunk (or the answer); an exception: raised; None: end
+        for item in items:
+            self.queue.put_nowait(item)
+
+    async def _next(self):
+        item = await self.queue.get()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def generate(self, system_prompt, user_prompt, **options):
+        raise NotImplementedError
+
+    async def agenerate(self, system_prompt, user_prompt, **options):
+        self.calls += 1
+        try:
+            return await self._next()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+    async def astream(self, system_prompt, user_prompt, **options):
+        self.calls += 1
+        try:
+            while True:
+                chunk = await self._next()
+                if chunk is None:
+                    return
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            self.cancelled += 1
+            raise
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def read(llm, prompt="user", out=None):
+    out = [] if out is None else out
+    async for chunk in llm.astream("system", prompt):
+        out.append(chunk)
+    return "".join(out)
+
+
+# -------------------------
+# One upstream request
+# -------------------------
+def test_identical_calls_share_one_request():
+    async def main():
+        upstream = Upstream()
+        llm = CoalescingLLM(upstream)
+
+        calls = [asyncio.create_task(llm.agenerate("system", "user")) for _ in range(3)]
+        other = asyncio.create_task(llm.agenerate("system", "other"))
+        await settle()
+        upstream.feed("answer", "other answer")
+
+        assert await asyncio.gather(*calls) == ["answer"] * 3
+        await other
+        assert upstream.calls == 2
+
+        # Nothing is kept afterwards
+        upstream.feed("again")
+        assert await llm.agenerate("system", "user") == "again"
+        assert upstream.calls == 3
+
+    asyncio.run(main())
+
+
+def test_late_follower_replays_earlier_chunks():
+    async def main():
+        upstream = Upstream()
+        llm = CoalescingLLM(upstream)
+
+        first_chunks = []
+        first = asyncio.create_task(read(llm, out=first_chunks))
+        upstream.feed("a", "b")
+        await settle()
+        assert first_chunks == ["a", "b"]
+
+        late = asyncio.create_task(read(llm))
+        await settle()
+        upstream.feed("c", None)
+
+        assert await first == "abc"
+        assert await late == "abc"
+        assert upstream.calls == 1
+
+    asyncio.run(main())
+
+
+# -------------------------
+# Cancellation
+# -------------------------
+def test_cancelled_only_after_last_waiter_leaves():
+    async def main():
+        upstream = Upstream()
+        llm = CoalescingLLM(upstream)
+
+        calls = [asyncio.create_task(llm.agenerate("system", "user")) for _ in range(2)]
+        await settle()
+
+        calls[0].cancel()
+        await settle()
+        assert upstream.cancelled == 0
+
+        calls[1].cancel()
+        await settle()
+        assert upstream.cancelled == 1
+        with pytest.raises(asyncio.CancelledError):
+            await calls[1]
+
+        # The cancelled flight is gone: a new call starts afresh
+        upstream.feed("fresh")
+        assert await llm.agenerate("system", "user") == "fresh"
+        assert upstream.calls == 2
+
+    asyncio.run(main())
+
+
+def test_stream_reader_closing_early_keeps_the_others():
+    async def main():
+        upstream = Upstream()
+        llm = CoalescingLLM(upstream)
+
+        quitter = llm.astream("system", "user")
+        stayer = asyncio.create_task(read(llm))
+        upstream.feed("a")
+        assert await quitter.__anext__() == "a"
+
+        await quitter.aclose()
+        await settle()
+        assert upstream.cancelled == 0
+
+        upstream.feed("b", None)
+        assert await stayer == "ab"
+        assert upstream.calls == 1
+
+        # The last reader leaving does cancel it
+        last = llm.astream("system", "user")
+        upstream.feed("x")
+        assert await last.__anext__() == "x"
+        await last.aclose()
+        await settle()
+        assert upstream.cancelled == 1
+
+    asyncio.run(main())
+
+
+# -------------------------
+# Errors
+# -------------------------
+def test_upstream_error_reaches_every_waiter():
+    async def main():
+        upstream = Upstream()
+        llm = CoalescingLLM(upstream)
+
+        calls = [asyncio.create_task(llm.agenerate("system", "user")) for _ in range(2)]
+        readers = [asyncio.create_task(read(llm)) for _ in range(2)]
+        await settle()
+        upstream.feed(ConnectionError("down"), "a", ConnectionError("dropped"))
+
+        results = await asyncio.gather(*calls, *readers, return_exceptions=True)
+        assert [str(r) for r in results] == ["down", "down", "dropped", "dropped"]
+        assert all(isinstance(r, ConnectionError) for r in results)
+        assert upstream.calls == 2
+
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+# tests/test_file_tools.py
+import pytest
+
+from tools.base import ToolArgumentError
+from tools.file_tools import ReadFileTool, WriteFileTool
+
+LINES = [f"line {i}" + (" ERROR" if i % 3 == 0 else "") for i in range(1, 11)]
+TEXT = "\n".join(LINES) + "\n"
+
+
+@pytest.fixture
+def read():
+    tool = ReadFileTool()
+    return lambda path, **args: tool.run(**tool.validate({"path": str(path), **args}))
+
+
+@pytest.fixture
+def sample(tmp_path):
+    path = tmp_path / "sample.txt"
+    path.write_text(TEXT, encoding="utf-8")
+    return path
+
+
+def test_whole_file(read, sample):
+    assert read(sample) == TEXT
+
+
+def test_empty_file(read, tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+
+    assert read(path) == ""
+    assert read(path, tail=3) == ""
+    assert read(path, grep="x") == ""
+
+
+def test_offset_length(read, sample):
+    assert read(sample, offset=5, length=3) == TEXT[5:8]
+    assert read(sample, offset=len(TEXT) - 4) == TEXT[-4:]
+    assert read(sample, offset=len(TEXT) + 100) == ""
+    assert read(sample, length=6) == "line 1"
+
+
+def test_line_ranges(read, sample):
+    assert read(sample, start_line=2, end_line=3) == "line 2\nline 3 ERROR\n"
+    assert read(sample, start_line=9) == "line 9 ERROR\nline 10\n"
+    assert read(sample, start_line=50) == ""
+    assert read(sample, end_line=1) == "line 1\n"
+    assert read(sample, head=2) == "line 1\nline 2\n"
+    assert read(sample, head=0) == ""
+
+
+def test_tail(read, sample, tmp_path):
+    assert read(sample, tail=2) == "line 9 ERROR\nline 10\n"
+    assert read(sample, tail=50) == TEXT
+    assert read(sample, tail=0) == ""
+
+    no_newline = tmp_path / "no_newline.txt"
+    no_newline.write_text("a\nb\nc", encoding="utf-8")
+    assert read(no_newline, tail=2) == "b\nc"
+
+
+def test_grep(read, sample):
+    assert read(sample, grep="ERROR") == "3:line 3 ERROR\n6:line 6 ERROR\n9:line 9 ERROR"
+    assert read(sample, grep="ERROR", max_matches=1) == "3:line 3 ERROR"
+    assert read(sample, grep="^line 1") == "1:line 1\n10:line 10"
+    assert read(sample, grep="nothing") == ""
+
+
+def test_cap_truncates_with_note(read, sample):
+    text = read(sample, max_bytes=10)
+    assert text.startswith(TEXT[:10] + "\n[truncated: 10 of ")
+
+    # tail keeps the end
+    text = read(sample, tail=5, max_bytes=8)
+    assert text.startswith("[truncated: 8 of ")
+    assert text.endswith(TEXT[-8:])
+
+    assert read(sample, head=3, max_bytes=1000) == "line 1\nline 2\nline 3 ERROR\n"
+
+
+def test_cap_applies_to_grep(read, tmp_path):
+    path = tmp_path / "big.log"
+    path.write_text("".join(f"ERROR {'x' * 5000}\n" for _ in range(2000)), encoding="utf-8")
+
+    text = read(path, grep="ERROR")
+    body, note = text.rsplit("\n", 1)
+    assert len(body.encode("utf-8")) == 64 * 1024
+    assert note.startswith("[truncated: 65536 bytes shown")
+
+    assert read(path, grep="ERROR", max_matches=1, max_bytes=20000).startswith("1:ERROR x")
+
+
+def test_selectors_are_exclusive(read, sample):
+    with pytest.raises(ToolArgumentError):
+        read(sample, head=1, tail=1)
+    with pytest.raises(ToolArgumentError):
+        read(sample, max_bytes=0)
+
+
+def test_append_and_atomic_write(tmp_path):
+    path = str(tmp_path / "out.txt")
+    write = WriteFileTool()
+
+    write.run(path=path, content="a")
+    write.run(path=path, chunks=["b", "c"], mode="append")
+    assert open(path, encoding="utf-8").read() == "abc"
+
+    write.run(path=path, content="new")
+    assert open(path, encoding="utf-8").read() == "new"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["out.txt"]
@@ -0,0 +1,147 @@
+# tests/test_jobs.py
+import os
+import signal
+import time
+
+import pytest
+
+from api import jobs
+from bench.mock_ollama import default_script
+from core import config
+from core.checkpoint import CheckpointStore
+from core.memory import LongTermMemory
+from models.base import BaseLLM
+
+TASK = "Generate the Fibonacci sequence and save it to a csv file"
+
+
+class ScriptedLLM(BaseLLM):
+    """
+    The benchmark's scripted answers, in-process. Logs every call to
+    calls.log; while a `hang` file exists, the README step never answers
+    (a worker to kill mid-task).
+    """
+
+    def generate(self, system_prompt: str, user_prompt: str, **options) -> str:
+        prompt = f"{system_prompt}\n\n{user_prompt}"
+        if "PLANNING MODULE" in prompt:
+            call = "PLAN"
+        elif "EXECUTOR MODULE" in prompt:
+            call = "EXECUTE " + prompt.split("CURRENT STEP:", 1)[1].split("\n", 2)[1].strip()
+        else:
+            call = "REFLECT"
+        with open("calls.log", "a", encoding="utf-8") as f:
+            f.write(call + "\n")
+
+        if call.lower().startswith("execute") and "readme" in call.lower() and os.path.exists("hang"):
+            open("hanging", "w").close()
+            time.sleep(600)
+
+        return default_script(prompt)
+
+
+def _scripted_worker(provider: str, started):
+    from core.orchestrator import Orchestrator
+
+    jobs._orchestrator = Orchestrator(
+        llm=ScriptedLLM(),
+        long_term_memory=LongTermMemory("memory/long_term.db"),
+        workspace_root=config.WORKSPACE_ROOT,
+        checkpoints=CheckpointStore(config.CHECKPOINT_DB),
+    )
+    jobs._started = started
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    # Workers inherit the working directory: checkpoints, workspaces and
+    # memory all land in tmp_path
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(jobs, "_init_worker", _scripted_worker)
+
+    manager = jobs.JobManager(workers=1, max_queued=4, provider="scripted")
+    yield manager
+    manager.shutdown()
+
+
+def wait_for(predicate, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.05)
+
+
+def status(manager, job_id: str) -> str:
+    return manager.get(job_id)["status"]
+
+
+def crash_mid_task(manager) -> str:
+    """Submits TASK, kills the worker at its README step; returns the job id."""
+    open("hang", "w").close()
+    [job_id] = manager.submit([TASK])
+    wait_for(lambda: os.path.exists("hanging"))
+
+    for pid in list(manager.executor._processes):
+        os.kill(pid, signal.SIGKILL)
+
+    wait_for(lambda: status(manager, job_id) == "failed")
+    os.unlink("hang")
+    return job_id
+
+
+def test_pool_recovers_after_worker_crash(manager):
+    crashed = crash_mid_task(manager)
+    assert "terminated abruptly" in manager.get(crashed)["error"]
+
+    [job_id] = manager.submit([TASK])
+    wait_for(lambda: status(manager, job_id) == "succeeded")
+
+    assert manager.resume(crashed)
+    wait_for(lambda: status(manager, crashed) == "succeeded")
+    assert manager._outstanding == 0
+
+
+def test_shut_down_pool_rejects_without_leaking(manager):
+    manager.shutdown()
+
+    with pytest.raises(jobs.JobPoolUnavailable):
+        manager.submit([TASK, TASK])
+
+    assert manager._outstanding == 0
+    assert manager.jobs == {}
+
+
+def test_api_answers_503_when_pool_unavailable(manager, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from api import app
+
+    manager.shutdown()
+    monkeypatch.setattr(app, "job_manager", manager)
+
+    response = TestClient(app.app).post("/jobs", json={"task": TASK})
+    assert response.status_code == 503
+
+
+def test_resume_after_worker_crash_continues_from_checkpoint(manager):
+    crashed = crash_mid_task(manager)
+
+    # The worker died before it could mark the checkpoint failed
+    saved = manager.checkpoints.load(crashed)
+    assert saved["status"] == "running"
+    assert [name for name, _ in saved["state"]["artifacts"]] == ["output.csv"]
+
+    os.unlink("calls.log")
+    assert manager.resume(crashed)
+    wait_for(lambda: status(manager, crashed) == "succeeded")
+
+    # No new plan, and the finished CSV step is not run again
+    calls = open("calls.log", encoding="utf-8").read().splitlines()
+    assert "PLAN" not in calls
+    assert not any("csv" in call for call in calls)
+    assert any("README" in call for call in calls)
+
+    result = manager.get(crashed)["result"]
+    assert result["artifacts"] == ["output.csv", "README.md"]
+    assert manager.checkpoints.load(crashed) is None
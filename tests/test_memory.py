@@ -0,0 +1,14 @@
+# tests/test_memory.py
+import pytest
+
+from core.memory import LongTermMemory
+
+
+@pytest.mark.parametrize("path", ["long_term.db", "long_term.json"])
+def test_bare_filename(tmp_path, monkeypatch, path):
+    monkeypatch.chdir(tmp_path)
+
+    memory = LongTermMemory(path)
+    memory.store("Save fibonacci to out.csv", ["out.csv"], "Saved it.")
+
+    assert [r["summary"] for r in LongTermMemory(path).recall("save fibonacci to out.csv")] == ["Saved it."]
@@ -0,0 +1,55 @@
+# tests/test_plan_cache.py
+from core.plan_cache import PlanCache, templatize
+
+
+def test_templatize():
+    signature, params = templatize("Save fibonacci up to 50 to out.csv")
+
+    assert signature == "save fibonacci up to <num> to <file>"
+    assert params == ["50", "out.csv"]
+
+
+def test_replay_refills_parameters(tmp_path):
+    cache = PlanCache(str(tmp_path / "plans.db"))
+    cache.store(
+        "Save fibonacci up to 50 to out.csv",
+        ["Generate fibonacci numbers up to 50", "Write the numbers to out.csv"],
+    )
+
+    assert cache.lookup("Save fibonacci up to 100 to res.csv") == [
+        "Generate fibonacci numbers up to 100",
+        "Write the numbers to res.csv",
+    ]
+
+
+def test_digit_parameters_keep_their_slots(tmp_path):
+    # "0" and "1" must not match inside the "{{0}}" / "{{1}}" slots
+    # written for the parameters before them
+    cache = PlanCache(str(tmp_path / "plans.db"))
+    cache.store(
+        "Print the first 3 primes after 0 and 1 to out.csv",
+        ["Find 3 primes greater than 0 and 1", "Write them to out.csv"],
+    )
+
+    assert cache.lookup("Print the first 7 primes after 2 and 5 to res.csv") == [
+        "Find 7 primes greater than 2 and 5",
+        "Write them to res.csv",
+    ]
+
+
+def test_repeated_value_uses_first_slot(tmp_path):
+    cache = PlanCache(str(tmp_path / "plans.db"))
+    cache.store("Add 2 and 2 then save to a.txt", ["Compute 2 + 2", "Write the sum to a.txt"])
+
+    assert cache.lookup("Add 4 and 9 then save to b.txt") == [
+        "Compute 4 + 4",
+        "Write the sum to b.txt",
+    ]
+
+
+def test_invalidate(tmp_path):
+    cache = PlanCache(str(tmp_path / "plans.db"))
+    cache.store("Save primes up to 10 to p.txt", ["Write primes up to 10 to p.txt"])
+    cache.invalidate("Save primes up to 20 to q.txt")
+
+    assert cache.lookup("Save primes up to 10 to p.txt") is None
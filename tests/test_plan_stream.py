@@ -0,0 +1,99 @@
+# tests/test_plan_stream.py
+import asyncio
+
+from core.orchestrator import Orchestrator
+from core.streaming import NO_ACTION, PlanStreamParser, parse_step_line
+from models.base import BaseLLM
+from tools.registry import TOOLS, tool_call_schema
+
+
+def test_numbered_lines_only():
+    assert parse_step_line("1. Create the file") == "Create the file"
+    assert parse_step_line("12.Save it ") == "Save it"
+    assert parse_step_line("3) Read it back") == "Read it back"
+
+    assert parse_step_line("- Create the file") is None
+    assert parse_step_line("* Create the file") is None
+    assert parse_step_line("Here is the plan:") is None
+    assert parse_step_line("") is None
+    assert parse_step_line("2024 was a good year") is None
+
+
+def test_steps_split_across_chunks():
+    parser = PlanStreamParser()
+
+    assert parser.feed("Plan:\n1. Cre") == []
+    assert parser.feed("ate a.txt\n- note\n2") == ["Create a.txt"]
+    assert parser.feed(". Read a.txt\n") == ["Read a.txt"]
+    assert parser.close() == []
+
+    assert parser.steps == ["Create a.txt", "Read a.txt"]
+    assert parser.text == "Plan:\n1. Create a.txt\n- note\n2. Read a.txt\n"
+
+
+def test_last_line_without_newline():
+    parser = PlanStreamParser()
+
+    assert parser.feed("1. Create a.txt\n2. Read a.txt") == ["Create a.txt"]
+    assert parser.close() == ["Read a.txt"]
+    assert parser.steps == ["Create a.txt", "Read a.txt"]
+
+
+# -------------------------
+# format-constrained EXECUTE answers
+# -------------------------
+class FormatLLM(BaseLLM):
+    """Constrained backend: records the options, answers compact JSON."""
+
+    supports_format = True
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.options = []
+
+    def generate(self, system_prompt, user_prompt, **options):
+        self.options.append(options)
+        return self.answer
+
+
+def ask(answer):
+    llm = FormatLLM(answer)
+    orchestrator = Orchestrator(llm=llm, long_term_memory=object())
+    result = asyncio.run(orchestrator._ask_tool_call("1. Create a.txt"))
+    return result, llm.options
+
+
+def test_schema_covers_tools_batch_and_no_action():
+    branches = tool_call_schema(NO_ACTION)["anyOf"]
+    tools = [b["properties"]["tool"]["enum"][0] for b in branches if "tool" in b["properties"]]
+    batch = [b for b in branches if "calls" in b["properties"]]
+
+    assert sorted(tools) == sorted(list(TOOLS) + [NO_ACTION])
+    assert len(batch) == 1
+    batched = batch[0]["properties"]["calls"]["items"]["anyOf"]
+    assert [b["properties"]["tool"]["enum"][0] for b in batched] == TOOLS.batchable()
+
+
+def test_constrained_single_call():
+    result, options = ask('{"tool":"write_file","args":{"path":"a.txt","content":"hi"}}')
+
+    assert options == [{"format": tool_call_schema(NO_ACTION)}]
+    assert result == {"tool": "write_file", "args": {"path": "a.txt", "content": "hi"}}
+
+
+def test_constrained_batch():
+    result, _ = ask('{"calls":[{"tool":"read_file","args":{"path":"a.txt"}},{"tool":"read_file","args":{"path":"b.txt"}}]}')
+
+    assert result == {
+        "calls": [
+            {"tool": "read_file", "args": {"path": "a.txt"}},
+            {"tool": "read_file", "args": {"path": "b.txt"}},
+        ]
+    }
+
+
+def test_constrained_no_action():
+    result, options = ask('{"tool":"NO_ACTION"}')
+
+    assert result is None
+    assert len(options) == 1
@@ -0,0 +1,127 @@
+# tests/test_response_cache.py
+import asyncio
+
+from core.streaming import ToolCallExtractor, acollect
+from models.base import BaseLLM
+from models.cache import CachedLLM, ResponseCache, fingerprint
+from models.local_llm import LocalLLM
+
+
+class ScriptedLLM(BaseLLM):
+    """Streams a fixed answer chunk by chunk, counting requests."""
+
+    model = "scripted"
+    temperature = 0
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = 0
+
+    def generate(self, system_prompt: str, user_prompt: str, **options) -> str:
+        self.calls += 1
+        return "".join(self.chunks)
+
+    async def agenerate(self, system_prompt: str, user_prompt: str, **options) -> str:
+        return self.generate(system_prompt, user_prompt)
+
+    async def astream(self, system_prompt: str, user_prompt: str, **options):
+        self.calls += 1
+        for chunk in self.chunks:
+            await asyncio.sleep(0)
+            yield chunk
+
+
+CHUNKS = ['{"tool": "write_file", ', '"args": {"path": "a.txt"}}', " and some prose"]
+
+
+def cached_llm(tmp_path):
+    llm = ScriptedLLM(CHUNKS)
+    return llm, CachedLLM(llm, ResponseCache(str(tmp_path / "cache.db")))
+
+
+def test_cutoff_prefix_is_replayed(tmp_path):
+    llm, cached = cached_llm(tmp_path)
+
+    async def execute():
+        return await acollect(cached.astream("sys", "step"), cutoff=ToolCallExtractor())
+
+    first = asyncio.run(execute())
+    second = asyncio.run(execute())
+
+    assert first == second == '{"tool": "write_file", "args": {"path": "a.txt"}}'
+    assert llm.calls == 1
+
+
+def test_closed_stream_is_not_cached(tmp_path):
+    # A reader that goes away mid-answer (cancelled task) must not leave
+    # its truncated prefix behind for the next one
+    llm, cached = cached_llm(tmp_path)
+
+    async def read_one_chunk():
+        chunks = cached.astream("sys", "step")
+        await chunks.__anext__()
+        await chunks.aclose()
+
+    asyncio.run(read_one_chunk())
+
+    key = fingerprint(llm, "sys", "step")
+    assert cached.cache.get(key, partial_ok=True) is None
+
+    async def read_all():
+        return await acollect(cached.astream("sys", "step"))
+
+    assert asyncio.run(read_all()) == "".join(CHUNKS)
+    assert llm.calls == 2
+
+
+def test_cancelled_collect_is_not_cached(tmp_path):
+    llm, cached = cached_llm(tmp_path)
+
+    async def cancelled():
+        task = asyncio.ensure_future(acollect(cached.astream("sys", "step"), cutoff=ToolCallExtractor()))
+        await asyncio.sleep(0)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancelled())
+
+    assert cached.cache.get(fingerprint(llm, "sys", "step"), partial_ok=True) is None
+
+
+def test_partial_is_not_served_to_generate(tmp_path):
+    llm, cached = cached_llm(tmp_path)
+
+    async def run():
+        await acollect(cached.astream("sys", "step"), cutoff=ToolCallExtractor())
+        return await cached.agenerate("sys", "step")
+
+    assert asyncio.run(run()) == "".join(CHUNKS)
+    assert llm.calls == 2
+
+
+def test_sampled_answers_are_not_cached(tmp_path):
+    llm, cached = cached_llm(tmp_path)
+
+    async def read_twice():
+        for _ in range(2):
+            assert "".join([c async for c in cached.astream("system", "user")]) == "".join(CHUNKS)
+        for _ in range(2):
+            assert await cached.agenerate("system", "user") == "".join(CHUNKS)
+
+    for temperature in (None, 0.7):
+        llm.temperature = temperature
+        llm.calls = 0
+        asyncio.run(read_twice())
+        assert llm.calls == 4
+
+    assert cached.cache.get(fingerprint(llm, "system", "user")) is None
+
+
+def test_local_llm_sends_temperature():
+    assert "options" not in LocalLLM(transport=object())._payload("s", "u", stream=False)
+
+    payload = LocalLLM(transport=object(), temperature=0)._payload("s", "u", stream=False)
+    assert payload["options"] == {"temperature": 0}
@@ -0,0 +1,230 @@
+# tests/test_router.py
+import asyncio
+import contextvars
+
+import pytest
+
+import core.orchestrator as orchestrator
+from core.metrics import current_phase
+from models.base import BaseLLM
+from models.router import Backend, NoBackendAvailable, RouterLLM
+
+
+class FakeLLM(BaseLLM):
+    """Answers its model name; raises the queued `errors` first."""
+
+    def __init__(self, model, chunks=("a", "b", "c"), fail_after=None):
+        self.model = model
+        self.chunks = chunks
+        # astream raises ConnectionError after this many chunks
+        self.fail_after = fail_after
+        self.errors = []
+        self.calls = 0
+
+    def generate(self, system_prompt, user_prompt, **options):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.model
+
+    async def astream(self, system_prompt, user_prompt, **options):
+        self.calls += 1
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise ConnectionError(f"{self.model} dropped")
+            yield chunk
+
+
+def call(router, phase=None):
+    def run():
+        current_phase.set(phase)
+        return router.generate("system", "user")
+    return contextvars.copy_context().run(run)
+
+
+async def astream(router, phase=None):
+    current_phase.set(phase)
+    return "".join([chunk async for chunk in router.astream("system", "user")])
+
+
+def reopen_after_cooldown(router, backend):
+    backend.opened_at -= router.cooldown
+
+
+class HTTPStatus(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = type("Response", (), {"status_code": status_code})()
+
+
+# -------------------------
+# Circuit breaker
+# -------------------------
+def test_circuit_opens_half_opens_and_closes():
+    llm = FakeLLM("m")
+    backend = Backend(llm)
+    router = RouterLLM([backend], failure_threshold=2, cooldown=60)
+
+    llm.errors = [ConnectionError("down"), ConnectionError("down")]
+    for _ in range(2):
+        with pytest.raises(NoBackendAvailable):
+            call(router)
+    assert backend.opened_at is not None
+
+    # Open: not even tried
+    with pytest.raises(NoBackendAvailable):
+        call(router)
+    assert llm.calls == 2
+
+    # Half-open: one trial at a time, and a failed trial reopens
+    reopen_after_cooldown(router, backend)
+    trial = router._acquire(None, [], None)
+    assert trial is backend and backend.probing
+    with pytest.raises(NoBackendAvailable):
+        router._acquire(None, [], None)
+    router._release(trial, ConnectionError("still down"))
+    assert backend.opened_at is not None and not backend.probing
+
+    # A successful trial closes it
+    reopen_after_cooldown(router, backend)
+    assert call(router) == "m"
+    assert backend.opened_at is None
+    assert backend.failures == 0
+    assert backend.outstanding == 0
+
+
+def test_client_errors_do_not_trip_the_circuit():
+    llm = FakeLLM("m")
+    backend = Backend(llm)
+    other = FakeLLM("other")
+    router = RouterLLM([backend, Backend(other)], failure_threshold=1)
+
+    llm.errors = [HTTPStatus(400)]
+    other.errors = [HTTPStatus(400)]
+    with pytest.raises(HTTPStatus):
+        call(router)
+
+    # Raised as is: no failover, no failure counted
+    assert llm.calls + other.calls == 1
+    assert all(b.opened_at is None and b.failures == 0 for b in router.backends)
+
+
+def test_health_checks_open_and_close():
+    llm = FakeLLM("m")
+    backend = Backend(llm)
+    router = RouterLLM([backend])
+
+    llm.ping = lambda: False
+    router.check_health()
+    assert backend.opened_at is not None
+    assert not router.ping()
+
+    llm.ping = lambda: True
+    router.check_health()
+    assert backend.opened_at is None
+
+
+# -------------------------
+# Failover
+# -------------------------
+def test_failover_before_first_chunk():
+    first = FakeLLM("first", fail_after=0)
+    second = FakeLLM("second", chunks=("x", "y"))
+    router = RouterLLM([Backend(first, phases=["execute"]), Backend(second)])
+
+    assert asyncio.run(astream(router, "execute")) == "xy"
+    assert first.calls == second.calls == 1
+    assert router.backends[0].failures == 1
+    assert all(b.outstanding == 0 for b in router.backends)
+
+
+def test_no_failover_mid_stream():
+    first = FakeLLM("first", fail_after=2)
+    second = FakeLLM("second")
+    router = RouterLLM([Backend(first, phases=["execute"]), Backend(second)])
+
+    # Chunks already went to the reader: replaying elsewhere would repeat them
+    with pytest.raises(ConnectionError):
+        asyncio.run(astream(router, "execute"))
+    assert second.calls == 0
+    assert router.backends[0].failures == 1
+    assert router.backends[0].outstanding == 0
+
+
+def test_failover_for_generate():
+    first = FakeLLM("first")
+    second = FakeLLM("second")
+    router = RouterLLM([Backend(first, phases=["plan"]), Backend(second)])
+
+    first.errors = [HTTPStatus(503)]
+    assert call(router, "plan") == "second"
+
+
+# -------------------------
+# Selection
+# -------------------------
+def test_least_outstanding():
+    backends = [Backend(FakeLLM(name), name=name) for name in ("a", "b", "c")]
+    router = RouterLLM(backends)
+
+    held = [router._acquire(None, [], None) for _ in range(3)]
+    assert sorted(b.name for b in held) == ["a", "b", "c"]
+
+    router._release(backends[1])
+    assert router._acquire(None, [], None) is backends[1]
+
+
+def test_weight_scales_share():
+    big = Backend(FakeLLM("big"), weight=2)
+    small = Backend(FakeLLM("small"))
+    router = RouterLLM([big, small])
+
+    for _ in range(3):
+        router._acquire(None, [], None)
+    assert (big.outstanding, small.outstanding) == (2, 1)
+
+
+def test_phase_tiers():
+    planner = Backend(FakeLLM("large"), phases=["plan", "reflect"])
+    executor = Backend(FakeLLM("small"), phases=["execute"])
+    general = Backend(FakeLLM("general"))
+    router = RouterLLM([planner, executor, general])
+
+    assert call(router, "plan") == "large"
+    assert call(router, "reflect") == "large"
+    assert call(router, "execute") == "small"
+    assert call(router, None) == "general"
+
+    # Cache fingerprints follow the tier
+    assert contextvars.copy_context().run(lambda: (current_phase.set("execute"), router.model)[1]) == "small"
+
+    # A dedicated backend that is down falls back to the general tier
+    router._open(planner)
+    assert call(router, "plan") == "general"
+
+
+# -------------------------
+# Warm-up
+# -------------------------
+def test_warm_up_failure_is_reported(monkeypatch):
+    warmed = []
+
+    class Warming(FakeLLM):
+        async def awarm(self):
+            warmed.append(self.model)
+            if self.model == "down":
+                raise ConnectionError("down")
+
+    router = RouterLLM([Backend(Warming("down")), Backend(Warming("up"))])
+    events = []
+    monkeypatch.setattr(orchestrator, "emit", lambda event, **fields: events.append((event, fields)))
+
+    async def main():
+        warm_up = asyncio.ensure_future(router.awarm())
+        warm_up.add_done_callback(orchestrator._warm_up_done)
+        await asyncio.gather(warm_up, return_exceptions=True)
+
+    asyncio.run(main())
+
+    assert sorted(warmed) == ["down", "up"]
+    assert events == [("warm_up_failed", {"error": "down"})]
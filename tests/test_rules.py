@@ -0,0 +1,139 @@
+# tests/test_rules.py
+"""
+The compiled rule engine with the default rules must decide exactly like
+the hand-written checks it replaced in core/orchestrator.py (kept below).
+"""
+import itertools
+import random
+
+import pytest
+
+from core.rules import load_rules
+
+
+# =========================================================
+# Legacy checks (Orchestrator before the rule engine)
+# =========================================================
+def legacy_step_type(step):
+    step_lower = step.lower()
+
+    non_exec_verbs = (
+        "analyze", "design", "define", "identify", "determine", "verify",
+        "validate", "compare", "evaluate", "plan", "understand",
+    )
+    # "read" / "inspect" were added with the read-only tools
+    exec_verbs = ("save", "write", "export", "persist", "store", "read", "inspect")
+
+    for verb in non_exec_verbs:
+        if step_lower.startswith(verb):
+            return "NON_EXECUTABLE"
+    for verb in exec_verbs:
+        if step_lower.startswith(verb):
+            return "EXECUTABLE"
+    return "NON_EXECUTABLE"
+
+
+def legacy_artifact(user_input, current_step):
+    task = user_input.lower()
+    step = current_step.lower()
+
+    if any(word in step for word in ["save", "write", "export", "persist"]):
+        if "csv" in step:
+            return ("output.csv", "data")
+        if "json" in step:
+            return ("output.json", "data")
+        return ("output.txt", "data")
+
+    if any(word in task for word in ["python", "function", "script", "program"]):
+        if any(word in step for word in ["implement", "generate", "create", "define", "code"]):
+            return ("main.py", "code")
+
+    if any(word in task for word in ["readme", "documentation", "doc"]):
+        return ("README.md", "doc")
+
+    return None
+
+
+def legacy_plan_violation(plan):
+    for token in ["def ", "import ", "```", "print(", "if __name__", "from ", "while "]:
+        if token in plan:
+            return f"Planner violation: forbidden token detected -> {token}"
+
+    for line in plan.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.lower().startswith(("plan", "here is")):
+            continue
+        if line.startswith(("*", "-")):
+            return "Planner violation: Bullet points/substeps detected"
+
+    return None
+
+
+def legacy_reflection_ok(reflection, artifacts):
+    if not artifacts:
+        return False
+
+    reflection_l = reflection.lower()
+    if not any(artifact.lower() in reflection_l for artifact in artifacts):
+        return False
+
+    signals = ("saved", "written", "created", "stored", "persisted", "completed")
+    return any(signal in reflection_l for signal in signals)
+
+
+# =========================================================
+# Corpus
+# =========================================================
+WORDS = [
+    "Save", "write", "EXPORT", "persist", "store", "read", "inspect", "analyze",
+    "Define", "plan", "verify", "implement", "generate", "create", "code",
+    "csv", "JSON", "python", "function", "script", "program", "readme",
+    "documentation", "doc", "the", "results", "to", "file", "Fibonacci",
+    "def ", "import ", "print(", "from ", "while ", "```", "saved", "written",
+    "completed", "output.csv", "main.py", "README.md", "- ", "* ", "Plan:",
+    "Here is", "1.", "2.",
+]
+
+
+def phrases(count, seed):
+    rng = random.Random(seed)
+    out = [""] + list(WORDS)
+    for _ in range(count):
+        out.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 6))))
+    return out
+
+
+STEPS = phrases(400, 1)
+TASKS = phrases(60, 2)
+
+
+@pytest.fixture(scope="module")
+def rules():
+    # Default rules only: RULES_PATH must not change what is compared
+    return load_rules(None)
+
+
+def test_step_type_matches_legacy(rules):
+    for step in STEPS:
+        assert rules.step_type(step) == legacy_step_type(step), step
+
+
+def test_artifact_matches_legacy(rules):
+    for task, step in itertools.product(TASKS, STEPS):
+        assert rules.artifact(task, step) == legacy_artifact(task, step), (task, step)
+
+
+def test_plan_violations_match_legacy(rules):
+    rng = random.Random(3)
+    for _ in range(500):
+        plan = "\n".join(rng.choice(STEPS) for _ in range(rng.randint(1, 5)))
+        violations = rules.plan_violations(plan)
+        assert (violations[0] if violations else None) == legacy_plan_violation(plan), plan
+
+
+def test_reflection_ok_matches_legacy(rules):
+    artifact_sets = [[], ["output.csv"], ["main.py", "README.md"]]
+    for reflection, artifacts in itertools.product(STEPS, artifact_sets):
+        assert rules.reflection_ok(reflection, artifacts) == legacy_reflection_ok(reflection, artifacts)
@@ -0,0 +1,97 @@
+# tests/test_state.py
+import json
+
+from core.state import TaskState
+
+
+def planned_state():
+    state = TaskState()
+    state.set_task("Save fibonacci up to 50 to out.csv")
+    state.set_plan(["Generate the numbers", "Save them to out.csv", "Verify the file"])
+    return state
+
+
+def fresh_summary(state: TaskState) -> str:
+    state._changed(artifacts=True)
+    return state.summary()
+
+
+def test_snapshot_is_isolated_from_later_changes():
+    state = planned_state()
+    state.advance_step()
+    snapshot = state.snapshot()
+
+    state.advance_step("skipped")
+    state.add_artifact("out.csv", "data", step=1, size=10)
+    state.invalidate_plan("boom")
+
+    assert snapshot.step_status == ["done", "pending", "pending"]
+    assert snapshot.current_step_index == 1
+    assert snapshot.artifacts == []
+    assert snapshot.artifact_meta == {}
+    assert snapshot.plan_valid and snapshot.last_error is None
+
+    assert state.step_status == ["done", "skipped", "pending"]
+    assert state.artifacts == ["out.csv"]
+
+
+def test_live_state_is_isolated_from_snapshot_changes():
+    state = planned_state()
+    snapshot = state.snapshot()
+
+    snapshot.mark_step(2, "done")
+    snapshot.add_artifact("x.txt", "data")
+
+    assert state.step_status == ["pending", "pending", "pending"]
+    assert state.artifacts == []
+
+
+def test_cached_summary_follows_mutations():
+    state = planned_state()
+
+    for mutate in (
+        lambda: state.set_expected_artifact("out.csv", "data"),
+        lambda: state.advance_step(),
+        lambda: state.add_artifact("out.csv", "data", step=1),
+        lambda: state.mark_step(2, "skipped"),
+        lambda: state.invalidate_plan("bad step"),
+    ):
+        state.summary()
+        mutate()
+        cached = state.summary()
+        assert cached == fresh_summary(state)
+
+    assert state.artifacts_text == "['out.csv']"
+
+
+def test_to_dict_round_trip():
+    state = planned_state()
+    state.advance_step()
+    state.set_expected_artifact("out.csv", "data")
+    state.add_artifact("nums.txt", "data", step=0, sha256="ab", size=3)
+    state.add_artifact("out.csv", "data", step=1, sha256="cd", size=7)
+    state.record_tool("write_file")
+
+    data = json.loads(json.dumps(state.snapshot().to_dict()))
+    restored = TaskState()
+    restored.restore(data)
+
+    assert restored.to_dict() == state.to_dict()
+    assert restored.artifacts == ["nums.txt", "out.csv"]
+    assert restored.summary() == state.summary()
+
+
+def test_restore_resumes_at_first_unfinished_step():
+    state = planned_state()
+    state.mark_step(0, "done")
+    state.mark_step(1, "failed")
+    state.mark_step(2, "skipped")
+    state.invalidate_plan("tool failed")
+
+    restored = TaskState()
+    restored.restore(state.to_dict())
+
+    assert restored.step_status == ["done", "pending", "skipped"]
+    assert restored.current_step_index == 1
+    assert restored.current_step() == "Save them to out.csv"
+    assert restored.plan_valid and restored.last_error == "tool failed"
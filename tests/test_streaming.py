@@ -0,0 +1,119 @@
+# tests/test_streaming.py
+import asyncio
+
+import pytest
+
+from core.streaming import NO_ACTION, StreamCutoff, ToolCallExtractor, acollect
+
+
+def extract(chunks):
+    """Feeds `chunks` like acollect does; returns (cut text, extractor)."""
+    extractor = ToolCallExtractor()
+    text = ""
+    for chunk in chunks:
+        text += chunk
+        end = extractor(text)
+        if end is not None:
+            return text[:end], extractor
+    return None, extractor
+
+
+def test_json_split_across_chunks():
+    text, extractor = extract(['{"tool": "wr', 'ite_file", "args": {"pa', 'th": "a.txt"}', "}", " trailing"])
+
+    assert text == '{"tool": "write_file", "args": {"path": "a.txt"}}'
+    assert extractor.value == {"tool": "write_file", "args": {"path": "a.txt"}}
+    assert extractor.offset == 0
+
+
+def test_braces_inside_strings():
+    answer = '{"tool": "write_file", "args": {"content": "} { \\" }"}}'
+    text, extractor = extract([answer[i:i + 3] for i in range(0, len(answer), 3)])
+
+    assert text == answer
+    assert extractor.value["args"]["content"] == '} { " }'
+
+
+def test_braces_in_surrounding_prose():
+    text, extractor = extract(["Use {this} call: ", '{"tool": "read_file", "args": {}}', " then {stop}"])
+
+    assert extractor.value == {"tool": "read_file", "args": {}}
+    assert text.endswith('{"tool": "read_file", "args": {}}')
+    assert extractor.offset == len("Use {this} call: ")
+
+
+def test_json_fence():
+    text, extractor = extract(["```json\n", '{"tool": "read_file",', ' "args": {"path": "x"}}\n', "```"])
+
+    assert extractor.value == {"tool": "read_file", "args": {"path": "x"}}
+    assert text == '```json\n{"tool": "read_file", "args": {"path": "x"}}'
+
+
+def test_no_action_in_pieces():
+    # Only decided once the char after NO_ACTION shows it is not NO_ACTIONS
+    text, _ = extract(["  NO_", "ACT", "ION", "\n", "more"])
+    assert text == "  " + NO_ACTION
+
+    text, _ = extract(["NO_ACTION"])
+    assert text is None
+
+
+def test_no_actions_is_not_no_action():
+    text, extractor = extract(["NO_ACTIONS ", '{"tool": "read_file", "args": {}}'])
+
+    assert extractor.value == {"tool": "read_file", "args": {}}
+    assert text == 'NO_ACTIONS {"tool": "read_file", "args": {}}'
+
+
+class Upstream:
+    """Async generator stand-in that records how it was closed."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.read = 0
+        self.closed_by = None
+
+    async def stream(self):
+        try:
+            for chunk in self.chunks:
+                self.read += 1
+                yield chunk
+        except GeneratorExit as e:
+            self.closed_by = type(e)
+            raise
+
+
+def test_acollect_cuts_off_upstream():
+    upstream = Upstream(['{"tool": "read_file", ', '"args": {}}', " never read", " nor this"])
+
+    text = asyncio.run(acollect(upstream.stream(), cutoff=ToolCallExtractor()))
+
+    assert text == '{"tool": "read_file", "args": {}}'
+    assert upstream.read == 2
+    assert upstream.closed_by is StreamCutoff
+
+
+def test_acollect_without_cutoff_reads_everything():
+    upstream = Upstream(["a", "b", "c"])
+
+    assert asyncio.run(acollect(upstream.stream())) == "abc"
+    assert upstream.closed_by is None
+
+
+def test_acollect_cancelled_closes_with_plain_generator_exit():
+    upstream = Upstream(["a", "b"])
+
+    async def slow():
+        async for chunk in upstream.stream():
+            yield chunk
+            await asyncio.sleep(10)
+
+    async def run():
+        task = asyncio.ensure_future(acollect(slow(), cutoff=ToolCallExtractor()))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert upstream.closed_by is GeneratorExit
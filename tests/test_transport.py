@@ -0,0 +1,83 @@
+# tests/test_transport.py
+import asyncio
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+import requests
+
+from models.transport import HTTPTransport
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Answers every POST after `delay` seconds, counting them."""
+
+    delay = 1.0
+    posts = 0
+
+    def do_POST(self):
+        type(self).posts += 1
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.delay)
+        try:
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+        except OSError:
+            # The client gave up waiting
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slow_server():
+    SlowHandler.posts = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def transport():
+    return HTTPTransport(max_retries=2, backoff_base=0.01)
+
+
+def test_read_timeout_is_not_retried(slow_server):
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        transport().post(slow_server, json={}, read_timeout=0.2)
+
+    assert SlowHandler.posts == 1
+
+
+def test_async_read_timeout_is_not_retried(slow_server):
+    async def post():
+        await transport().apost(slow_server, json={}, read_timeout=0.2)
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(post())
+
+    assert SlowHandler.posts == 1
+
+
+def test_connect_errors_are_retried(monkeypatch):
+    # Nothing listens on a just-released port
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        url = f"http://127.0.0.1:{s.getsockname()[1]}"
+
+    t = transport()
+    attempts = []
+    send = t.session.send
+    monkeypatch.setattr(t.session, "send", lambda *a, **kw: attempts.append(1) or send(*a, **kw))
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        t.post(url, json={})
+
+    assert len(attempts) == 3
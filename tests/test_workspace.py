@@ -0,0 +1,58 @@
+# tests/test_workspace.py
+import os
+import time
+
+from core.workspace import ArtifactStore, Workspace, sweep_workspaces
+
+
+def write(workspace: Workspace, name: str, text: str) -> dict:
+    with open(workspace.resolve(name), "w", encoding="utf-8") as f:
+        f.write(text)
+    return workspace.commit(name)
+
+
+def age(path: str, seconds: float):
+    then = time.time() - seconds
+    for dirpath, dirnames, names in os.walk(path):
+        for name in dirnames + names:
+            os.utime(os.path.join(dirpath, name), (then, then))
+    os.utime(path, (then, then))
+
+
+def test_identical_outputs_share_a_blob(tmp_path):
+    root = str(tmp_path)
+    store = ArtifactStore(os.path.join(root, ".store"))
+    a = write(Workspace(root, "a", store), "out.txt", "same")
+    b = write(Workspace(root, "b", store), "out.txt", "same")
+
+    assert a["sha256"] == b["sha256"]
+    assert os.path.samefile(a["path"], b["path"])
+
+
+def test_sweep_removes_expired_workspaces_and_orphan_blobs(tmp_path):
+    root = str(tmp_path)
+    store = ArtifactStore(os.path.join(root, ".store"))
+    old = Workspace(root, "old", store)
+    kept = Workspace(root, "kept", store)
+    fresh = Workspace(root, "fresh", store)
+
+    orphan = write(old, "out.txt", "only in old")
+    shared = write(kept, "out.txt", "shared")
+    write(old, "copy.txt", "shared")
+    write(fresh, "new.txt", "fresh")
+    age(old.path, 3600)
+    age(kept.path, 3600)
+
+    # Blobs must also have been unused for max_age: ctime cannot be
+    # backdated, so sweep twice
+    assert sweep_workspaces(root, max_age=60, keep=["kept"]) == (1, 0)
+    assert sweep_workspaces(root, max_age=0, keep=["kept", "fresh"]) == (0, 1)
+
+    assert not os.path.exists(old.path)
+    assert os.path.exists(kept.path) and os.path.exists(fresh.path)
+    assert not os.path.exists(store.blob_path(orphan["sha256"]))
+    assert os.path.exists(store.blob_path(shared["sha256"]))
+
+
+def test_sweep_without_root(tmp_path):
+    assert sweep_workspaces(str(tmp_path / "missing"), max_age=0) == (0, 0)
@@ -1,12 +1,101 @@
 # tools/base.py
+import inspect
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
+
+
+# How expensive / side-effecting a call is:
+# pure (no IO), io (local files), network (remote services)
+COST_CLASSES = ("pure", "io", "network")
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean", list: "array", dict: "object"}
+
+_PY_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+
+class ToolArgumentError(ValueError):
+    """A tool call whose arguments do not match the tool's schema."""
+    pass
 
 
 class BaseTool(ABC):
     name: str
     description: str
 
+    # JSON schema of the arguments ({"type": "object", "properties": ...,
+    # "required": [...]}); derived from the signature of `run` when None
+    args_schema: Optional[Dict[str, Any]] = None
+
+    cost: str = "io"
+    # Same arguments twice leave the same result as once
+    idempotent: bool = False
+    # Result depends only on the arguments (and the files they name);
+    # such tools are read-only, memoized per task and may be batched
+    cacheable: bool = False
+    # Arguments that name files: memo keys include their mtime/size, and
+    # a non-cacheable tool touching a path drops memoized reads of it
+    path_args: Tuple[str, ...] = ()
+
     @abstractmethod
     def run(self, **kwargs) -> Any:
         pass
+
+    def schema(self) -> Dict[str, Any]:
+        if self.args_schema is not None:
+            return self.args_schema
+
+        properties = {}
+        required = []
+
+        for name, param in inspect.signature(self.run).parameters.items():
+            if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                continue
+
+            properties[name] = {"type": _JSON_TYPES.get(param.annotation, "string")}
+            if param.default is param.empty:
+                required.append(name)
+
+        self.args_schema = {"type": "object", "properties": properties, "required": required}
+        return self.args_schema
+
+    def validate(self, args: Any) -> Dict[str, Any]:
+        """
+        Checks `args` against the schema before anything runs.
+        Raises ToolArgumentError with a message fit to show the model.
+        """
+        if not isinstance(args, dict):
+            raise ToolArgumentError(f"{self.name}: args must be an object")
+
+        schema = self.schema()
+        properties = schema.get("properties", {})
+
+        missing = [name for name in schema.get("required", []) if name not in args]
+        if missing:
+            raise ToolArgumentError(f"{self.name}: missing argument(s) {', '.join(missing)}")
+
+        unknown = [name for name in args if name not in properties]
+        if unknown:
+            raise ToolArgumentError(f"{self.name}: unknown argument(s) {', '.join(unknown)}")
+
+        for name, value in args.items():
+            spec = properties[name]
+            expected = _PY_TYPES.get(spec.get("type"))
+
+            # bool is an int subclass; only accept it where booleans are meant
+            if expected is not None and (
+                not isinstance(value, expected)
+                or (isinstance(value, bool) and spec.get("type") != "boolean")
+            ):
+                raise ToolArgumentError(f"{self.name}: {name} must be a {spec['type']}")
+
+            if "enum" in spec and value not in spec["enum"]:
+                raise ToolArgumentError(f"{self.name}: {name} must be one of {spec['enum']}")
+
+        return args
@@ -1,21 +1,314 @@
 # tools/file_tools.py
-from tools.base import BaseTool
+import mmap
+import os
+import re
+import shutil
+import uuid
+from typing import List, Optional, Tuple
+
+from tools.base import BaseTool, ToolArgumentError
+
+
+# Default cap on what one read returns: a whole large file in a tool
+# result would flood the model's context
+READ_LIMIT = 64 * 1024
 
 
 class ReadFileTool(BaseTool):
     name = "read_file"
     description = "Read the contents of a file given a path"
+    args_schema = {
+        "type": "object",
+        "properties": {
+            "path": {"type": "string", "description": "File to read"},
+            "offset": {"type": "integer", "description": "First byte to read"},
+            "length": {"type": "integer", "description": "Number of bytes to read"},
+            "start_line": {"type": "integer", "description": "First line to read (1-based)"},
+            "end_line": {"type": "integer", "description": "Last line to read (inclusive)"},
+            "head": {"type": "integer", "description": "Read the first N lines"},
+            "tail": {"type": "integer", "description": "Read the last N lines"},
+            "grep": {"type": "string", "description": "Only lines matching this regex, as 'N:line'"},
+            "max_matches": {"type": "integer", "description": "Stop grep after this many lines"},
+            "max_bytes": {"type": "integer", "description": f"Return at most this many bytes (default {READ_LIMIT})"},
+        },
+        "required": ["path"],
+    }
+    cost = "io"
+    idempotent = True
+    cacheable = True
+    path_args = ("path",)
+
+    # Mutually exclusive ways of selecting part of the file
+    _SELECTORS = (("offset", "length"), ("start_line", "end_line"), ("head",), ("tail",), ("grep",))
+
+    def validate(self, args):
+        super().validate(args)
+
+        modes = [group for group in self._SELECTORS if any(name in args for name in group)]
+        if len(modes) > 1:
+            raise ToolArgumentError(
+                f"{self.name}: use only one of " + ", ".join("/".join(g) for g in self._SELECTORS)
+            )
+
+        for name in ("offset", "length", "start_line", "end_line", "head", "tail", "max_matches", "max_bytes"):
+            if name in args and args[name] < (1 if name in ("start_line", "max_bytes") else 0):
+                raise ToolArgumentError(f"{self.name}: {name} is out of range")
 
-    def run(self, path: str) -> str:
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read()
+        if "grep" in args:
+            try:
+                re.compile(args["grep"])
+            except re.error as e:
+                raise ToolArgumentError(f"{self.name}: bad grep pattern: {e}")
+
+        return args
+
+    def run(
+        self,
+        path: str,
+        offset: Optional[int] = None,
+        length: Optional[int] = None,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        head: Optional[int] = None,
+        tail: Optional[int] = None,
+        grep: Optional[str] = None,
+        max_matches: int = 1000,
+        max_bytes: int = READ_LIMIT,
+    ) -> str:
+        """
+        Without a selector, returns the whole file. Selectors are served
+        from an mmap of the file, so only the pages they touch are read.
+
+        At most `max_bytes` are returned (the last ones for `tail`); a
+        longer selection ends with a truncation note instead.
+        """
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return ""
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if offset is not None or length is not None:
+                    start = min(offset or 0, len(mm))
+                    span = (start, len(mm) if length is None else min(start + length, len(mm)))
+                elif start_line is not None or end_line is not None:
+                    span = _line_span(mm, start_line or 1, end_line)
+                elif head is not None:
+                    span = _line_span(mm, 1, head)
+                elif tail is not None:
+                    return _read_span(mm, _tail_span(mm, tail), max_bytes, from_end=True)
+                elif grep is not None:
+                    return _grep(mm, grep, max_matches, max_bytes)
+                else:
+                    span = (0, len(mm))
+
+                return _read_span(mm, span, max_bytes)
 
 
 class WriteFileTool(BaseTool):
     name = "write_file"
     description = "Write content to a file at a given path"
+    args_schema = {
+        "type": "object",
+        "properties": {
+            "path": {"type": "string", "description": "File to write"},
+            "content": {"type": "string", "description": "Text to write"},
+            "chunks": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Text to write, in pieces (instead of content)",
+            },
+            "mode": {"type": "string", "enum": ["overwrite", "append"], "description": "Default overwrite"},
+            "atomic": {"type": "boolean", "description": "Overwrite via temp file + rename (default true)"},
+        },
+        "required": ["path"],
+    }
+    cost = "io"
+    # mode="append" writes the content again on every call
+    idempotent = False
+    path_args = ("path",)
+
+    def validate(self, args):
+        super().validate(args)
+
+        if ("content" in args) == ("chunks" in args):
+            raise ToolArgumentError(f"{self.name}: give exactly one of content, chunks")
+        if "chunks" in args and not all(isinstance(c, str) for c in args["chunks"]):
+            raise ToolArgumentError(f"{self.name}: chunks must be strings")
+
+        return args
+
+    def run(
+        self,
+        path: str,
+        content: Optional[str] = None,
+        chunks: Optional[List[str]] = None,
+        mode: str = "overwrite",
+        atomic: bool = True,
+    ) -> str:
+        pieces = [content] if content is not None else chunks or []
+
+        if mode == "append":
+            _break_hard_link(path)
+            with open(path, "a", encoding="utf-8") as f:
+                for piece in pieces:
+                    f.write(piece)
+            return "File written successfully"
+
+        if not atomic:
+            # Truncating a hard-linked file would rewrite every name for it
+            if os.path.exists(path) and os.stat(path).st_nlink > 1:
+                os.unlink(path)
+            with open(path, "w", encoding="utf-8") as f:
+                for piece in pieces:
+                    f.write(piece)
+            return "File written successfully"
+
+        # Readers never see a half-written file; the old one stays intact
+        # if writing fails
+        tmp = _temp_path(path)
+        # 0o666 & ~umask, like a plain open(); mkstemp would force 0o600
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for piece in pieces:
+                    f.write(piece)
+            if os.path.exists(path):
+                shutil.copymode(path, tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
 
-    def run(self, path: str, content: str) -> str:
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
         return "File written successfully"
+
+
+def _temp_path(path: str) -> str:
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+
+
+def _break_hard_link(path: str):
+    """
+    Gives `path` its own inode before an in-place append, so other
+    names for the same file (e.g. a content-addressed store) keep
+    their contents.
+    """
+    try:
+        if os.stat(path).st_nlink <= 1:
+            return
+    except FileNotFoundError:
+        return
+
+    tmp = _temp_path(path)
+    shutil.copy2(path, tmp)
+    os.replace(tmp, path)
+
+
+# =========================================================
+# mmap helpers (bytes in, bytes out)
+# =========================================================
+_WINDOW = 1 << 20
+
+
+def _count_newlines(mm: mmap.mmap, start: int, end: int) -> int:
+    # Window by window, so a long gap between grep hits is never copied whole
+    total = 0
+    for pos in range(start, end, _WINDOW):
+        total += mm[pos:min(pos + _WINDOW, end)].count(b"\n")
+    return total
+
+
+def _read_span(mm: mmap.mmap, span: Tuple[int, int], max_bytes: int, from_end: bool = False) -> str:
+    start, end = span
+    size = end - start
+
+    if size <= max_bytes:
+        return mm[start:end].decode("utf-8", errors="replace")
+
+    note = _truncation_note(max_bytes, size)
+    if from_end:
+        return note + "\n" + mm[end - max_bytes:end].decode("utf-8", errors="replace")
+    return mm[start:start + max_bytes].decode("utf-8", errors="replace") + "\n" + note
+
+
+def _truncation_note(shown: int, size: Optional[int] = None) -> str:
+    of = "" if size is None else f" of {size}"
+    return (
+        f"[truncated: {shown}{of} bytes shown; "
+        f"read the rest with offset/length, start_line/end_line, head, tail or grep]"
+    )
+
+
+def _line_span(mm: mmap.mmap, first: int, last: Optional[int]) -> Tuple[int, int]:
+    start = 0
+    for _ in range(first - 1):
+        nl = mm.find(b"\n", start)
+        if nl == -1:
+            return 0, 0
+        start = nl + 1
+
+    if last is None:
+        return start, len(mm)
+
+    end = start
+    for _ in range(last - first + 1):
+        nl = mm.find(b"\n", end)
+        if nl == -1:
+            return start, len(mm)
+        end = nl + 1
+
+    return start, end
+
+
+def _tail_span(mm: mmap.mmap, count: int) -> Tuple[int, int]:
+    size = len(mm)
+    if count == 0:
+        return size, size
+
+    # A trailing newline ends the last line rather than starting a new one
+    end = size - 1 if mm[size - 1:size] == b"\n" else size
+
+    start = end
+    for _ in range(count):
+        nl = mm.rfind(b"\n", 0, start)
+        if nl == -1:
+            return 0, size
+        start = nl
+
+    return start + 1, size
+
+
+def _grep(mm: mmap.mmap, pattern: str, max_matches: int, max_bytes: int) -> str:
+    regex = re.compile(pattern.encode("utf-8"), re.MULTILINE)
+    lines = []
+    # Output bytes so far ("N:line" plus separators); stops past max_bytes
+    size = -1
+
+    line_no = 1
+    counted_to = 0
+    pos = 0
+
+    while len(lines) < max_matches:
+        match = regex.search(mm, pos)
+        if match is None:
+            break
+
+        line_start = mm.rfind(b"\n", 0, match.start()) + 1
+        line_end = mm.find(b"\n", match.start())
+        if line_end == -1:
+            line_end = len(mm)
+
+        line_no += _count_newlines(mm, counted_to, line_start)
+        counted_to = line_start
+
+        line = b"%d:" % line_no + mm[line_start:line_end]
+        lines.append(line)
+        size += len(line) + 1
+        if size > max_bytes:
+            text = b"\n".join(lines)[:max_bytes].decode("utf-8", errors="replace")
+            return text + "\n" + _truncation_note(max_bytes)
+
+        # One hit per line; empty matches must still make progress
+        pos = line_end + 1
+
+    return b"\n".join(lines).decode("utf-8", errors="replace")
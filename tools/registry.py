@@ -1,7 +1,171 @@
 # tools/registry.py
+from importlib.metadata import entry_points
+from typing import Dict, Iterator, List
+
+from core.metrics import emit
+from tools.base import COST_CLASSES, BaseTool, ToolArgumentError
 from tools.file_tools import ReadFileTool, WriteFileTool
 
-TOOLS = {
-    "read_file": ReadFileTool(),
-    "write_file": WriteFileTool(),
-}
+
+# Third-party packages add tools with e.g. (pyproject.toml):
+#   [project.entry-points."codeeditor.tools"]
+#   http_get = "my_pkg.tools:HttpGetTool"
+ENTRY_POINT_GROUP = "codeeditor.tools"
+
+
+class ToolRegistry:
+    """
+    Tools by name, with their argument schemas and capability metadata
+    (cost class, idempotency, cacheability; see tools/base.py).
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, BaseTool] = {}
+
+    def register(self, tool: BaseTool) -> BaseTool:
+        if tool.cost not in COST_CLASSES:
+            raise ValueError(f"{tool.name}: cost must be one of {COST_CLASSES}")
+        if tool.name in self._tools:
+            raise ValueError(f"Tool already registered: {tool.name}")
+
+        tool.schema()  # fail on bad signatures now, not mid-task
+        self._tools[tool.name] = tool
+        return tool
+
+    def load_entry_points(self, group: str = ENTRY_POINT_GROUP) -> List[str]:
+        """
+        Registers every tool advertised under `group`. An entry point may
+        name a BaseTool subclass or instance. Broken plugins are skipped
+        (and logged) rather than taking the engine down.
+        """
+        loaded = []
+
+        for ep in entry_points(group=group):
+            try:
+                tool = ep.load()
+                if isinstance(tool, type):
+                    tool = tool()
+                if not isinstance(tool, BaseTool):
+                    raise TypeError("not a BaseTool")
+                self.register(tool)
+                loaded.append(tool.name)
+            except Exception as e:
+                emit("tool_plugin_error", entry_point=ep.name, error=str(e))
+
+        return loaded
+
+    def get(self, name: str) -> BaseTool:
+        if name not in self._tools:
+            raise ToolArgumentError(f"Unknown tool: {name}")
+        return self._tools[name]
+
+    def validate(self, name: str, args) -> dict:
+        return self.get(name).validate(args)
+
+    def validate_batch(self, calls) -> list:
+        """
+        A batch is a non-empty list of calls to cacheable (read-only)
+        tools, so running them together cannot reorder side effects.
+        """
+        if not isinstance(calls, list) or not calls:
+            raise ToolArgumentError("calls must be a non-empty list of tool calls")
+
+        for call in calls:
+            if not isinstance(call, dict) or "tool" not in call or "args" not in call:
+                raise ToolArgumentError("Malformed tool call in batch")
+            if not self.get(call["tool"]).cacheable:
+                raise ToolArgumentError(f"{call['tool']} cannot be batched (not read-only)")
+            self.validate(call["tool"], call["args"])
+
+        return calls
+
+    def batchable(self) -> List[str]:
+        return [name for name, tool in self._tools.items() if tool.cacheable]
+
+    def __getitem__(self, name: str) -> BaseTool:
+        return self._tools[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._tools)
+
+    def items(self):
+        return self._tools.items()
+
+    # -------------------------
+    # Model-facing descriptions
+    # -------------------------
+    def prompt_section(self) -> str:
+        """
+        The "Allowed tools" list of the executor prompt:
+        1. write_file(path: string, content: string)
+        Optional arguments are marked with "?".
+        """
+        lines = []
+
+        for i, tool in enumerate(self._tools.values(), start=1):
+            schema = tool.schema()
+            required = set(schema.get("required", []))
+            args = ", ".join(
+                f"{name}{'' if name in required else '?'}: {spec.get('type', 'string')}"
+                for name, spec in schema.get("properties", {}).items()
+            )
+            lines.append(f"{i}. {tool.name}({args})")
+
+        return "\n".join(lines)
+
+    def call_schema(self, no_action: str = "NO_ACTION") -> dict:
+        """
+        JSON schema of one EXECUTE answer: a call to one of the tools, a
+        batch {"calls": [...]} of read-only calls, or {"tool": no_action}.
+        Passed to the model as a structured-output format.
+        """
+        single = {
+            name: {
+                "type": "object",
+                "properties": {
+                    "tool": {"type": "string", "enum": [name]},
+                    "args": tool.schema(),
+                },
+                "required": ["tool", "args"],
+            }
+            for name, tool in self._tools.items()
+        }
+        calls = list(single.values())
+
+        batchable = self.batchable()
+        if batchable:
+            calls.append(
+                {
+                    "type": "object",
+                    "properties": {
+                        "calls": {
+                            "type": "array",
+                            "minItems": 1,
+                            "items": {"anyOf": [single[name] for name in batchable]},
+                        },
+                    },
+                    "required": ["calls"],
+                }
+            )
+
+        calls.append(
+            {
+                "type": "object",
+                "properties": {"tool": {"type": "string", "enum": [no_action]}},
+                "required": ["tool"],
+            }
+        )
+        return {"anyOf": calls}
+
+
+TOOLS = ToolRegistry()
+TOOLS.register(WriteFileTool())
+TOOLS.register(ReadFileTool())
+TOOLS.load_entry_points()
+
+
+def tool_call_schema(no_action: str = "NO_ACTION") -> dict:
+    return TOOLS.call_schema(no_action)
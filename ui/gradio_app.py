@@ -1 +1,99 @@
+# ui/gradio_app.py
+import asyncio
+import queue
+import threading
+
 import gradio as gr
+
+from core import config
+from core.events import TERMINAL_EVENTS, EventBus
+from core.memory import LongTermMemory
+from core.orchestrator import Orchestrator
+from models.llm_factory import get_llm
+
+# Shared like in api/app.py; each run gets its own Orchestrator
+llm = get_llm(config.LLM_PROVIDER)
+long_term_memory = LongTermMemory()
+
+# Tasks run on one background event loop; the UI threads only read events
+_loop = asyncio.new_event_loop()
+threading.Thread(target=_loop.run_forever, daemon=True).start()
+
+
+def _format(event: dict) -> str:
+    kind = event["event"]
+
+    if kind == "plan":
+        return "**Plan**\n\n" + "\n".join(f"{i + 1}. {step}" for i, step in enumerate(event["steps"]))
+    if kind in ("step_started", "step_skipped", "step_done"):
+        action = f" ({event['action']})" if event.get("action") else ""
+        label = kind.split("_")[1]
+        return f"- Step {event['index'] + 1}/{event['total']} {label}{action}: {event['step']}"
+    if kind == "artifact":
+        return f"- Wrote `{event['name']}` ({event.get('size', '?')} bytes)"
+    if kind == "reflection":
+        return f"**Reflection**\n\n{event['text']}"
+    if kind == "done":
+        return "**Done**"
+    if kind == "failed":
+        return f"**Failed:** {event['error']}"
+    if kind == "cancelled":
+        return "**Cancelled**"
+    return ""
+
+
+def run_task(task: str):
+    """
+    Streams the task's progress as markdown. Stopping (or closing the
+    page) cancels the task and its model requests.
+    """
+    events = EventBus()
+    received = queue.Queue()
+    events.subscribe(received.put)
+
+    orchestrator = Orchestrator(
+        llm=llm,
+        long_term_memory=long_term_memory,
+        workspace_root=config.WORKSPACE_ROOT,
+        events=events,
+    )
+    run = asyncio.run_coroutine_threadsafe(orchestrator.arun(task), _loop)
+
+    lines = []
+    try:
+        while True:
+            try:
+                event = received.get(timeout=1.0)
+            except queue.Empty:
+                # Ended without a final event (e.g. cancelled before it began)
+                if run.done():
+                    break
+                continue
+
+            line = _format(event)
+            if line:
+                lines.append(line)
+                yield "\n\n".join(lines)
+
+            if event["event"] in TERMINAL_EVENTS:
+                break
+    finally:
+        run.cancel()
+
+
+def build_app() -> gr.Blocks:
+    with gr.Blocks(title="LLM Execution Engine") as demo:
+        task = gr.Textbox(label="Task", lines=2)
+        with gr.Row():
+            start = gr.Button("Run", variant="primary")
+            stop = gr.Button("Stop")
+        progress = gr.Markdown()
+
+        running = start.click(run_task, inputs=task, outputs=progress)
+        stop.click(None, cancels=[running])
+
+    return demo
+
+
+if __name__ == "__main__":
+    build_app().queue().launch()